@@ -0,0 +1,35 @@
+from collections.abc import Mapping
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+from app.utils.timing import timed
+
+try:
+    import orjson
+except ImportError:  # optional, pydantic-core is used without it
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (pydantic-core when orjson is not installed) instead of json.dumps.
+
+    Returning it from an endpoint also skips FastAPI's response validation and jsonable_encoder pass,
+    use it for content that is already valid, e.g. large dicts read from the corpus.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("render"):
+            if orjson is not None:
+                return orjson.dumps(content, default=_to_jsonable)
+            return pydantic_core.to_json(content, fallback=_to_jsonable)
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
@@ -0,0 +1,235 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.api.routes.info import get_app_service
+from app.config import settings
+from app.dtos.profile_response import ProfileResponse, ProfileSummary
+from app.dtos.revisit_response import RevisitQueueResponse
+from app.dtos.usage_response import CostlyQuestion, UsageReportResponse
+from app.services.app_service import AppService
+from app.utils.admin import is_admin_key
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(default=None)):
+    """
+    Admin endpoints require the X-Admin-Key header to match ADMIN_API_KEY, without ADMIN_API_KEY they are disabled.
+
+    Raises:
+        HTTPException: 404 status code if ADMIN_API_KEY is not set, 401 if the key is missing or wrong
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_key)])
+
+
+# ============================================================================
+# Admin controller for crawler and service internals
+# ============================================================================
+
+
+@router.get("/revisits")
+def get_revisit_queue(
+        limit: int = Query(50, ge=1, le=1000),
+        service: AppService = Depends(get_app_service)
+) -> RevisitQueueResponse:
+    """
+    Revisit queue of crawled pages, next due first, with the revisit budget.
+
+    Args:
+        limit (int): Maximum number of pages in the queue (1-1000)
+
+    Returns:
+        RevisitQueueResponse:
+            - pages (int): Pages with a revisit schedule
+            - requests_per_hour (int): Revisit budget (REVISIT_REQUESTS_PER_HOUR)
+            - demand_per_hour (float): Revisits per hour the pages ask for at their desired intervals
+            - budget_factor (float): How much intervals are stretched to fit the budget (1 when they fit)
+            - batch_size (int): Pages fetched per revisit round
+            - queue (list[RevisitQueueItem]): url, change_rate (changes per day), interval (seconds),
+              checks, changes, last_checked_at, last_changed_at, next_due_at, overdue
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 500 status code if the schedule can not be read
+
+    Example:
+        GET /admin/revisits?limit=2
+
+        Response:
+        {
+            "pages": 48, "requests_per_hour": 60, "demand_per_hour": 3.2, "budget_factor": 1.0, "batch_size": 5,
+            "queue": [
+                {"url": "https://tehisintellekt.ee/blogi", "change_rate": 2.1, "interval": 41142.9, "checks": 12,
+                 "changes": 9, "last_checked_at": "2026-10-18T21:04:11+00:00",
+                 "last_changed_at": "2026-10-18T21:04:11+00:00", "next_due_at": "2026-10-19T08:29:53+00:00",
+                 "overdue": false}
+            ]
+        }
+    """
+    return service.get_revisit_queue(limit)
+
+
+@router.post("/profiles", status_code=202)
+def start_profile(
+        seconds: float = Query(10, gt=0, le=settings.PROFILING_MAX_SECONDS),
+        service: AppService = Depends(get_app_service)
+) -> ProfileSummary:
+    """
+    Profile this worker process for the next seconds with the sampling profiler, whatever requests it serves.
+    Single requests are profiled with the X-Profile header instead (see ProfilingMiddleware).
+
+    Args:
+        seconds (float): Length of the profiling window (up to PROFILING_MAX_SECONDS)
+
+    Returns:
+        ProfileSummary: id, label, started_at, duration (None while running), samples, running
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 404 status code if PROFILING_ENABLED is not set
+            - 409 status code if a profiling window is already running
+
+    Example:
+        POST /admin/profiles?seconds=30
+
+        Response:
+        {"id": "3f2a9c1e7b4d", "label": "window", "started_at": "2026-10-19T09:12:03+00:00", "duration": null,
+         "samples": 0, "running": true}
+    """
+    return service.start_profile(seconds)
+
+
+@router.get("/profiles")
+def get_profiles(service: AppService = Depends(get_app_service)) -> list[ProfileSummary]:
+    """
+    Profiles kept by this worker process (windows and single requests), newest first.
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 404 status code if PROFILING_ENABLED is not set
+    """
+    return service.get_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+        profile_id: str,
+        limit: int = Query(30, ge=1, le=500),
+        service: AppService = Depends(get_app_service)
+) -> ProfileResponse:
+    """
+    Functions with most samples in a profile. total_share is the share of samples in the function
+    or in functions it called, self_share the share spent in the function itself.
+
+    Args:
+        profile_id (str): Profile id from POST /admin/profiles or the X-Profile-Id response header
+        limit (int): Maximum number of functions (1-500)
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 404 status code if PROFILING_ENABLED is not set or the profile does not exist
+
+    Example:
+        GET /admin/profiles/3f2a9c1e7b4d?limit=1
+
+        Response:
+        {"id": "3f2a9c1e7b4d", "label": "POST /ask", "started_at": "2026-10-19T09:12:03+00:00", "duration": 1.204,
+         "samples": 231, "running": false,
+         "functions": [{"function": "ask_question (app_service.py:60)", "self_samples": 0, "total_samples": 229,
+                        "self_share": 0.0, "total_share": 0.991}]}
+    """
+    return service.get_profile(profile_id, limit)
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_collapsed_profile(profile_id: str, service: AppService = Depends(get_app_service)) -> str:
+    """
+    Profile stacks in collapsed format ("outer;inner count" per line) for flamegraph.pl or speedscope.
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 404 status code if PROFILING_ENABLED is not set or the profile does not exist
+    """
+    return service.get_collapsed_profile(profile_id)
+
+
+@router.get("/usage")
+def get_usage(
+        period: Literal["hour", "day"] = "hour",
+        hours: int = Query(24, ge=1, le=settings.USAGE_STATS_MAX_HOURS),
+        service: AppService = Depends(get_app_service)
+) -> UsageReportResponse:
+    """
+    Usage ledger of answered questions (/ask, /ask/batch and conversations) over the last hours, in total
+    and per UTC hour or day. Records are written in batches, the latest seconds may still be buffered
+    in the workers (see writer).
+
+    Args:
+        period (str): "hour" or "day" buckets
+        hours (int): Length of the period in hours (up to USAGE_STATS_MAX_HOURS)
+
+    Returns:
+        UsageReportResponse:
+            - period (str), since (str)
+            - total (UsageStats): requests, input_tokens, output_tokens, cost (USD), cached (precomputed answers),
+              degraded (fallback answers), latency_p50, latency_p95, latency_p99 (seconds)
+            - buckets (list[UsageBucket]): UsageStats with the bucket start, buckets without requests are left out
+            - writer (UsageWriterStats): buffered, written and dropped records of the answering worker
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 500 status code if the ledger can not be read
+
+    Example:
+        GET /admin/usage?period=day&hours=48
+
+        Response:
+        {
+            "period": "day", "since": "2026-10-17T09:00:00+00:00",
+            "total": {"requests": 412, "input_tokens": 2184120, "output_tokens": 61240, "cost": 0.364362,
+                      "cached": 97, "degraded": 3, "latency_p50": 1.84, "latency_p95": 4.12, "latency_p99": 9.7},
+            "buckets": [{"start": "2026-10-18T00:00:00+00:00", "requests": 230, ...}, ...],
+            "writer": {"buffered": 4, "written": 1210, "dropped": 0}
+        }
+    """
+    return service.get_usage(period, hours)
+
+
+@router.get("/usage/questions")
+def get_costly_questions(
+        hours: int = Query(24 * 7, ge=1, le=settings.USAGE_STATS_MAX_HOURS),
+        limit: int = Query(20, ge=1, le=500),
+        service: AppService = Depends(get_app_service)
+) -> list[CostlyQuestion]:
+    """
+    Questions that cost most over the last hours, rephrasings differing only in case, punctuation
+    or spacing are counted together. Candidates for FAQ_QUESTIONS.
+
+    Args:
+        hours (int): Length of the period in hours (up to USAGE_STATS_MAX_HOURS)
+        limit (int): Maximum number of questions (1-500)
+
+    Raises:
+        HTTPException:
+            - 404 status code if ADMIN_API_KEY is not set, 401 if X-Admin-Key does not match
+            - 500 status code if the ledger can not be read
+
+    Example:
+        GET /admin/usage/questions?limit=1
+
+        Response:
+        [{"normalized": "võrdle koolitusi", "question": "Võrdle koolitusi?", "requests": 14, "input_tokens": 410220,
+          "output_tokens": 9100, "cost": 0.067, "cost_per_request": 0.004786}]
+    """
+    return service.get_costly_questions(hours, limit)
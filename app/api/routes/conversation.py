@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends
+from app.api.routes.info import get_app_service
+from app.dtos.ask_request import AskRequest
+from app.dtos.conversation_response import ConversationAskResponse, ConversationResponse
+from app.services.app_service import AppService
+
+router = APIRouter()
+
+
+# ============================================================================
+# Conversation controller for multi-turn chat sessions
+# ============================================================================
+
+
+@router.post("/conversations")
+def create_conversation(service: AppService = Depends(get_app_service)) -> ConversationResponse:
+    """
+    Start a new conversation. History is kept on the server, the client only sends the conversation id.
+
+    Returns:
+        ConversationResponse:
+            - id (str): Conversation id used in /conversations/{id}/ask
+
+    Raises:
+        HTTPException: 500 status code if the conversation can not be stored
+
+    Example:
+        POST /conversations
+
+        Response:
+        {
+            "id": "3f1c9b2a8d4e4f6a9b0c1d2e3f4a5b6c"
+        }
+    """
+    return service.create_conversation()
+
+
+@router.post("/conversations/{conversation_id}/ask")
+def ask_in_conversation(
+        conversation_id: str,
+        request_data: AskRequest,
+        service: AppService = Depends(get_app_service)
+) -> ConversationAskResponse:
+    """
+    Answer a question within a conversation. Follow-up questions are answered with earlier turns
+    and previously used sources in the context.
+
+    Args:
+        conversation_id (str): Id returned by POST /conversations
+        request_data (AskRequest): Request body containing:
+            - question (str): The user's question (5-1000 characters)
+        service (AppService): Injected application service (automatic via Depends)
+
+    Returns:
+        ConversationAskResponse: Same fields as /ask response and conversation_id
+
+    Raises:
+        HTTPException:
+            - 400 status code if question validation fails
+            - 404 status code if the conversation does not exist
+            - 500 status code if no crawled content is available or OpenAI API call fails
+
+    Example:
+        POST /conversations/3f1c9b2a8d4e4f6a9b0c1d2e3f4a5b6c/ask
+        {
+            "question": "And how much does it cost?"
+        }
+
+        Response:
+        {
+            "conversation_id": "3f1c9b2a8d4e4f6a9b0c1d2e3f4a5b6c",
+            "question": "And how much does it cost?",
+            "answer": "The AI training for managers costs...",
+            "sources": ["https://tehisintellekt.ee/teenused/koolitused"],
+            "usage": {
+                "input_tokens": 1410,
+                "output_tokens": 64
+            }
+        }
+    """
+    return service.ask_in_conversation(conversation_id, request_data.question)
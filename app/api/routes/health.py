@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cruds.page_crud import PageCrud
+from app.db.database import get_db
+
+router = APIRouter()
+
+
+# ============================================================================
+# Health controller for liveness and readiness probes
+# ============================================================================
+
+
+@router.get("/health")
+def health_check():
+    """
+    Liveness probe. Answers as soon as the process serves requests, does not touch the database.
+    """
+    return {"status": "healthy"}
+
+
+@router.get("/ready")
+def readiness_check(request: Request, db: Session = Depends(get_db)):
+    """
+    Readiness probe. Ready when the database is reachable, crawled content is stored
+    and warm-up (heavy imports, embedding index) has finished.
+
+    Returns:
+        200 {"status": "ready", "checks": {...}} or 503 {"status": "not ready", "checks": {...}}
+
+    Example:
+        GET /ready
+
+        Response:
+        {
+            "status": "ready",
+            "checks": {"database": true, "corpus": true, "warm": true, "pages": 42}
+        }
+    """
+    checks = {"database": False, "corpus": False, "warm": getattr(request.app.state, "warm", False), "pages": 0}
+    try:
+        db.execute(text("SELECT 1"))
+        checks["database"] = True
+        checks["pages"], _ = PageCrud(db).get_content_stats()
+        checks["corpus"] = checks["pages"] > 0
+    except Exception as e:
+        print(f"[health] @ready: {e}")
+
+    ready = checks["database"] and checks["corpus"] and checks["warm"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", "checks": checks},
+    )
@@ -1,8 +1,14 @@
 from typing import Dict
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.api.responses import FastJSONResponse
+from app.config import settings
 from app.dtos.ask_request import AskRequest
 from app.dtos.ask_response import AskResponse
+from app.dtos.batch_request import AskBatchRequest
+from app.dtos.search_response import SearchResponse
+from app.middleware import acquire_requests
 from app.services.app_service import AppService
 
 router = APIRouter()
@@ -20,10 +26,11 @@ def get_app_service():
     return AppService()
 
 
-@router.get("/source_info")
-def get_source_info(service: AppService = Depends(get_app_service)) -> Dict[str, str]:
+@router.get("/source_info", response_model=Dict[str, str])
+def get_source_info(service: AppService = Depends(get_app_service)) -> FastJSONResponse:
     """
     Retrieve all crawled pages and their content.
+    The corpus can be large, it is rendered with orjson directly instead of validating every page again.
 
     Args:
         service (AppService): Injected application service (automatic via Depends)
@@ -49,11 +56,11 @@ def get_source_info(service: AppService = Depends(get_app_service)) -> Dict[str,
             "https://example.com/contact": "Contact us at..."
         }
     """
-    return service.get_source_info()
+    return FastJSONResponse(service.get_source_info())
 
 
 @router.post("/ask")
-async def ask_question(
+def ask_question(
         request_data: AskRequest,
         service: AppService = Depends(get_app_service)
 ) -> AskResponse:
@@ -63,6 +70,7 @@ async def ask_question(
     Args:
         request_data (AskRequest): Request body containing:
             - question (str): The user's question (5-1000 characters)
+            - use_digests (bool): Answer from condensed page digests (fewer input tokens), optional
         service (AppService): Injected application service (automatic via Depends)
 
     Returns:
@@ -73,6 +81,9 @@ async def ask_question(
             - usage (Usage): Token usage statistics
                 - input_tokens (int): Tokens consumed in the request
                 - output_tokens (int): Tokens generated in the response
+            - model (str): Model that answered, None when no model was called
+            - degraded (bool): The model missed the deadline (ASK_DEADLINE) or failed, the answer quotes
+              the most relevant passages of the pages instead
 
     Raises:
         HTTPException:
@@ -81,7 +92,7 @@ async def ask_question(
                 - Question is shorter than 5 characters
                 - Question is longer than 1000 characters
             - 500 status code if no crawled content is available
-            - 500 status code if OpenAI API call fails
+            - 500 status code if OpenAI API call fails and ASK_FALLBACK_ENABLED is off
 
     Example:
         POST /ask
@@ -100,7 +111,141 @@ async def ask_question(
             "usage": {
                 "input_tokens": 1250,
                 "output_tokens": 87
-            }
+            },
+            "model": "gpt-4o-mini",
+            "degraded": false
+        }
+    """
+    return service.ask_question(request_data.question, request_data.use_digests)
+
+
+@router.post("/ask/batch")
+def ask_batch(
+        request_data: AskBatchRequest,
+        service: AppService = Depends(get_app_service)
+) -> StreamingResponse:
+    """
+    Answer many questions at once, e.g. for FAQ generation or regression evaluation.
+    The corpus is loaded once and questions are answered in parallel.
+
+    Args:
+        request_data (AskBatchRequest): Request body containing:
+            - questions (list[str]): Questions to answer (1-500)
+            - concurrency (int): Optional number of questions answered in parallel (1-16)
+        service (AppService): Injected application service (automatic via Depends)
+
+    Returns:
+        StreamingResponse: NDJSON (application/x-ndjson), one line per question as soon as it is answered,
+        in completion order. Invalid or failed questions have "error" instead of "result".
+        The last line holds the summary with aggregated token usage.
+
+    Raises:
+        HTTPException:
+            - 422 status code if the request body is invalid
+            - 429 status code if the client's request limit has no token left for every question
+            - 500 status code if no crawled content is available
+
+    Example:
+        POST /ask/batch
+        {
+            "questions": ["What services does the company offer?", "Hi"]
+        }
+
+        Response:
+        {"index": 1, "question": "Hi", "result": null, "error": "Question is too short. Minimum length is 5 characters"}
+        {"index": 0, "question": "What services does the company offer?", "result": {"question": "...", "answer": "...", "sources": [...], "usage": {...}}, "error": null}
+        {"summary": {"total": 2, "succeeded": 1, "failed": 1, "usage": {"input_tokens": 1250, "output_tokens": 87}}}
+    """
+    # The middleware took one request token, every further question takes another
+    state = acquire_requests(len(request_data.questions) - 1)
+    if state is not None and not state.allowed:
+        raise HTTPException(status_code=429, detail='Rate limit exceeded, retry later',
+                            headers={"Retry-After": str(state.retry_after)})
+    results = service.ask_batch(request_data.questions, request_data.concurrency)
+    return StreamingResponse(
+        (item.model_dump_json() + "\n" for item in results),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/prefilter/stats")
+def get_prefilter_stats(service: AppService = Depends(get_app_service)) -> Dict[str, int]:
+    """
+    How many questions the local prefilter stopped before the paid model call (per worker process, since start).
+
+    Example:
+        GET /prefilter/stats
+
+        Response:
+        {
+            "checked": 120,
+            "allowed": 101,
+            "gibberish": 6,
+            "injection": 2,
+            "off_topic": 11,
+            "avoided_calls": 19
+        }
+    """
+    return service.get_prefilter_stats()
+
+
+@router.get("/models/stats")
+def get_model_stats(service: AppService = Depends(get_app_service)) -> Dict[str, dict]:
+    """
+    Routing statistics of every configured model (per worker process, since start).
+
+    Example:
+        GET /models/stats
+
+        Response:
+        {
+            "gpt-4o-mini": {"calls": 42, "failures": 1, "latency": 1.84, "error_rate": 0.02, "input_tokens": 52000,
+                            "output_tokens": 3900, "cost": 0.01014, "tier": 1, "healthy": true}
+        }
+    """
+    return service.get_model_stats()
+
+
+@router.get("/search")
+def search(
+        q: str = Query(min_length=1, max_length=settings.MAX_QUESTION_LENGTH),
+        limit: int = Query(10, ge=1, le=50),
+        service: AppService = Depends(get_app_service)
+) -> SearchResponse:
+    """
+    Full-text search over crawled pages, ranked by relevance.
+
+    Args:
+        q (str): Search query, all words must be present in the page
+        limit (int): Maximum number of results (1-50, default 10)
+        service (AppService): Injected application service (automatic via Depends)
+
+    Returns:
+        SearchResponse: Structured response containing:
+            - query (str): The original query
+            - results (list[SearchResult]): Best matches first
+                - url (str): Page URL
+                - snippet (str): Content fragment with matches wrapped in <b></b>
+                - rank (float): Relevance score, higher is better
+
+    Raises:
+        HTTPException:
+            - 422 status code if query is empty or too long, or limit is out of range
+            - 500 status code if search fails
+
+    Example:
+        GET /search?q=koolitused&limit=2
+
+        Response:
+        {
+            "query": "koolitused",
+            "results": [
+                {
+                    "url": "https://tehisintellekt.ee/teenused/koolitused",
+                    "snippet": "Praktilised tehisintellekti <b>koolitused</b> juhtidele...",
+                    "rank": 1.73
+                }
+            ]
         }
     """
-    return service.ask_question(request_data.question)
+    return service.search(q, limit)
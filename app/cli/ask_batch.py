@@ -0,0 +1,65 @@
+"""
+Answer a file of questions without the HTTP server, e.g. for FAQ generation or regression evaluation.
+
+Questions are read one per line (plain text) or as JSON lines with a "question" field.
+Results are written as NDJSON in the same format as POST /ask/batch, the summary goes to stderr.
+
+    python -m app.cli.ask_batch questions.txt --output answers.ndjson --concurrency 8
+"""
+import argparse
+import json
+import sys
+from typing import TextIO
+
+from fastapi import HTTPException
+
+from app.dtos.batch_response import BatchSummaryLine
+from app.services.app_service import AppService
+
+
+def read_questions(questions_file: TextIO) -> list[str]:
+    questions = []
+    for line in questions_file:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            questions.append(json.loads(line)["question"])
+        else:
+            questions.append(line)
+    return questions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", type=argparse.FileType("r", encoding="utf-8"),
+                        help="questions file, '-' for stdin")
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout,
+                        help="NDJSON results file (default stdout)")
+    parser.add_argument("--concurrency", type=int, default=None, help="questions answered in parallel")
+    args = parser.parse_args(argv)
+
+    questions = read_questions(args.questions)
+    if not questions:
+        print("No questions given", file=sys.stderr)
+        return 1
+
+    try:
+        results = AppService().ask_batch(questions, args.concurrency)
+        summary = None
+        for item in results:
+            args.output.write(item.model_dump_json() + "\n")
+            args.output.flush()
+            if isinstance(item, BatchSummaryLine):
+                summary = item.summary
+    except HTTPException as e:
+        print(f"Batch failed: {e.detail}", file=sys.stderr)
+        return 1
+
+    print(f"{summary.succeeded}/{summary.total} answered, {summary.failed} failed, "
+          f"{summary.usage.input_tokens} input and {summary.usage.output_tokens} output tokens", file=sys.stderr)
+    return 0 if summary.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
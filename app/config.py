@@ -5,9 +5,28 @@ load_dotenv()
 
 
 class Settings:
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DATABASE_URL: str = os.getenv("DATABASE_URL") or "sqlite:///data/app.db"
+    """
+    PostgreSQL server, or when not set an embedded SQLite database file (single node deployments).
+    """
+
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
 
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    """
+    Bytes of the SQLite database file read through a memory map instead of read() calls.
+    """
+
+    SQLITE_BUSY_TIMEOUT = 10
+    """
+    Seconds a SQLite writer waits for another writer (API and crawler) before failing with "database is locked".
+    """
+
+    SQLITE_STATEMENT_CACHE_SIZE = 256
+    """
+    Prepared statements kept per SQLite connection, repeated queries skip parsing and planning.
+    """
+
     DOMAIN = 'tehisintellekt.ee'
     """
     Target domain to crawl.
@@ -15,6 +34,357 @@ class Settings:
     Change this value to crawl a different website.
     """
 
+    SKIP_CRAWL = os.getenv("SKIP_CRAWL", "false").lower() == "true"
+    """
+    Do not start the crawler on application startup, e.g. for extra API workers or local development.
+    """
+
+    CRAWL_USE_SITEMAPS = True
+    """
+    Seed the crawl with sitemaps from robots.txt and /sitemap.xml, pages are fetched in order of their priority score.
+    """
+
+    CRAWL_JOBS_DIR = os.getenv("CRAWL_JOBS_DIR", "crawl_jobs")
+    """
+    Directory for Scrapy JOBDIR of each crawl job (persisted request queue and seen URLs).
+    """
+
+    CRAWL_TIMEOUT = 3600
+    """
+    Seconds after which the crawler is asked to stop. Stopped crawl is resumed on the next application start.
+    """
+
+    CRAWL_CHECKPOINT_PAGES = 10
+    """
+    Crawl progress (stored pages and characters) is saved to the crawl job every N stored pages.
+    """
+
+    CRAWL_ARCHIVE_MODE = os.getenv("CRAWL_ARCHIVE_MODE")
+    """
+    "record" saves every fetched response to CRAWL_ARCHIVE_DIR, "replay" crawls offline from it. Empty for a live crawl.
+    """
+
+    CRAWL_ARCHIVE_DIR = os.getenv("CRAWL_ARCHIVE_DIR", "crawl_archive")
+
+    DOCUMENT_INGESTION_ENABLED = os.getenv("DOCUMENT_INGESTION_ENABLED", "true").lower() == "true"
+    """
+    Follow links to PDF (needs pypdf), DOCX and plain text documents and store their text as pages.
+    Responses of other types are stopped after their headers, before the body is downloaded.
+    """
+
+    DOCUMENT_MAX_SIZE = 10 * 1024 * 1024
+    """
+    Maximum response size in bytes, larger responses are not downloaded.
+    """
+
+    REVISIT_ENABLED = os.getenv("REVISIT_ENABLED", "false").lower() == "true"
+    """
+    After the startup crawl, keep revisiting stored pages on an adaptive per-page schedule.
+    """
+
+    REVISIT_REQUESTS_PER_HOUR = 60
+    """
+    Revisit budget. When pages ask for more revisits than this, all their intervals are stretched to fit.
+    """
+
+    REVISIT_TICK = 300
+    """
+    Seconds between revisit rounds, a round fetches at most REVISIT_REQUESTS_PER_HOUR * REVISIT_TICK / 3600 pages.
+    """
+
+    REVISIT_INITIAL_INTERVAL = 86400
+    REVISIT_MIN_INTERVAL = 3600
+    REVISIT_MAX_INTERVAL = 30 * 86400
+    """
+    Revisit interval of a page seen once, and bounds of the interval estimated from its change history (seconds).
+    """
+
+    REVISIT_HISTORY_SIZE = 20
+    """
+    Latest checks per page the change rate is estimated from, older history is deleted.
+    """
+
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+    """
+    Required in the X-Admin-Key header by /admin endpoints and request profiling, both are disabled when it is not set.
+    """
+
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    """
+    Allow profiling of single requests with the X-Profile header and profiling windows from /admin/profiles.
+    Disabled, no request is timed or sampled.
+    """
+
+    PROFILING_INTERVAL = 0.005
+    """
+    Seconds between stack samples.
+    """
+
+    PROFILING_MAX_SECONDS = 60
+    """
+    Longest profiling window that can be started from /admin/profiles.
+    """
+
+    PROFILING_MAX_PROFILES = 20
+    """
+    Profiles kept in memory per worker process, oldest are dropped.
+    """
+
+    USAGE_LEDGER_ENABLED = os.getenv("USAGE_LEDGER_ENABLED", "true").lower() == "true"
+    """
+    Record tokens, cost, latency and flags of every answered question in the usage_records table.
+    """
+
+    USAGE_LEDGER_BATCH_SIZE = 100
+    USAGE_LEDGER_FLUSH_INTERVAL = 5.0
+    """
+    Ledger records are buffered in memory and inserted in one statement every USAGE_LEDGER_FLUSH_INTERVAL
+    seconds, or as soon as USAGE_LEDGER_BATCH_SIZE records are waiting.
+    """
+
+    USAGE_LEDGER_MAX_BUFFER = 10000
+    """
+    Records kept per worker process while the database can not be written, oldest are dropped.
+    """
+
+    USAGE_STATS_MAX_HOURS = 24 * 90
+    """
+    Longest period /admin/usage aggregates over.
+    """
+
+    SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "simple")
+    """
+    PostgreSQL text search configuration of the pages search index: "simple" (no stemming, works for mixed
+    Estonian/English content), "english", or "estonian" where the PostgreSQL build provides it.
+    The index has to be recreated (drop pages.search_vector) after changing it.
+    """
+
+    CORPUS_SNAPSHOT_PATH = os.getenv("CORPUS_SNAPSHOT_PATH", "data/corpus.bin")
+    """
+    Memory-mapped corpus snapshot written after every crawl. API workers serve pages from it
+    and fall back to the database while it does not exist.
+    """
+
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    """
+    "memory" (limits per worker process) or "database" (rate_limit_buckets table shared by all workers).
+    """
+
+    RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+    """
+    Identify clients by X-Forwarded-For. Enable only behind a proxy that sets it, clients can forge it otherwise.
+    """
+
+    RATE_LIMIT_API_KEYS = {key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()}
+    """
+    API keys (comma separated) that get their own buckets when sent in the X-API-Key header.
+    Other keys are ignored and the client is identified by IP, so made-up keys do not get fresh buckets.
+    """
+
+    RATE_LIMIT_RULES = {
+        "ask_batch": {"paths": ["/ask/batch"], "requests": (500, 3600), "tokens": (200000, 3600)},
+        "ask": {"paths": ["/ask", "/conversations"], "requests": (20, 60), "tokens": (200000, 3600)},
+        "source_info": {"paths": ["/source_info"], "requests": (10, 60)},
+    }
+    """
+    Token bucket limits per client (allowed X-API-Key or IP) by path prefix: (capacity, period in seconds),
+    the first matching rule applies. "tokens" limits OpenAI input + output tokens spent on the client's requests.
+    Every question of a /ask/batch request takes a request token.
+    """
+
+    PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+    """
+    Local checks before the model call: gibberish, prompt injection and relevance to the crawled content.
+    """
+
+    PREFILTER_MIN_RELEVANCE = 0.25
+    """
+    Minimum share of the question's content words found in the crawled content, below it the question gets
+    a canned "not covered by the website" answer without a model call. 0 disables the relevance check.
+    """
+
+    MODEL_PROFILES = [
+        {"name": "gpt-4o-mini", "tier": 1, "max_context_tokens": 128000, "input_cost": 0.15, "output_cost": 0.60},
+        {"name": "gpt-4.1-mini", "tier": 2, "max_context_tokens": 1000000, "input_cost": 0.40, "output_cost": 1.60},
+        {"name": "gpt-4o", "tier": 3, "max_context_tokens": 128000, "input_cost": 2.50, "output_cost": 10.00},
+    ]
+    """
+    Models the router chooses from. Tier 1 answers simple questions, costs are USD per 1M tokens.
+    """
+
+    MODEL_COMPLEX_QUESTION_TIER = 2
+    """
+    Minimum tier for complex questions (comparisons, explanations, several questions at once).
+    """
+
+    MODEL_COMPLEX_QUESTION_WORDS = 30
+
+    MODEL_OUTPUT_TOKENS_RESERVE = 2000
+    """
+    Tokens left free in the context window for the answer when checking that the prompt fits.
+    """
+
+    MODEL_TIMEOUT = 30.0
+    """
+    Seconds to wait for one model before falling back to the next one in the chain. Within ASK_DEADLINE
+    a model gets at most an equal share of the time left with the models after it in the chain.
+    """
+
+    MODEL_CALL_THREADS = 32
+    """
+    Threads of the process-wide pool model calls run in (calls of all requests, hedged and abandoned ones).
+    """
+
+    MODEL_MAX_ERROR_RATE = 0.5
+    MODEL_MAX_LATENCY = 20.0
+    """
+    Models over the recent error rate or latency (seconds) are moved to the end of the fallback chain.
+    """
+
+    MODEL_RECOVERY_INTERVAL = 60.0
+    """
+    Seconds without calls after which a demoted model counts as healthy again and gets the next request.
+    """
+
+    MODEL_STATS_ALPHA = 0.2
+    """
+    Weight of the latest call in the moving averages of latency and error rate.
+    """
+
+    ASK_DEADLINE = float(os.getenv("ASK_DEADLINE", "15"))
+    """
+    Seconds /ask may take. When the model has not answered by then (or fails), the answer is built locally
+    from the most relevant passages of the crawled pages and marked degraded. 0 waits for the whole model chain.
+    """
+
+    ASK_HEDGE_DELAY = float(os.getenv("ASK_HEDGE_DELAY", "0")) or None
+    """
+    Seconds after which a model that has not answered gets a parallel request to the next model of the chain
+    (the same model when it is the only one), the first answer wins. Not set (0), no hedged requests are made.
+    """
+
+    ASK_FALLBACK_ENABLED = True
+    """
+    Answer with local passages instead of an error when the model misses the deadline or fails.
+    """
+
+    ASK_FALLBACK_PASSAGES = 3
+    ASK_FALLBACK_PASSAGE_CHARS = 300
+    """
+    Passages quoted in a degraded answer and their maximum length.
+    """
+
+    MAX_BATCH_QUESTIONS = 500
+    """
+    Maximum number of questions in one /ask/batch request.
+    """
+
+    BATCH_CONCURRENCY = 4
+    """
+    Questions of a batch answered in parallel (concurrent OpenAI requests), keep it under the API rate limit.
+    """
+
+    MAX_BATCH_CONCURRENCY = 16
+
+    CONVERSATION_HISTORY_TOKENS = 1000
+    """
+    Estimated tokens of conversation history sent with a follow-up question.
+    Older turns are folded into a rolling summary when history grows over it.
+    """
+
+    CONVERSATION_RECENT_TURNS = 2
+    """
+    Number of latest turns that are always sent verbatim and never summarized.
+    """
+
+    EMBEDDING_RETRIEVAL_ENABLED = os.getenv("EMBEDDING_RETRIEVAL_ENABLED", "false").lower() == "true"
+    """
+    Build chunk embedding index at crawl time and send only the most relevant chunks to the model.
+    """
+
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+    """
+    "openai" (multilingual embeddings API) or "hashing" (deterministic local stand-in, lexical only).
+    """
+
+    EMBEDDING_MODEL = "text-embedding-3-small"
+
+    EMBEDDING_INDEX_PATH = os.getenv("EMBEDDING_INDEX_PATH", "data/embeddings")
+    """
+    Path (without extension) of the memory-mapped embedding index shared by all workers.
+    """
+
+    EMBEDDING_QUANTIZE = False
+    """
+    Store embeddings as int8 with per-row scales, 4x smaller index for a small loss of precision.
+    """
+
+    EMBEDDING_CHUNK_SIZE = 800
+    EMBEDDING_CHUNK_OVERLAP = 100
+    """
+    Chunk size and overlap of neighbouring chunks in characters.
+    """
+
+    EMBEDDING_TOP_K = 8
+    """
+    Number of chunks sent to the model as context.
+    """
+
+    DIGEST_ENABLED = os.getenv("DIGEST_ENABLED", "false").lower() == "true"
+    """
+    Build a condensed digest of every page after the crawl, stored next to the page content and in the corpus snapshot.
+    """
+
+    DIGEST_PROVIDER = os.getenv("DIGEST_PROVIDER", "extractive")
+    """
+    "extractive" (local sentence selection) or "openai" (LLM summarization with DIGEST_MODEL).
+    """
+
+    DIGEST_MODEL = "gpt-4o-mini"
+
+    DIGEST_RATIO = 0.25
+    DIGEST_MAX_CHARS = 3000
+    """
+    Digest length as a share of the page content, capped at DIGEST_MAX_CHARS characters.
+    """
+
+    DIGEST_MIN_CHARS = 600
+    """
+    Pages shorter than this are sent verbatim, they get no digest.
+    """
+
+    ASK_USE_DIGESTS = os.getenv("ASK_USE_DIGESTS", "false").lower() == "true"
+    """
+    Default of /ask "use_digests": send page digests instead of full content when no retrieval index narrows it down.
+    """
+
+    FAQ_ENABLED = os.getenv("FAQ_ENABLED", "false").lower() == "true"
+    """
+    Precompute answers to popular questions after every crawl and serve /ask from them without a model call.
+    """
+
+    FAQ_QUESTIONS: list = []
+    FAQ_QUESTIONS_FILE = os.getenv("FAQ_QUESTIONS_FILE", "data/faq_questions.txt")
+    """
+    Questions that are always precomputed, configured and read from the file (one per line, "#" comments).
+    """
+
+    FAQ_MINED_QUESTIONS = 50
+    FAQ_MIN_ASKS = 3
+    FAQ_MINING_WINDOW = 5000
+    """
+    Most asked opening questions of conversations precomputed in addition, asked at least FAQ_MIN_ASKS times
+    among the latest FAQ_MINING_WINDOW conversations. 0 disables mining.
+    """
+
+    FAQ_RELOAD_INTERVAL = 30
+    """
+    Seconds after which a worker that found no precomputed answers for its corpus version looks again,
+    answers are stored a while after the snapshot is published.
+    """
+
     CHATGPT_MODEL = "gpt-4o-mini"
 
     MAX_QUESTION_LENGTH = 1000
@@ -30,7 +400,23 @@ class Settings:
     MAX_CONTENT_SIZE = 190000
     """
     Maximum total content size in characters across all crawled pages.
-    The crawler will stop when this limit is reached.
+    Only stored content is counted. The crawler will stop when this limit is reached.
+    """
+
+    MAX_CONTENT_TOKENS = None
+    """
+    Maximum total content size in estimated tokens (~4 characters per token), None to limit by characters only.
+    """
+
+    MAX_PAGE_CONTENT_SIZE = 20000
+    """
+    Maximum content size of a single page in characters, longer pages are truncated.
+    """
+
+    SECTION_CONTENT_QUOTAS: dict[str, int] = {}
+    """
+    Maximum content size in characters per site section (first URL path segment), e.g. {"blogi": 40000}.
+    Keeps large sections like blogs or news from taking the whole content budget.
     """
 
 settings = Settings()
@@ -0,0 +1,162 @@
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.models.conversation import Conversation, ConversationTurn
+
+
+class ConversationCrud:
+    def __init__(self, db):
+        """
+        Initialize ConversationCrud with a database session.
+
+        Args:
+            db: SQLAlchemy database session for executing queries
+        """
+        self.db = db
+
+    def create_conversation(self) -> Conversation:
+        """
+        Create a new empty conversation.
+
+        Returns:
+            Conversation
+
+        Raises:
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            conversation = Conversation()
+            self.db.add(conversation)
+            self.db.commit()
+            self.db.refresh(conversation)
+            return conversation
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[ConversationCrud] @create_conversation: Database error occurred")
+            raise
+
+    def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
+        """
+        Retrieve conversation by id.
+
+        Returns:
+            Conversation or None if conversation does not exist
+        """
+        try:
+            return self.db.query(Conversation).filter(Conversation.id == conversation_id).first()
+        except Exception:
+            print(f"[ConversationCrud] @get_conversation: Database error occurred")
+            raise
+
+    def get_turns(self, conversation_id: str, offset: int = 0) -> List[ConversationTurn]:
+        """
+        Retrieve turns of a conversation in the order they were asked.
+
+        Args:
+            conversation_id (str): Conversation id
+            offset (int): Number of oldest turns to skip, e.g. turns already folded into the summary
+
+        Returns:
+            List[ConversationTurn]
+        """
+        try:
+            return (
+                self.db.query(ConversationTurn)
+                .filter(ConversationTurn.conversation_id == conversation_id)
+                .order_by(ConversationTurn.id)
+                .offset(offset)
+                .all()
+            )
+        except Exception:
+            print(f"[ConversationCrud] @get_turns: Database error occurred")
+            raise
+
+    def get_first_questions(self, limit: int) -> List[str]:
+        """
+        Opening questions of the latest conversations, newest first. Follow-up questions are left out,
+        they only make sense with the conversation before them.
+
+        Args:
+            limit (int): Maximum number of questions
+
+        Returns:
+            List[str]
+        """
+        try:
+            first_turns = select(func.min(ConversationTurn.id)).group_by(ConversationTurn.conversation_id)
+            rows = (
+                self.db.query(ConversationTurn.question)
+                .filter(ConversationTurn.id.in_(first_turns))
+                .order_by(ConversationTurn.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [row[0] for row in rows]
+        except Exception:
+            print(f"[ConversationCrud] @get_first_questions: Database error occurred")
+            raise
+
+    def add_turn(self, conversation_id: str, question: str, answer: str, sources: List[str],
+                 input_tokens: int = 0, output_tokens: int = 0) -> ConversationTurn:
+        """
+        Append a question and its answer to a conversation.
+
+        Returns:
+            ConversationTurn
+
+        Raises:
+            ValueError: If the conversation does not exist
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            conversation = self.get_conversation(conversation_id)
+            if conversation is None:
+                raise ValueError(f"Conversation {conversation_id} not found")
+            turn = ConversationTurn(
+                conversation_id=conversation_id,
+                question=question,
+                answer=answer,
+                sources=list(sources),
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+            self.db.add(turn)
+            conversation.updated_at = func.now()
+            self.db.commit()
+            self.db.refresh(turn)
+            return turn
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[ConversationCrud] @add_turn: Database error occurred")
+            raise
+
+    def update_summary(self, conversation_id: str, summary: str, summarized_turns: int) -> Conversation:
+        """
+        Replace rolling summary after older turns were folded into it.
+
+        Args:
+            conversation_id (str): Conversation id
+            summary (str): New summary covering the first summarized_turns turns
+            summarized_turns (int): Number of turns covered by the summary
+
+        Returns:
+            Conversation
+
+        Raises:
+            ValueError: If the conversation does not exist
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            conversation = self.get_conversation(conversation_id)
+            if conversation is None:
+                raise ValueError(f"Conversation {conversation_id} not found")
+            conversation.summary = summary
+            conversation.summarized_turns = summarized_turns
+            self.db.commit()
+            self.db.refresh(conversation)
+            return conversation
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[ConversationCrud] @update_summary: Database error occurred")
+            raise
@@ -0,0 +1,123 @@
+import os
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.models.crawl_job import CrawlJob
+
+
+class CrawlJobCrud:
+    def __init__(self, db):
+        """
+        Initialize CrawlJobCrud with a database session.
+
+        Args:
+            db: SQLAlchemy database session for executing queries
+        """
+        self.db = db
+
+    def create_job(self, jobs_dir: str) -> CrawlJob:
+        """
+        Create a new running crawl job with its own JOBDIR inside jobs_dir.
+
+        Args:
+            jobs_dir (str): Directory where job directories are created
+
+        Returns:
+            CrawlJob
+
+        Raises:
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            job = CrawlJob(status=CrawlJob.RUNNING, job_dir=jobs_dir)
+            self.db.add(job)
+            self.db.flush()
+            job.job_dir = os.path.join(jobs_dir, f"job-{job.id}")
+            self.db.commit()
+            self.db.refresh(job)
+            return job
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[CrawlJobCrud] @create_job: Database error occurred")
+            raise
+
+    def get_job(self, job_id: int) -> Optional[CrawlJob]:
+        """
+        Retrieve crawl job by id.
+
+        Returns:
+            CrawlJob or None if job does not exist
+        """
+        try:
+            return self.db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+        except Exception:
+            print(f"[CrawlJobCrud] @get_job: Database error occurred")
+            raise
+
+    def get_resumable_job(self) -> Optional[CrawlJob]:
+        """
+        Retrieve the latest job that was not finished (interrupted cleanly or killed while running).
+
+        Returns:
+            CrawlJob or None if the last crawl was completed
+        """
+        try:
+            latest_id = self.db.query(func.max(CrawlJob.id)).scalar()
+            if latest_id is None:
+                return None
+            job = self.get_job(latest_id)
+            if job.status in (CrawlJob.RUNNING, CrawlJob.INTERRUPTED):
+                return job
+            return None
+        except Exception:
+            print(f"[CrawlJobCrud] @get_resumable_job: Database error occurred")
+            raise
+
+    def checkpoint(self, job_id: int, pages_stored: int, total_chars: int, status: Optional[str] = None) -> CrawlJob:
+        """
+        Save crawl progress. Finished and failed jobs get finished_at timestamp.
+
+        Args:
+            job_id (int): Crawl job id
+            pages_stored (int): Number of pages stored so far
+            total_chars (int): Number of content characters stored so far
+            status (str): New job status, keeps the current one if not given
+
+        Returns:
+            CrawlJob
+
+        Raises:
+            ValueError: If the job does not exist
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            job = self.get_job(job_id)
+            if job is None:
+                raise ValueError(f"Crawl job {job_id} not found")
+            job.pages_stored = pages_stored
+            job.total_chars = total_chars
+            if status:
+                job.status = status
+                if status in (CrawlJob.FINISHED, CrawlJob.FAILED):
+                    job.finished_at = func.now()
+            self.db.commit()
+            self.db.refresh(job)
+            return job
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[CrawlJobCrud] @checkpoint: Database error occurred")
+            raise
+
+    def set_status(self, job_id: int, status: str) -> CrawlJob:
+        """
+        Change job status keeping checkpointed counters.
+
+        Raises:
+            ValueError: If the job does not exist
+            SQLAlchemyError: If the database operation fails
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Crawl job {job_id} not found")
+        return self.checkpoint(job_id, job.pages_stored, job.total_chars, status)
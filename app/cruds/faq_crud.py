@@ -0,0 +1,64 @@
+from typing import List
+
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.models.faq_answer import FaqAnswer
+
+
+class FaqCrud:
+    def __init__(self, db):
+        """
+        Initialize FaqCrud with a database session.
+
+        Args:
+            db: SQLAlchemy database session for executing queries
+        """
+        self.db = db
+
+    def get_answers(self, corpus_version: int) -> List[FaqAnswer]:
+        """
+        Retrieve precomputed answers of a corpus version.
+
+        Returns:
+            List[FaqAnswer]
+        """
+        try:
+            return self.db.query(FaqAnswer).filter(FaqAnswer.corpus_version == corpus_version).all()
+        except Exception:
+            print(f"[FaqCrud] @get_answers: Database error occurred")
+            raise
+
+    def get_latest_answers(self) -> List[FaqAnswer]:
+        """
+        Retrieve answers of the newest corpus version that has any.
+
+        Returns:
+            List[FaqAnswer]
+        """
+        try:
+            latest = self.db.query(FaqAnswer.corpus_version).order_by(FaqAnswer.corpus_version.desc()).first()
+            return self.get_answers(latest[0]) if latest else []
+        except Exception:
+            print(f"[FaqCrud] @get_latest_answers: Database error occurred")
+            raise
+
+    def replace_answers(self, corpus_version: int, answers: List[FaqAnswer]) -> int:
+        """
+        Store answers of a corpus version and delete answers of all other versions in one transaction.
+
+        Returns:
+            int: Number of stored answers
+
+        Raises:
+            SQLAlchemyError: If the database operation fails, the transaction is rolled back
+        """
+        try:
+            self.db.query(FaqAnswer).delete()
+            for answer in answers:
+                answer.corpus_version = corpus_version
+                self.db.add(answer)
+            self.db.commit()
+            return len(answers)
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[FaqCrud] @replace_answers: Database error occurred")
+            raise
@@ -1,7 +1,16 @@
-from typing import List
+import re
+from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy import func, text
 from sqlalchemy.exc import SQLAlchemyError
 from app.db.models.page import Page
+from app.db.models.page_schedule import PageHistory, PageSchedule
+from app.db.search_index import search_config
+from app.dtos.search_response import SearchResult
+
+
+SNIPPET_START = "<b>"
+SNIPPET_STOP = "</b>"
 
 
 class PageCrud:
@@ -45,6 +54,45 @@ class PageCrud:
             print(f"[PageCrud] @add_page: Database error occurred")
             raise
 
+    def upsert_page(self, url: str, content: str):
+        """
+        Insert a page or replace content of the stored page with the same URL in one statement
+        (INSERT ... ON CONFLICT on PostgreSQL and SQLite). Digest of replaced content is cleared.
+
+        Args:
+            url (str): The URL of the crawled page (must not be empty)
+            content (str): The extracted text content from the page
+
+        Raises:
+            ValueError: If the URL is not valid
+            SQLAlchemyError: If the database operation fails
+        """
+        if not url or not url.strip():
+            raise ValueError("URL cannot be empty")
+
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                statement = insert(Page).values(url=url, content=content).on_conflict_do_update(
+                    index_elements=[Page.url], set_={"content": content, "digest": None})
+                self.db.execute(statement)
+            else:
+                page = self.db.query(Page).filter(Page.url == url).first()
+                if page is None:
+                    self.db.add(Page(url=url, content=content))
+                else:
+                    page.content = content
+                    page.digest = None
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[PageCrud] @upsert_page: Database error occurred")
+            raise
+
     def get_all_pages(self) -> List[Page]:
         """
         Retrieve all pages from the database.
@@ -61,9 +109,167 @@ class PageCrud:
             print(f"[PageCrud] @get_all_pages: Database error occurred")
             raise
 
+    def get_all_urls(self) -> List[str]:
+        """
+        Retrieve URLs of all stored pages without loading their content.
+
+        Returns:
+            List[str]
+
+        Raises:
+            Exception: If the database query fails
+        """
+        try:
+            return [url for (url,) in self.db.query(Page.url).all()]
+        except Exception:
+            print(f"[PageCrud] @get_all_urls: Database error occurred")
+            raise
+
+    def get_all_digests(self) -> Dict[str, str]:
+        """
+        Retrieve digests of pages that have one, without loading their content.
+
+        Returns:
+            Dict[str, str]: {"https://example.com": "Digest..."}
+
+        Raises:
+            Exception: If the database query fails
+        """
+        try:
+            return dict(self.db.query(Page.url, Page.digest).filter(Page.digest.isnot(None)).all())
+        except Exception:
+            print(f"[PageCrud] @get_all_digests: Database error occurred")
+            raise
+
+    def update_digests(self, digests: Dict[str, Optional[str]]) -> int:
+        """
+        Store page digests, None clears the digest of a page.
+
+        Args:
+            digests (Dict[str, Optional[str]]): {"https://example.com": "Digest..."}
+
+        Returns:
+            int: Number of updated pages
+
+        Raises:
+            SQLAlchemyError: If the update fails, the transaction is rolled back
+        """
+        try:
+            updated = 0
+            for url, digest in digests.items():
+                updated += self.db.query(Page).filter(Page.url == url).update(
+                    {Page.digest: digest}, synchronize_session=False)
+            self.db.commit()
+            return updated
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[PageCrud] @update_digests: Database error occurred")
+            raise
+
+    def get_content_stats(self) -> Tuple[int, int]:
+        """
+        Count stored pages and total length of their content.
+
+        Returns:
+            Tuple[int, int]: (pages count, total content characters)
+
+        Raises:
+            Exception: If the database query fails
+        """
+        try:
+            count, chars = self.db.query(func.count(Page.id), func.coalesce(func.sum(func.length(Page.content)), 0)).one()
+            return count, chars
+        except Exception:
+            print(f"[PageCrud] @get_content_stats: Database error occurred")
+            raise
+
+    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+        """
+        Full-text search over page content, all words of the query must match.
+        Uses tsvector/GIN index on PostgreSQL and FTS5 on SQLite, other databases get a LIKE scan.
+
+        Args:
+            query (str): Search query in free form, punctuation and operators are ignored
+            limit (int): Maximum number of results
+
+        Returns:
+            List[SearchResult]: Best matching pages first, snippets highlight matches with <b></b>
+
+        Raises:
+            Exception: If the database query fails
+        """
+        words = re.findall(r"\w+", query or "")
+        if not words:
+            return []
+
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect == "postgresql":
+                rows = self._search_postgresql(" ".join(words), limit)
+            elif dialect == "sqlite":
+                rows = self._search_sqlite(words, limit)
+            else:
+                rows = self._search_like(words, limit)
+            return [SearchResult(url=url, snippet=snippet, rank=rank) for url, snippet, rank in rows]
+        except Exception:
+            print(f"[PageCrud] @search: Database error occurred")
+            raise
+
+    def _search_postgresql(self, query: str, limit: int):
+        config = search_config()
+        return self.db.execute(text(
+            f"SELECT url, "
+            f"ts_headline('{config}'::regconfig, content, query, "
+            f"'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MinWords=10, MaxWords=30'), "
+            f"ts_rank_cd(search_vector, query) AS rank "
+            f"FROM pages, websearch_to_tsquery('{config}'::regconfig, :query) AS query "
+            f"WHERE search_vector @@ query "
+            f"ORDER BY rank DESC LIMIT :limit"
+        ), {"query": query, "limit": limit}).all()
+
+    def _search_sqlite(self, words: List[str], limit: int):
+        match = " ".join(f'"{word}"' for word in words)
+        return self.db.execute(text(
+            f"SELECT pages.url, "
+            f"snippet(pages_fts, 1, '{SNIPPET_START}', '{SNIPPET_STOP}', '...', 24), "
+            f"-bm25(pages_fts) AS rank "
+            f"FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+            f"WHERE pages_fts MATCH :match "
+            f"ORDER BY rank DESC LIMIT :limit"
+        ), {"match": match, "limit": limit}).all()
+
+    def _search_like(self, words: List[str], limit: int):
+        """
+        Scan of page content for databases without a full-text index. Pages are ranked by
+        the number of occurrences of query words.
+        """
+        conditions = [Page.content.ilike(f"%{self._escape_like(word)}%", escape="\\") for word in words]
+        pages = self.db.query(Page.url, Page.content).filter(*conditions).all()
+        pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+        rows = [(url, self._like_snippet(content, pattern), len(pattern.findall(content))) for url, content in pages]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:limit]
+
+    @staticmethod
+    def _escape_like(word: str) -> str:
+        return word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def _like_snippet(content: str, pattern, words: int = 24) -> str:
+        """
+        Words around the first match with matches highlighted, like the FTS5 snippet.
+        """
+        tokens = content.split()
+        first = next((i for i, token in enumerate(tokens) if pattern.search(token)), 0)
+        start = max(first - words // 2, 0)
+        snippet = " ".join(tokens[start:start + words])
+        snippet = pattern.sub(lambda match: f"{SNIPPET_START}{match.group(0)}{SNIPPET_STOP}", snippet)
+        return ("..." if start > 0 else "") + snippet + ("..." if start + words < len(tokens) else "")
+
     def delete_all_pages(self):
         """
-        Delete all pages from the database.
+        Delete all pages from the database, together with their revisit schedules and history
+        so the revisit spider does not bring back pages a fresh crawl never stored.
 
         Returns:
             None
@@ -74,6 +280,8 @@ class PageCrud:
         """
         try:
 
+            self.db.query(PageHistory).delete()
+            self.db.query(PageSchedule).delete()
             self.db.query(Page).delete()
             self.db.commit()
             return None
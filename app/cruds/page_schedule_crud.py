@@ -0,0 +1,144 @@
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.models.page_schedule import PageHistory, PageSchedule
+
+
+class PageScheduleCrud:
+    def __init__(self, db):
+        """
+        Initialize PageScheduleCrud with a database session.
+
+        Args:
+            db: SQLAlchemy database session for executing queries
+        """
+        self.db = db
+
+    def get_schedule(self, url: str) -> Optional[PageSchedule]:
+        """
+        Retrieve revisit schedule of a page.
+
+        Returns:
+            PageSchedule or None if the page was never checked
+        """
+        try:
+            return self.db.query(PageSchedule).filter(PageSchedule.url == url).first()
+        except Exception:
+            print(f"[PageScheduleCrud] @get_schedule: Database error occurred")
+            raise
+
+    def save_schedule(self, schedule: PageSchedule) -> PageSchedule:
+        """
+        Insert or update a schedule.
+
+        Raises:
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            self.db.add(schedule)
+            self.db.commit()
+            self.db.refresh(schedule)
+            return schedule
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[PageScheduleCrud] @save_schedule: Database error occurred")
+            raise
+
+    def get_queue(self, limit: int, due_before: Optional[float] = None) -> List[PageSchedule]:
+        """
+        Schedules ordered by next revisit time, most overdue first.
+
+        Args:
+            limit (int): Maximum number of schedules
+            due_before (float): Only schedules due at or before this Unix time, all when None
+
+        Returns:
+            List[PageSchedule]
+        """
+        try:
+            query = self.db.query(PageSchedule)
+            if due_before is not None:
+                query = query.filter(PageSchedule.next_due_at <= due_before)
+            return query.order_by(PageSchedule.next_due_at, PageSchedule.id).limit(limit).all()
+        except Exception:
+            print(f"[PageScheduleCrud] @get_queue: Database error occurred")
+            raise
+
+    def get_revisits_per_hour(self) -> float:
+        """
+        Revisits per hour all schedules ask for at their desired intervals.
+        """
+        try:
+            return float(self.db.query(func.coalesce(func.sum(3600.0 / PageSchedule.interval), 0)).scalar())
+        except Exception:
+            print(f"[PageScheduleCrud] @get_revisits_per_hour: Database error occurred")
+            raise
+
+    def count_schedules(self) -> int:
+        try:
+            return self.db.query(func.count(PageSchedule.id)).scalar()
+        except Exception:
+            print(f"[PageScheduleCrud] @count_schedules: Database error occurred")
+            raise
+
+    def add_history(self, url: str, content_hash: Optional[str], status: int, changed: bool,
+                    checked_at: float) -> PageHistory:
+        """
+        Store the outcome of a check.
+
+        Raises:
+            SQLAlchemyError: If the database operation fails
+        """
+        try:
+            entry = PageHistory(url=url, content_hash=content_hash, status=status, changed=changed,
+                                checked_at=checked_at)
+            self.db.add(entry)
+            self.db.commit()
+            return entry
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[PageScheduleCrud] @add_history: Database error occurred")
+            raise
+
+    def get_history(self, url: str, limit: int) -> List[PageHistory]:
+        """
+        Latest checks of a page, oldest first.
+
+        Returns:
+            List[PageHistory]
+        """
+        try:
+            entries = (
+                self.db.query(PageHistory)
+                .filter(PageHistory.url == url)
+                .order_by(PageHistory.checked_at.desc(), PageHistory.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return list(reversed(entries))
+        except Exception:
+            print(f"[PageScheduleCrud] @get_history: Database error occurred")
+            raise
+
+    def prune_history(self, url: str, keep: int):
+        """
+        Delete all but the latest `keep` checks of a page.
+
+        Raises:
+            SQLAlchemyError: If the delete fails, the transaction is rolled back
+        """
+        try:
+            kept = (
+                select(PageHistory.id)
+                .where(PageHistory.url == url)
+                .order_by(PageHistory.checked_at.desc(), PageHistory.id.desc())
+                .limit(keep)
+            )
+            self.db.query(PageHistory).filter(PageHistory.url == url, PageHistory.id.not_in(kept)) \
+                .delete(synchronize_session=False)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[PageScheduleCrud] @prune_history: Database error occurred")
+            raise
@@ -0,0 +1,91 @@
+from typing import List
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.models.usage_record import UsageRecord
+
+
+class UsageCrud:
+    def __init__(self, db):
+        """
+        Initialize UsageCrud with a database session.
+
+        Args:
+            db: SQLAlchemy database session for executing queries
+        """
+        self.db = db
+
+    def add_records(self, records: List[dict]) -> int:
+        """
+        Insert ledger records in one statement and transaction.
+
+        Args:
+            records (List[dict]): Column values of UsageRecord
+
+        Returns:
+            int: Number of inserted records
+
+        Raises:
+            SQLAlchemyError: If the database operation fails, the transaction is rolled back
+        """
+        if not records:
+            return 0
+        try:
+            self.db.execute(insert(UsageRecord), records)
+            self.db.commit()
+            return len(records)
+        except SQLAlchemyError:
+            self.db.rollback()
+            print(f"[UsageCrud] @add_records: Database error occurred")
+            raise
+
+    def get_records_since(self, since: float) -> List[UsageRecord]:
+        """
+        Retrieve records created at or after a Unix time, oldest first.
+
+        Returns:
+            List[UsageRecord]
+        """
+        try:
+            return (
+                self.db.query(UsageRecord)
+                .filter(UsageRecord.created_at >= since)
+                .order_by(UsageRecord.created_at)
+                .all()
+            )
+        except Exception:
+            print(f"[UsageCrud] @get_records_since: Database error occurred")
+            raise
+
+    def get_costly_questions(self, since: float, limit: int) -> List[dict]:
+        """
+        Questions with the highest total cost since a Unix time, rephrasings grouped by normalized question.
+
+        Returns:
+            List[dict]: normalized, question (one of its phrasings), requests, input_tokens, output_tokens, cost
+        """
+        try:
+            cost = func.sum(UsageRecord.cost)
+            rows = (
+                self.db.query(
+                    UsageRecord.normalized,
+                    func.max(UsageRecord.question),
+                    func.count(UsageRecord.id),
+                    func.sum(UsageRecord.input_tokens),
+                    func.sum(UsageRecord.output_tokens),
+                    cost,
+                )
+                .filter(UsageRecord.created_at >= since)
+                .group_by(UsageRecord.normalized)
+                .order_by(cost.desc(), UsageRecord.normalized)
+                .limit(limit)
+                .all()
+            )
+            return [
+                {"normalized": normalized, "question": question, "requests": requests,
+                 "input_tokens": input_tokens, "output_tokens": output_tokens, "cost": total_cost}
+                for normalized, question, requests, input_tokens, output_tokens, total_cost in rows
+            ]
+        except Exception:
+            print(f"[UsageCrud] @get_costly_questions: Database error occurred")
+            raise
@@ -1,8 +1,61 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+def create_database_engine(url: str) -> Engine:
+    """
+    Engine for DATABASE_URL. A file SQLite database (embedded mode) is tuned for one API process and
+    the crawler subprocess sharing it: WAL journal so reads never wait for the crawler's writes,
+    synchronous=NORMAL (durable at checkpoints, safe with WAL), memory-mapped reads and a busy timeout
+    so concurrent writers queue up instead of failing.
+    """
+    database_url = make_url(url)
+    if database_url.get_backend_name() != "sqlite":
+        return create_engine(url)
+
+    in_memory = database_url.database in (None, "", ":memory:")
+    engine = create_engine(url, connect_args={
+        # Sessions are created in the event loop and used in threadpool workers
+        "check_same_thread": False,
+        "timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "cached_statements": settings.SQLITE_STATEMENT_CACHE_SIZE,
+    })
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # Transactions are begun by SQLAlchemy (see begin below), not by the sqlite3 module
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        # sqlite_begin="IMMEDIATE" takes the write lock up front, like SELECT ... FOR UPDATE on PostgreSQL
+        mode = connection.get_execution_options().get("sqlite_begin", "DEFERRED")
+        connection.exec_driver_sql(f"BEGIN {mode}")
+
+    return engine
+
+
+def create_database_directory(url: str):
+    """
+    Creates the directory of a file SQLite database, called on startup rather than on import.
+    """
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite" and database_url.database not in (None, "", ":memory:"):
+        Path(database_url.database).parent.mkdir(parents=True, exist_ok=True)
+
+
+engine = create_database_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -13,4 +66,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
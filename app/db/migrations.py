@@ -0,0 +1,38 @@
+from sqlalchemy import inspect, text
+
+
+# ============================================================================
+# Schema upgrades that create_all does not do. Columns added to existing
+# models are added to existing tables on startup, the project has no
+# migration tool, so every upgrade here must be safe to run repeatedly.
+# ============================================================================
+
+
+def add_missing_columns(connection, metadata):
+    """
+    Add nullable columns of the models that are missing from already existing tables.
+
+    Args:
+        connection: SQLAlchemy connection
+        metadata: MetaData of the models (Base.metadata)
+
+    Returns:
+        list[str]: Added columns as "table.column"
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                print(f"[Migrations] @add_missing_columns: {table.name}.{column.name} is not nullable, add it manually")
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f"{table.name}.{column.name}")
+    return added
@@ -0,0 +1,71 @@
+import uuid
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
+
+from app.db.database import Base
+
+
+class Conversation(Base):
+    """
+    Conversation ORM model that is used to keep multi-turn chat history on the server.
+    Attributes:
+        id (str): Primary key, random hex identifier that is not guessable
+        summary (str): Rolling summary of turns that no longer fit the history token budget
+        summarized_turns (int): Number of oldest turns folded into summary, they are not sent verbatim anymore
+        created_at (datetime): Timestamp when the conversation was started
+        updated_at (datetime): Timestamp of the last turn
+    """
+    __tablename__ = "conversations"
+
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    summary = Column(String, nullable=False, default="")
+    summarized_turns = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "summary": self.summary,
+            "summarized_turns": self.summarized_turns,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class ConversationTurn(Base):
+    """
+    ConversationTurn ORM model that is used to store a question and its answer within a conversation.
+    Attributes:
+        id (int): Primary key, auto-incremented, orders turns of a conversation
+        conversation_id (str): Conversation the turn belongs to
+        question (str): The user's question
+        answer (str): Generated answer
+        sources (list[str]): URLs the answer was based on, reused as context for follow-up questions
+        input_tokens (int): Tokens consumed by the request
+        output_tokens (int): Tokens generated in the response
+        created_at (datetime): Timestamp when the turn was stored
+    """
+    __tablename__ = "conversation_turns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(String(32), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False,
+                             index=True)
+    question = Column(String, nullable=False)
+    answer = Column(String, nullable=False)
+    sources = Column(JSON, nullable=False, default=list)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "conversation_id": self.conversation_id,
+            "question": self.question,
+            "answer": self.answer,
+            "sources": self.sources,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+
+from app.db.database import Base
+
+
+class CrawlJob(Base):
+    """
+    CrawlJob ORM model that is used to track crawl progress, so interrupted crawls can be resumed.
+    Attributes:
+        id (int): Primary key, auto-incremented unique identifier
+        status (str): One of CrawlJob.RUNNING, CrawlJob.INTERRUPTED, CrawlJob.FINISHED, CrawlJob.FAILED
+                     RUNNING job found on application start means that crawler process was killed
+        job_dir (str): Scrapy JOBDIR with persisted request queue and dupefilter state
+        pages_stored (int): Checkpointed number of stored pages
+        total_chars (int): Checkpointed number of stored content characters
+        started_at (datetime): Timestamp when the job was created
+        updated_at (datetime): Timestamp of the last checkpoint
+        finished_at (datetime): Timestamp when the job was finished or failed
+    """
+    __tablename__ = "crawl_jobs"
+
+    RUNNING = "running"
+    INTERRUPTED = "interrupted"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default=RUNNING, index=True)
+    job_dir = Column(String, nullable=False)
+    pages_stored = Column(Integer, nullable=False, default=0)
+    total_chars = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "job_dir": self.job_dir,
+            "pages_stored": self.pages_stored,
+            "total_chars": self.total_chars,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,48 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, JSON, String, UniqueConstraint, func
+
+from app.db.database import Base
+
+
+class FaqAnswer(Base):
+    """
+    FaqAnswer ORM model that is used to store answers to popular questions, precomputed after a crawl.
+    Attributes:
+        id (int): Primary key, auto-incremented unique identifier
+        corpus_version (int): Version of the corpus snapshot the answer was computed from, answers are served
+                              only while workers serve the same version
+        normalized (str): Normalized question (see faq_service.normalize_question), lookup key
+        question (str): The question as configured or most often asked
+        answer (str): Generated answer
+        sources (list[str]): URLs the answer was based on
+        model (str): Model that answered
+        input_tokens (int): Tokens consumed when the answer was computed
+        output_tokens (int): Tokens generated when the answer was computed
+        created_at (datetime): Timestamp when the answer was stored
+    """
+    __tablename__ = "faq_answers"
+    __table_args__ = (UniqueConstraint("corpus_version", "normalized"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    corpus_version = Column(BigInteger, nullable=False, index=True)
+    normalized = Column(String, nullable=False)
+    question = Column(String, nullable=False)
+    answer = Column(String, nullable=False)
+    sources = Column(JSON, nullable=False, default=list)
+    model = Column(String, nullable=True)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "corpus_version": self.corpus_version,
+            "normalized": self.normalized,
+            "question": self.question,
+            "answer": self.answer,
+            "sources": self.sources,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, func, event
 
 from app.db.database import Base
+from app.db.search_index import create_search_index
 
 
 class Page(Base):
@@ -13,14 +14,20 @@ class Page(Base):
                   Must be unique across all pages
         content (str): Extracted and cleaned text content from the page
                       Excludes scripts, styles, and other non-text elements
+        digest (str): Condensed version of the content built after the crawl (see DigestService),
+                      None for short pages and before digests are built
         created_at (datetime): Timestamp when the page was stored in the database
                               Automatically set to current time on creation
+
+    Full-text search index (search_vector column on PostgreSQL, pages_fts table on SQLite)
+    is created with the table, see app/db/search_index.py
     """
     __tablename__ = "pages"
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, unique=True, index=True, nullable=False)
     content = Column(String, nullable=False)
+    digest = Column(String, nullable=True)
     created_at = Column(DateTime, default=func.now())
 
     def to_dict(self):
@@ -28,5 +35,9 @@ class Page(Base):
             "id": self.id,
             "url": self.url,
             "content": self.content,
+            "digest": self.digest,
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
+
+
+event.listen(Page.__table__, "after_create", lambda target, connection, **kw: create_search_index(connection))
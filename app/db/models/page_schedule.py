@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, Float, Integer, String
+
+from app.db.database import Base
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+class PageSchedule(Base):
+    """
+    PageSchedule ORM model that is used to plan revisits of crawled pages.
+    Times are Unix timestamps, the scheduler does arithmetic on them.
+    Attributes:
+        id (int): Primary key, auto-incremented unique identifier
+        url (str): Canonical URL of the page, same as pages.url
+        content_hash (str): Hash of the content seen on the last successful check
+        change_rate (float): Estimated content changes per day, None until the page was checked twice
+        interval (float): Desired seconds between revisits, derived from change_rate
+        checks (int): Number of checks
+        changes (int): Number of checks that found changed content
+        last_checked_at (float): Unix time of the last check
+        last_changed_at (float): Unix time of the last check that found changed content
+        next_due_at (float): Unix time the page should be revisited at
+    """
+    __tablename__ = "page_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True, nullable=False)
+    content_hash = Column(String, nullable=True)
+    change_rate = Column(Float, nullable=True)
+    interval = Column(Float, nullable=False)
+    checks = Column(Integer, nullable=False, default=0)
+    changes = Column(Integer, nullable=False, default=0)
+    last_checked_at = Column(Float, nullable=True)
+    last_changed_at = Column(Float, nullable=True)
+    next_due_at = Column(Float, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "change_rate": self.change_rate,
+            "interval": self.interval,
+            "checks": self.checks,
+            "changes": self.changes,
+            "last_checked_at": _isoformat(self.last_checked_at),
+            "last_changed_at": _isoformat(self.last_changed_at),
+            "next_due_at": _isoformat(self.next_due_at),
+        }
+
+
+class PageHistory(Base):
+    """
+    PageHistory ORM model that is used to store the outcome of every check of a page,
+    change rate of the page is estimated from it.
+    Attributes:
+        id (int): Primary key, auto-incremented unique identifier
+        url (str): Canonical URL of the page
+        content_hash (str): Hash of the fetched content, None when the fetch failed
+        status (int): HTTP status of the response, 0 when no response was received
+        changed (bool): Content differs from the previous successful check
+        checked_at (float): Unix time of the check
+    """
+    __tablename__ = "page_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, index=True, nullable=False)
+    content_hash = Column(String, nullable=True)
+    status = Column(Integer, nullable=False, default=0)
+    changed = Column(Boolean, nullable=False, default=False)
+    checked_at = Column(Float, nullable=False, index=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Float
+
+from app.db.database import Base
+
+
+class RateLimitBucket(Base):
+    """
+    RateLimitBucket ORM model that is used to share token buckets between worker processes.
+    Attributes:
+        key (str): Primary key, "<rule>:<unit>:<client>"
+        tokens (float): Tokens left at updated_at, negative when the client is in debt
+        updated_at (float): Unix time of the last update, tokens are refilled from it
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, Float, Integer, String
+
+from app.db.database import Base
+
+
+class UsageRecord(Base):
+    """
+    UsageRecord ORM model that is used to keep a ledger of answered questions, their token usage and cost.
+    Times are Unix timestamps, aggregation buckets them by hour or day.
+    Attributes:
+        id (int): Primary key, auto-incremented unique identifier
+        created_at (float): Unix time the question was answered
+        endpoint (str): "ask", "ask_batch" or "conversation"
+        question (str): The question as asked
+        normalized (str): Normalized question (see faq_service.normalize_question), groups rephrasings
+        model (str): Model that answered, None for precomputed, prefiltered and degraded answers
+        input_tokens (int): Tokens sent to the model
+        output_tokens (int): Tokens generated by the model
+        cost (float): USD cost by the MODEL_PROFILES prices, 0 for unknown models
+        latency (float): Seconds spent answering
+        cached (bool): Answered from precomputed FAQ answers
+        degraded (bool): Answered with local passages because the model missed the deadline or failed
+        sources (int): Number of source URLs in the answer
+    """
+    __tablename__ = "usage_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(Float, nullable=False, index=True)
+    endpoint = Column(String, nullable=False)
+    question = Column(String, nullable=False)
+    normalized = Column(String, nullable=False)
+    model = Column(String, nullable=True)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0.0)
+    latency = Column(Float, nullable=False)
+    cached = Column(Boolean, nullable=False, default=False)
+    degraded = Column(Boolean, nullable=False, default=False)
+    sources = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+            "endpoint": self.endpoint,
+            "question": self.question,
+            "normalized": self.normalized,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": self.cost,
+            "latency": self.latency,
+            "cached": self.cached,
+            "degraded": self.degraded,
+            "sources": self.sources,
+        }
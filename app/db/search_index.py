@@ -0,0 +1,80 @@
+import re
+
+from sqlalchemy import text
+
+from app.config import settings
+
+
+# ============================================================================
+# Full-text search index over pages. PostgreSQL uses a generated tsvector
+# column with GIN index, SQLite (tests, embedded deployments) uses an FTS5
+# external content table kept in sync by triggers.
+# ============================================================================
+
+
+def search_config() -> str:
+    """
+    PostgreSQL text search configuration from settings. It is a part of DDL, so only plain names are accepted.
+
+    Raises:
+        ValueError: If SEARCH_LANGUAGE is not a valid configuration name
+    """
+    config = settings.SEARCH_LANGUAGE
+    if not re.fullmatch(r"[a-z_]+", config or ""):
+        raise ValueError(f"Invalid SEARCH_LANGUAGE: {config}")
+    return config
+
+
+def create_search_index(connection):
+    """
+    Create search index for pages table if it does not exist. Safe to call on every startup.
+
+    Args:
+        connection: SQLAlchemy connection
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        _create_postgresql_index(connection)
+    elif dialect == "sqlite":
+        _create_sqlite_index(connection)
+    else:
+        print(f"[SearchIndex] @create_search_index: No full-text index on {dialect}, search scans page content")
+
+
+def _create_postgresql_index(connection):
+    config = search_config()
+    connection.execute(text(
+        "ALTER TABLE pages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{config}'::regconfig, coalesce(content, ''))) STORED"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_pages_search_vector ON pages USING GIN (search_vector)"
+    ))
+
+
+def _create_sqlite_index(connection):
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pages_fts'"
+    )).first()
+    if exists:
+        return
+
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE pages_fts USING fts5("
+        "url, content, content='pages', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(
+        "CREATE TRIGGER pages_fts_insert AFTER INSERT ON pages BEGIN "
+        "INSERT INTO pages_fts(rowid, url, content) VALUES (new.id, new.url, new.content); END"
+    ))
+    connection.execute(text(
+        "CREATE TRIGGER pages_fts_delete AFTER DELETE ON pages BEGIN "
+        "INSERT INTO pages_fts(pages_fts, rowid, url, content) VALUES ('delete', old.id, old.url, old.content); END"
+    ))
+    connection.execute(text(
+        "CREATE TRIGGER pages_fts_update AFTER UPDATE ON pages BEGIN "
+        "INSERT INTO pages_fts(pages_fts, rowid, url, content) VALUES ('delete', old.id, old.url, old.content); "
+        "INSERT INTO pages_fts(rowid, url, content) VALUES (new.id, new.url, new.content); END"
+    ))
+    # Index pages that were stored before the index existed
+    connection.execute(text("INSERT INTO pages_fts(pages_fts) VALUES ('rebuild')"))
@@ -1,5 +1,11 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class AskRequest(BaseModel):
     question: str
+    use_digests: Optional[bool] = None
+    """
+    Send page digests instead of full page content, ASK_USE_DIGESTS setting when not given.
+    """
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class Usage(BaseModel):
@@ -11,3 +13,6 @@ class AskFormat(BaseModel):
 
 class AskResponse(AskFormat):
     usage: Usage
+    model: Optional[str] = None
+    degraded: bool = False
+    cached: bool = False
@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.config import settings
+
+
+class AskBatchRequest(BaseModel):
+    questions: list[str] = Field(min_length=1, max_length=settings.MAX_BATCH_QUESTIONS)
+    concurrency: Optional[int] = Field(None, ge=1, le=settings.MAX_BATCH_CONCURRENCY)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.dtos.ask_response import AskResponse, Usage
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    question: str
+    result: Optional[AskResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSummary(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    usage: Usage
+
+
+class BatchSummaryLine(BaseModel):
+    summary: BatchSummary
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+from app.dtos.ask_response import AskResponse
+
+
+class ConversationResponse(BaseModel):
+    id: str
+
+
+class ConversationAskResponse(AskResponse):
+    conversation_id: str
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    label: str
+    started_at: str
+    duration: Optional[float]
+    samples: int
+    running: bool
+
+
+class ProfileFunction(BaseModel):
+    function: str
+    self_samples: int
+    total_samples: int
+    self_share: float
+    total_share: float
+
+
+class ProfileResponse(ProfileSummary):
+    functions: list[ProfileFunction]
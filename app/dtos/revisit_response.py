@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RevisitQueueItem(BaseModel):
+    url: str
+    change_rate: Optional[float]
+    interval: float
+    checks: int
+    changes: int
+    last_checked_at: Optional[str]
+    last_changed_at: Optional[str]
+    next_due_at: str
+    overdue: bool
+
+
+class RevisitQueueResponse(BaseModel):
+    pages: int
+    requests_per_hour: int
+    demand_per_hour: float
+    budget_factor: float
+    batch_size: int
+    queue: list[RevisitQueueItem]
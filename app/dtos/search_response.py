@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    url: str
+    snippet: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: list[SearchResult]
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class UsageStats(BaseModel):
+    requests: int
+    input_tokens: int
+    output_tokens: int
+    cost: float
+    cached: int
+    degraded: int
+    latency_p50: Optional[float]
+    latency_p95: Optional[float]
+    latency_p99: Optional[float]
+
+
+class UsageBucket(UsageStats):
+    start: str
+
+
+class UsageWriterStats(BaseModel):
+    buffered: int
+    written: int
+    dropped: int
+
+
+class UsageReportResponse(BaseModel):
+    period: str
+    since: str
+    total: UsageStats
+    buckets: list[UsageBucket]
+    writer: UsageWriterStats
+
+
+class CostlyQuestion(BaseModel):
+    normalized: str
+    question: str
+    requests: int
+    input_tokens: int
+    output_tokens: int
+    cost: float
+    cost_per_request: float
@@ -1,25 +1,87 @@
+import threading
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from app.api.routes import info
-from app.db.database import engine, Base
-from app.services.crawler_service import CrawlerService
+from app.api.routes import admin, conversation, health, info
+from app.config import settings
+from app.db.database import Base, create_database_directory, engine
+from app.db.migrations import add_missing_columns
+from app.db.search_index import create_search_index
+from app.middleware import ProfilingMiddleware, RateLimitMiddleware
+from app.services.usage_ledger import get_usage_ledger
 
 # ============================================================================
-# Application entry point. Initialises database tables, starts crawler(once),
-# launches fast api server
+# Application entry point. Startup work (database tables, crawler, warm-up)
+# runs in the lifespan, so importing this module has no side effects
 # ============================================================================
 
-Base.metadata.create_all(bind=engine)
-crawler_service = CrawlerService()
 
-app = FastAPI(title="tehniliseintellekt.ee web chat api", version="1.0.0")
+def init_database():
+    """
+    Creates the embedded database directory, missing tables, columns added to existing tables
+    and the full-text search index.
+    """
+    create_database_directory(settings.DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for column in add_missing_columns(connection, Base.metadata):
+            print(f"[main] @init_database: added column {column}")
+        create_search_index(connection)
+
+
+def warm_up(app: FastAPI):
+    """
+    Loads heavy modules and caches in the background, so the first question does not pay for them.
+    /ready reports ready only after it has finished.
+    """
+    started = time.perf_counter()
+    try:
+        import openai  # noqa: F401
+
+        if settings.EMBEDDING_RETRIEVAL_ENABLED:
+            from app.services.embedding_service import EmbeddingService
+            EmbeddingService().load_index()
+        app.state.warm = True
+        print(f"[main] @warm_up: done in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        print(f"[main] @warm_up: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    app.state.warm = False
+    init_database()
+
+    if settings.SKIP_CRAWL:
+        print("[main] SKIP_CRAWL is set, crawler is not started")
+    else:
+        from app.services.crawler_service import CrawlerService
+        app.state.crawler_service = CrawlerService()
+
+    threading.Thread(target=warm_up, args=(app,), daemon=True).start()
+    print(f"[main] Started in {time.perf_counter() - started:.2f}s")
+    yield
+    # Records still buffered by the usage ledger are written before the worker exits
+    get_usage_ledger().close()
+
+
+app = FastAPI(title="tehniliseintellekt.ee web chat api", version="1.0.0", lifespan=lifespan)
+app.include_router(health.router, prefix="", tags=["health"])
 app.include_router(info.router, prefix="", tags=["info"])
+app.include_router(conversation.router, prefix="", tags=["conversation"])
+app.include_router(admin.router, prefix="", tags=["admin"])
 
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
+app.add_middleware(RateLimitMiddleware)
+# Wraps rate limiting, so the Server-Timing total includes it
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -27,8 +89,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
@@ -0,0 +1,3 @@
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitRule, acquire_requests, get_rate_limit_backend
+from app.middleware.rate_limit_backend import DatabaseRateLimitBackend, Limit, MemoryRateLimitBackend
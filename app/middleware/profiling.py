@@ -0,0 +1,76 @@
+import time
+from typing import Optional
+
+from app.config import settings
+from app.utils.timing import start_timing, stop_timing
+from app.utils.admin import is_admin_key
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in profiling of single requests (pure ASGI middleware), enabled with PROFILING_ENABLED.
+
+    A request with the X-Profile header and an X-Admin-Key matching ADMIN_API_KEY is profiled:
+        - X-Profile: timing  only the time breakdown of timed sections (database, context assembly,
+          upstream call...) in the Server-Timing response header
+        - X-Profile: 1       also a sampling profile of the process while the request runs, stored under
+          the id returned in X-Profile-Id and read from GET /admin/profiles/{id}
+
+    Other requests and all requests while profiling is disabled pass through untouched.
+    """
+
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        mode = self._mode(scope) if self._is_enabled() else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Imported on first use, the profiler is not loaded while nobody profiles
+        from app.services.profiler import Profile, SamplingProfiler, save_profile
+
+        profiler = None
+        if mode != "timing":
+            profile = Profile(f"{scope['method']} {scope['path']}")
+            save_profile(profile)
+            profiler = SamplingProfiler(profile).start()
+
+        timings, token = start_timing()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(time.perf_counter() - started).encode()))
+                if profiler is not None:
+                    headers.append((b"x-profile-id", profiler.profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timing(token)
+            if profiler is not None:
+                profiler.stop()
+
+    def _is_enabled(self) -> bool:
+        return settings.PROFILING_ENABLED if self.enabled is None else self.enabled
+
+    @staticmethod
+    def _mode(scope) -> Optional[str]:
+        """
+        Profiling mode requested by the X-Profile header, None when the request is not profiled.
+        """
+        if scope["type"] != "http":
+            return None
+        headers = dict(scope.get("headers") or [])
+        mode = headers.get(b"x-profile", b"").decode("latin-1").strip().lower()
+        if mode in ("", "0", "false", "off"):
+            return None
+        if not is_admin_key(headers.get(b"x-admin-key", b"")):
+            return None
+        return mode
@@ -0,0 +1,208 @@
+import hashlib
+import json
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+import anyio
+
+from app.config import settings
+from app.middleware.rate_limit_backend import BucketState, DatabaseRateLimitBackend, Limit, MemoryRateLimitBackend
+from app.utils.usage import start_usage_tracking, stop_usage_tracking
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    Limits for a group of endpoints.
+
+    Attributes:
+        name: rule name, part of bucket keys and RateLimit-Policy
+        paths: path prefixes the rule applies to
+        requests: request limit
+        tokens: OpenAI token limit (input + output tokens reported by the endpoint), None for no token limit
+    """
+    name: str
+    paths: tuple[str, ...]
+    requests: Limit
+    tokens: Optional[Limit] = None
+
+    def matches(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in self.paths)
+
+
+def rules_from_settings(config: dict) -> list[RateLimitRule]:
+    """
+    Builds rules from RATE_LIMIT_RULES setting:
+        {"ask": {"paths": ["/ask"], "requests": (20, 60), "tokens": (200000, 3600)}}
+    """
+    return [
+        RateLimitRule(
+            name=name,
+            paths=tuple(rule["paths"]),
+            requests=Limit(*rule["requests"]),
+            tokens=Limit(*rule["tokens"]) if rule.get("tokens") else None,
+        )
+        for name, rule in config.items()
+    ]
+
+
+_current_bucket: ContextVar[Optional[tuple]] = ContextVar("current_rate_limit_bucket", default=None)
+"""
+(backend, key, limit) of the request bucket the current request was admitted by.
+"""
+
+
+def acquire_requests(cost: int) -> Optional[BucketState]:
+    """
+    Take more tokens from the request bucket of the current request, for endpoints doing the work of many
+    requests (every question of /ask/batch). Call from sync code, database backends block.
+
+    Returns:
+        BucketState, None outside of a rate limited request
+    """
+    current = _current_bucket.get()
+    if current is None or cost <= 0:
+        return None
+    backend, key, limit = current
+    return backend.acquire(key, limit, cost)
+
+
+_backend = None
+
+
+def get_rate_limit_backend():
+    """
+    Process-wide backend selected by RATE_LIMIT_BACKEND setting.
+
+    Raises:
+        ValueError: If backend is unknown
+    """
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "memory":
+            _backend = MemoryRateLimitBackend()
+        elif settings.RATE_LIMIT_BACKEND == "database":
+            _backend = DatabaseRateLimitBackend()
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+    return _backend
+
+
+class RateLimitMiddleware:
+    """
+    Per-client token bucket rate limiting (pure ASGI middleware, streaming responses pass through).
+
+    Client is the X-API-Key header when it is one of RATE_LIMIT_API_KEYS, otherwise client IP. Every matched request takes one token
+    from the request bucket of its rule. Rules with a token limit also need a positive OpenAI token balance,
+    tokens actually spent (reported by services through record_usage) are charged after the response,
+    so an expensive answer can put the client in debt until the bucket refills.
+
+    Responses carry RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset and RateLimit-Policy headers,
+    rejected requests get 429 with Retry-After.
+    """
+
+    def __init__(self, app, rules: Optional[list[RateLimitRule]] = None, backend=None, enabled: Optional[bool] = None):
+        self.app = app
+        self.rules = rules if rules is not None else rules_from_settings(settings.RATE_LIMIT_RULES)
+        self._backend = backend
+        self.enabled = settings.RATE_LIMIT_ENABLED if enabled is None else enabled
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_rate_limit_backend()
+        return self._backend
+
+    async def __call__(self, scope, receive, send):
+        rule = self._match(scope) if self.enabled else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = self._client_key(scope)
+        request_key = f"{rule.name}:requests:{client}"
+        token_key = f"{rule.name}:tokens:{client}"
+        try:
+            request_state = await self._call_backend("acquire", request_key, rule.requests, 1)
+            token_state = None
+            if request_state.allowed and rule.tokens:
+                token_state = await self._call_backend("acquire", token_key, rule.tokens, 0)
+        except Exception as e:
+            # Limiter outage must not take the API down with it
+            print(f"[RateLimitMiddleware] @__call__: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        headers = self._headers(rule, request_state)
+        denied = next((state for state in (request_state, token_state) if state and not state.allowed), None)
+        if denied is not None:
+            await self._reject(send, headers, denied)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        counter, token = start_usage_tracking()
+        bucket_token = _current_bucket.set((self.backend, request_key, rule.requests))
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_bucket.reset(bucket_token)
+            stop_usage_tracking(token)
+            if rule.tokens and counter.total_tokens:
+                try:
+                    await self._call_backend("charge", token_key, rule.tokens, counter.total_tokens)
+                except Exception as e:
+                    print(f"[RateLimitMiddleware] @__call__: {e}")
+
+    def _match(self, scope) -> Optional[RateLimitRule]:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return None
+        return next((rule for rule in self.rules if rule.matches(scope["path"])), None)
+
+    async def _call_backend(self, method: str, key: str, limit: Limit, cost: float) -> BucketState:
+        operation = getattr(self.backend, method)
+        if self.backend.blocking:
+            return await anyio.to_thread.run_sync(operation, key, limit, cost)
+        return operation(key, limit, cost)
+
+    @staticmethod
+    def _client_key(scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        api_key = headers.get(b"x-api-key", b"").decode("latin-1")
+        if api_key and api_key in settings.RATE_LIMIT_API_KEYS:
+            # Only a digest of the key ends up in memory or in the database
+            return "key:" + hashlib.sha256(api_key.encode("latin-1")).hexdigest()[:32]
+        if settings.RATE_LIMIT_TRUST_FORWARDED_FOR and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    def _headers(rule: RateLimitRule, state: BucketState) -> list[tuple[bytes, bytes]]:
+        policy = f"{rule.requests.capacity};w={int(rule.requests.period)}"
+        if rule.tokens:
+            policy += f", {rule.tokens.capacity};w={int(rule.tokens.period)};comment=\"tokens\""
+        return [
+            (b"ratelimit-limit", str(rule.requests.capacity).encode()),
+            (b"ratelimit-remaining", str(state.remaining).encode()),
+            (b"ratelimit-reset", str(state.reset).encode()),
+            (b"ratelimit-policy", policy.encode()),
+        ]
+
+    @staticmethod
+    async def _reject(send, headers: list[tuple[bytes, bytes]], state: BucketState):
+        body = json.dumps({"detail": "Rate limit exceeded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": headers + [
+                (b"retry-after", str(state.retry_after).encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
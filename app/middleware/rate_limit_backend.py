@@ -0,0 +1,160 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models.rate_limit_bucket import RateLimitBucket
+
+
+MAX_MEMORY_BUCKETS = 100_000
+"""
+Buckets kept by the memory backend before full (idle) buckets are dropped, a full bucket equals no bucket.
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """
+    Token bucket limit: up to capacity at once, refilled evenly over period seconds.
+    """
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class BucketState:
+    """
+    Result of a bucket operation.
+
+    Attributes:
+        allowed: whether the request may proceed
+        remaining: whole tokens left after the operation (0 when in debt)
+        reset: seconds until the bucket is full again
+        retry_after: seconds until the request would be allowed, 0 when allowed
+    """
+    allowed: bool
+    remaining: int
+    reset: int
+    retry_after: int
+
+
+def _refill(tokens: float, updated_at: float, limit: Limit, now: float) -> float:
+    return min(limit.capacity, tokens + max(now - updated_at, 0) * limit.rate)
+
+
+def _apply(tokens: float, limit: Limit, cost: float, charge: bool) -> tuple[float, BucketState]:
+    """
+    Takes cost from a refilled bucket. Acquire needs cost tokens and a positive balance, so a bucket
+    in debt blocks even zero-cost checks until it is refilled. Charge always takes, the balance can go negative.
+    """
+    allowed = charge or (tokens >= cost and tokens > 0)
+    if allowed:
+        tokens -= cost
+    retry_after = 0 if allowed else math.ceil((max(cost, 1) - tokens) / limit.rate)
+    return tokens, BucketState(
+        allowed=allowed,
+        remaining=max(int(tokens), 0),
+        reset=math.ceil((limit.capacity - tokens) / limit.rate),
+        retry_after=retry_after,
+    )
+
+
+class MemoryRateLimitBackend:
+    """
+    Token buckets in process memory. Limits apply per worker process, use the database backend
+    when several workers serve the API.
+    """
+
+    blocking = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+
+    def acquire(self, key: str, limit: Limit, cost: float = 1, now: Optional[float] = None) -> BucketState:
+        return self._update(key, limit, cost, charge=False, now=now)
+
+    def charge(self, key: str, limit: Limit, cost: float, now: Optional[float] = None) -> BucketState:
+        return self._update(key, limit, cost, charge=True, now=now)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def _update(self, key: str, limit: Limit, cost: float, charge: bool, now: Optional[float]) -> BucketState:
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (limit.capacity, now, now))
+            tokens, state = _apply(_refill(tokens, updated_at, limit, now), limit, cost, charge)
+            if key not in self._buckets and len(self._buckets) >= MAX_MEMORY_BUCKETS:
+                self._prune(now)
+            self._buckets[key] = (tokens, now, now + state.reset)
+            return state
+
+    def _prune(self, now: float):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+
+class DatabaseRateLimitBackend:
+    """
+    Token buckets in the rate_limit_buckets table, shared by all worker processes.
+    Every operation locks the bucket row (SELECT ... FOR UPDATE on PostgreSQL) for one short transaction.
+    """
+
+    blocking = True
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from app.db.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def acquire(self, key: str, limit: Limit, cost: float = 1, now: Optional[float] = None) -> BucketState:
+        return self._update(key, limit, cost, charge=False, now=now)
+
+    def charge(self, key: str, limit: Limit, cost: float, now: Optional[float] = None) -> BucketState:
+        return self._update(key, limit, cost, charge=True, now=now)
+
+    def reset(self):
+        db = self.session_factory()
+        try:
+            db.query(RateLimitBucket).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def _update(self, key: str, limit: Limit, cost: float, charge: bool, now: Optional[float]) -> BucketState:
+        now = time.time() if now is None else now
+        db = self.session_factory()
+        try:
+            # Second attempt covers another worker inserting the same new bucket concurrently
+            for attempt in range(2):
+                try:
+                    # FOR UPDATE is ignored by SQLite, the embedded database takes the write lock on begin instead
+                    db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+                    bucket = db.query(RateLimitBucket).filter(RateLimitBucket.key == key).with_for_update().first()
+                    if bucket is None:
+                        bucket = RateLimitBucket(key=key, tokens=limit.capacity, updated_at=now)
+                        db.add(bucket)
+                    tokens, state = _apply(_refill(bucket.tokens, bucket.updated_at, limit, now), limit, cost, charge)
+                    bucket.tokens = tokens
+                    bucket.updated_at = max(now, bucket.updated_at)
+                    db.commit()
+                    return state
+                except IntegrityError:
+                    db.rollback()
+                    if attempt:
+                        raise
+        except Exception:
+            db.rollback()
+            print(f"[DatabaseRateLimitBackend] @_update: Database error occurred")
+            raise
+        finally:
+            db.close()
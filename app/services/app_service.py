@@ -1,8 +1,33 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional, Union
+
 from fastapi import HTTPException
 
+from app.config import settings
+
 from app.db.database import get_db
-from app.dtos.ask_response import AskResponse
+from app.dtos.ask_response import AskResponse, Usage
+from app.dtos.batch_response import BatchItemResult, BatchSummary, BatchSummaryLine
+from app.dtos.conversation_response import ConversationAskResponse, ConversationResponse
+from app.dtos.profile_response import ProfileResponse, ProfileSummary
+from app.dtos.revisit_response import RevisitQueueItem, RevisitQueueResponse
+from app.dtos.search_response import SearchResponse
+from app.dtos.usage_response import CostlyQuestion, UsageReportResponse
+from app.utils.timing import timed
 from app.cruds.page_crud import PageCrud
+from app.cruds.usage_crud import UsageCrud
+from app.services.conversation_service import ConversationService
+from app.services.corpus_snapshot import CorpusService
+from app.services.embedding_service import EmbeddingService
+from app.services.fallback_service import FallbackService
+from app.services.faq_service import FaqService
+from app.services.model_router import ModelRouter
+from app.services.prefilter_service import PrefilterResult, PrefilterService
+from app.services import profiler
+from app.services.revisit_service import RevisitScheduler
+from app.services.usage_ledger import get_usage_ledger, usage_report
 from app.services.openai_service import OpenAIService
 from app.services.validation_service import ValidationService
 
@@ -16,6 +41,15 @@ class AppService:
         self.page_crud = PageCrud(self.db)
         self.validation_service = ValidationService()
         self.openai_service = OpenAIService()
+        self.embedding_service = EmbeddingService()
+        self.corpus_service = CorpusService()
+        self.conversation_service = ConversationService(self.db)
+        self.prefilter_service = PrefilterService()
+        self.revisit_scheduler = RevisitScheduler(self.db)
+        self.fallback_service = FallbackService()
+        self.faq_service = FaqService(self.db, self.openai_service, self.embedding_service)
+        self.usage_crud = UsageCrud(self.db)
+        self.usage_ledger = get_usage_ledger()
 
     def get_source_info(self) -> dict[str, str]:
         """
@@ -29,45 +63,458 @@ class AppService:
             HTTPException: 500 status code if database retrieval fails
         """
         try:
-            pages_dict = {}
-            pages = self.page_crud.get_all_pages()
-
-            for page in pages:
-                pages_dict[page.url] = page.content
-            return pages_dict
+            return self._get_pages()
         except Exception as e:
             print(f'[MainService] @get_source: {e}')
             raise HTTPException(status_code=500, detail=str(e))
 
-    def ask_question(self, question: str) -> AskResponse:
+    def ask_question(self, question: str, use_digests: Optional[bool] = None) -> AskResponse:
         """
             Process a user question and generate an AI-powered answer based on crawled content.
+            Popular questions are answered from the FAQ answers precomputed for the served corpus. When the model misses the ASK_DEADLINE or fails, the most relevant passages of the pages
+            are returned instead, marked degraded.
+
+            Args:
+                question (str): The user's question
+                use_digests (bool): Send page digests instead of full content, ASK_USE_DIGESTS by default
 
             Returns:
                 AskResponse
 
             Raises:
                 HTTPException:
-                    - 400 status code if question validation fails
+                    - 400 status code if question validation fails or the prefilter rejects it
                     - 500 status code if no pages are available in the database
-                    - 500 status code if OpenAI processing fails or other unexpected errors occur
+                    - 500 status code if OpenAI processing fails (with ASK_FALLBACK_ENABLED off)
+                      or other unexpected errors occur
             """
+        started = time.perf_counter()
+        response = self._answer_question(question, use_digests)
+        self.usage_ledger.record("ask", response, time.perf_counter() - started)
+        return response
+
+    def _answer_question(self, question: str, use_digests: Optional[bool]) -> AskResponse:
+        deadline = time.monotonic() + settings.ASK_DEADLINE if settings.ASK_DEADLINE else None
         result = self.validation_service.validate_question(question)
         if not result.is_valid:
             raise HTTPException(status_code=400, detail=result.details)
 
+        if use_digests is None or use_digests == settings.ASK_USE_DIGESTS:
+            precomputed = self._faq_answer(question)
+            if precomputed is not None:
+                return precomputed
+
         try:
-            pages_dict = {}
-            pages = self.page_crud.get_all_pages()
+            pages = pages_dict = self._get_pages()
 
-            if not pages:
+            if not pages_dict:
                 raise HTTPException(status_code=500, detail='No information available')
 
-            for page in pages:
-                pages_dict[page.url] = page.content
+            with timed("prefilter"):
+                prefilter = self.prefilter_service.check(question, pages_dict)
+            if not prefilter.allowed:
+                return self._prefiltered_response(question, prefilter)
 
-            result = self.openai_service.answer_question(question, pages_dict)
-            return AskResponse.model_validate(result)
+            with timed("context"):
+                if settings.ASK_USE_DIGESTS if use_digests is None else use_digests:
+                    pages_dict = self._with_digests(pages_dict)
+                pages_dict = self.embedding_service.select_context(question, pages_dict)
+            try:
+                result = self.openai_service.answer_question(question, pages_dict, deadline=deadline)
+            except Exception as e:
+                if not settings.ASK_FALLBACK_ENABLED:
+                    raise
+                print(f'[MainService] @ask: {e}, answering with page passages')
+                with timed("fallback"):
+                    return self.fallback_service.answer(question, pages)
+            return self._to_ask_response(result)
+        except HTTPException:
+            raise
         except Exception as e:
             print(f'[MainService] @ask: {e}')
             raise HTTPException(status_code=500, detail=str(e))
+
+    def ask_batch(self, questions: list[str],
+                  concurrency: Optional[int] = None) -> Iterator[Union[BatchItemResult, BatchSummaryLine]]:
+        """
+        Answer many questions with one corpus load. Questions are validated first, valid ones are answered
+        in parallel by at most `concurrency` workers. Failures are reported per question and do not stop the batch.
+
+        Args:
+            questions (list[str]): Questions to answer
+            concurrency (int): Parallel OpenAI requests, BATCH_CONCURRENCY by default
+
+        Returns:
+            Iterator of BatchItemResult in completion order (each has the question index),
+            followed by one BatchSummaryLine with counts and aggregated token usage
+
+        Raises:
+            HTTPException: 500 status code if no pages are available, raised before any result is produced
+        """
+        try:
+            pages_dict = self._get_pages()
+        except Exception as e:
+            print(f'[MainService] @ask_batch: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+        if not pages_dict:
+            raise HTTPException(status_code=500, detail='No information available')
+
+        return self._answer_batch(questions, pages_dict, concurrency or settings.BATCH_CONCURRENCY)
+
+    def _answer_batch(self, questions: list[str], pages_dict: dict[str, str],
+                      concurrency: int) -> Iterator[Union[BatchItemResult, BatchSummaryLine]]:
+        usage = Usage(input_tokens=0, output_tokens=0)
+        succeeded = 0
+
+        def answer(question: str) -> AskResponse:
+            started = time.perf_counter()
+            prefilter = self.prefilter_service.check(question, pages_dict)
+            if not prefilter.allowed:
+                try:
+                    response = self._prefiltered_response(question, prefilter)
+                except HTTPException as e:
+                    raise ValueError(e.detail)
+            else:
+                context = self.embedding_service.select_context(question, pages_dict)
+                response = self._to_ask_response(self.openai_service.answer_question(question, context))
+            self.usage_ledger.record("ask_batch", response, time.perf_counter() - started)
+            return response
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {}
+            for index, question in enumerate(questions):
+                validation = self.validation_service.validate_question(question)
+                if validation.is_valid:
+                    # Copy context so usage and timings are recorded to the request of the batch
+                    futures[executor.submit(contextvars.copy_context().run, answer, question)] = index
+                else:
+                    yield BatchItemResult(index=index, question=question, error=validation.details)
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f'[MainService] @ask_batch: question {index}: {e}')
+                    yield BatchItemResult(index=index, question=questions[index], error=str(e))
+                    continue
+                succeeded += 1
+                usage.input_tokens += result.usage.input_tokens
+                usage.output_tokens += result.usage.output_tokens
+                yield BatchItemResult(index=index, question=questions[index], result=result)
+        finally:
+            # Client went away mid-stream: do not keep paying for questions nobody reads
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        yield BatchSummaryLine(summary=BatchSummary(
+            total=len(questions),
+            succeeded=succeeded,
+            failed=len(questions) - succeeded,
+            usage=usage,
+        ))
+
+    def create_conversation(self) -> ConversationResponse:
+        """
+        Start a new conversation.
+
+        Returns:
+            ConversationResponse
+
+        Raises:
+            HTTPException: 500 status code if the conversation can not be stored
+        """
+        try:
+            conversation = self.conversation_service.start_conversation()
+            return ConversationResponse(id=conversation.id)
+        except Exception as e:
+            print(f'[MainService] @create_conversation: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def ask_in_conversation(self, conversation_id: str, question: str) -> ConversationAskResponse:
+        """
+        Answer a question within a conversation. Earlier turns (recent ones verbatim, older ones summarized)
+        are sent along, and pages used for the previous answer stay in the context, so follow-up
+        questions like "and how much does it cost?" keep their meaning.
+
+        Returns:
+            ConversationAskResponse
+
+        Raises:
+            HTTPException:
+                - 400 status code if question validation fails
+                - 404 status code if the conversation does not exist
+                - 500 status code if no pages are available or OpenAI processing fails
+        """
+        started = time.perf_counter()
+        result = self.validation_service.validate_question(question)
+        if not result.is_valid:
+            raise HTTPException(status_code=400, detail=result.details)
+
+        try:
+            conversation = self.conversation_service.get_conversation(conversation_id)
+            if conversation is None:
+                raise HTTPException(status_code=404, detail='Conversation not found')
+
+            pages = self._get_pages()
+            if not pages:
+                raise HTTPException(status_code=500, detail='No information available')
+
+            history, turns = self.conversation_service.get_history(
+                conversation, self.openai_service.summarize_conversation)
+
+            # Follow-ups ("and the price?") rarely share words with the site, relevance is judged on first turns
+            prefilter = self.prefilter_service.check(question, None if turns else pages)
+            if not prefilter.allowed:
+                response = self._prefiltered_response(question, prefilter)
+                self.usage_ledger.record("conversation", response, time.perf_counter() - started)
+                return ConversationAskResponse(conversation_id=conversation_id, **response.model_dump())
+
+            previous = turns[-1] if turns else None
+            # Follow-up questions are often too short to retrieve by, the previous question carries the topic
+            retrieval_query = f"{previous.question} {question}" if previous else question
+            with timed("context"):
+                pages_dict = self.embedding_service.select_context(retrieval_query, pages)
+                for url in (previous.sources if previous else []):
+                    if url in pages and url not in pages_dict:
+                        pages_dict[url] = pages[url]
+
+            result = self.openai_service.answer_question(question, pages_dict, history=history or None)
+            response = self._to_ask_response(result)
+            self.conversation_service.add_turn(conversation_id, question, response)
+            self.usage_ledger.record("conversation", response, time.perf_counter() - started)
+            return ConversationAskResponse(conversation_id=conversation_id, **response.model_dump())
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f'[MainService] @ask_in_conversation: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def get_prefilter_stats(self) -> dict[str, int]:
+        """
+        Prefilter counters of this worker process since start.
+
+        Returns:
+            dict[str, int]: checked, allowed, gibberish, injection, off_topic and avoided_calls (model calls not made)
+        """
+        return self.prefilter_service.stats()
+
+    @staticmethod
+    def get_model_stats() -> dict[str, dict]:
+        """
+        Per-model calls, failures, moving average latency and error rate, tokens and cost of this worker process.
+
+        Returns:
+            dict[str, dict]: {"gpt-4o-mini": {"calls": 10, "latency": 1.2, "cost": 0.003, "healthy": true, ...}}
+        """
+        return ModelRouter().stats_report()
+
+    @staticmethod
+    def start_profile(seconds: float) -> ProfileSummary:
+        """
+        Sample the stacks of this worker process for the next seconds in the background.
+
+        Returns:
+            ProfileSummary: running profile, read it from get_profile once the window is over
+
+        Raises:
+            HTTPException:
+                - 404 status code if profiling is disabled
+                - 409 status code if a profiling window is already running
+        """
+        AppService._require_profiling()
+        profile = profiler.start_window_profile(seconds)
+        if profile is None:
+            raise HTTPException(status_code=409, detail='A profiling window is already running')
+        return ProfileSummary(**profile.summary())
+
+    @staticmethod
+    def get_profiles() -> list[ProfileSummary]:
+        """
+        Profiles kept by this worker process, newest first.
+
+        Raises:
+            HTTPException: 404 status code if profiling is disabled
+        """
+        AppService._require_profiling()
+        return [ProfileSummary(**profile.summary()) for profile in profiler.list_profiles()]
+
+    @staticmethod
+    def get_profile(profile_id: str, limit: int) -> ProfileResponse:
+        """
+        Functions with most samples in a profile.
+
+        Raises:
+            HTTPException: 404 status code if profiling is disabled or the profile does not exist
+        """
+        profile = AppService._find_profile(profile_id)
+        return ProfileResponse(**profile.summary(), functions=profile.functions(limit))
+
+    @staticmethod
+    def get_collapsed_profile(profile_id: str) -> str:
+        """
+        Profile stacks in collapsed format for flame graph tools.
+
+        Raises:
+            HTTPException: 404 status code if profiling is disabled or the profile does not exist
+        """
+        return AppService._find_profile(profile_id).collapsed()
+
+    def get_revisit_queue(self, limit: int) -> RevisitQueueResponse:
+        """
+        Upcoming page revisits and the revisit budget.
+
+        Returns:
+            RevisitQueueResponse
+
+        Raises:
+            HTTPException: 500 status code if the schedule can not be read
+        """
+        try:
+            now = time.time()
+            queue = [
+                RevisitQueueItem(**schedule.to_dict(), overdue=schedule.next_due_at <= now)
+                for schedule in self.revisit_scheduler.queue(limit)
+            ]
+            return RevisitQueueResponse(**self.revisit_scheduler.stats(), queue=queue)
+        except Exception as e:
+            print(f'[MainService] @get_revisit_queue: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def get_usage(self, period: str, hours: int) -> UsageReportResponse:
+        """
+        Usage ledger of the last hours: totals and per hour or day buckets of requests, tokens, cost,
+        cached and degraded answers and latency percentiles. Records still buffered by the workers are not included.
+
+        Returns:
+            UsageReportResponse
+
+        Raises:
+            HTTPException: 500 status code if the ledger can not be read
+        """
+        try:
+            since = time.time() - hours * 3600
+            report = usage_report(self.usage_crud.get_records_since(since), period, since)
+            return UsageReportResponse(**report, writer=self.usage_ledger.stats())
+        except Exception as e:
+            print(f'[MainService] @get_usage: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def get_costly_questions(self, hours: int, limit: int) -> list[CostlyQuestion]:
+        """
+        Questions that cost most in the last hours, rephrasings of a question counted together.
+
+        Returns:
+            list[CostlyQuestion]: most expensive first
+
+        Raises:
+            HTTPException: 500 status code if the ledger can not be read
+        """
+        try:
+            questions = self.usage_crud.get_costly_questions(time.time() - hours * 3600, limit)
+            return [
+                CostlyQuestion(**question, cost_per_request=question["cost"] / question["requests"])
+                for question in questions
+            ]
+        except Exception as e:
+            print(f'[MainService] @get_costly_questions: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def search(self, query: str, limit: int) -> SearchResponse:
+        """
+        Full-text search over crawled pages.
+
+        Returns:
+            SearchResponse
+
+        Raises:
+            HTTPException: 500 status code if search fails
+        """
+        try:
+            results = self.page_crud.search(query, limit)
+            return SearchResponse(query=query, results=results)
+        except Exception as e:
+            print(f'[MainService] @search: {e}')
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _get_pages(self) -> dict[str, str]:
+        """
+        All crawled pages from the corpus snapshot, or from the database while no snapshot is written.
+
+        Returns:
+            dict[str, str]
+            Example: {"https://example.com": "Page content..."}
+        """
+        with timed("corpus"):
+            pages_dict = self.corpus_service.get_pages()
+        if pages_dict is not None:
+            return pages_dict
+        with timed("db"):
+            return {page.url: page.content for page in self.page_crud.get_all_pages()}
+
+    @staticmethod
+    def _require_profiling():
+        if not settings.PROFILING_ENABLED:
+            raise HTTPException(status_code=404, detail='Profiling is disabled')
+
+    @staticmethod
+    def _find_profile(profile_id: str) -> profiler.Profile:
+        AppService._require_profiling()
+        profile = profiler.get_profile(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail='Profile not found')
+        return profile
+
+    def _faq_answer(self, question: str) -> Optional[AskResponse]:
+        """
+        Precomputed answer for the corpus snapshot served by this worker, None without a snapshot
+        or when FAQ answers are disabled, missing or can not be loaded.
+        """
+        if not settings.FAQ_ENABLED:
+            return None
+        try:
+            with timed("faq"):
+                snapshot = self.corpus_service.load_snapshot()
+                return self.faq_service.lookup(question, snapshot.version) if snapshot else None
+        except Exception as e:
+            print(f'[MainService] @ask: FAQ lookup failed: {e}')
+            return None
+
+    def _with_digests(self, pages_dict: dict[str, str]) -> dict[str, str]:
+        """
+        Pages with content replaced by the page digest where one exists. Retrieval still selects chunks
+        of the full content, digests only shrink the context when all pages are sent.
+        """
+        digests = self.corpus_service.get_digests()
+        if digests is None:
+            digests = self.page_crud.get_all_digests()
+        return {url: digests.get(url) or content for url, content in pages_dict.items()}
+
+    @staticmethod
+    def _to_ask_response(result) -> AskResponse:
+        """
+        OpenAIService already returns a validated AskResponse, only other results (e.g. dicts) are validated.
+        """
+        if isinstance(result, AskResponse):
+            return result
+        return AskResponse.model_validate(result)
+
+    def _prefiltered_response(self, question: str, prefilter: PrefilterResult) -> AskResponse:
+        """
+        Response for a question stopped by the prefilter, no model call is made.
+
+        Returns:
+            AskResponse: canned answer for off-topic questions
+
+        Raises:
+            HTTPException: 400 status code for rejected questions (gibberish, prompt injection)
+        """
+        print(f'[MainService] @prefilter: {prefilter.verdict}: {prefilter.reason}')
+        if prefilter.verdict == PrefilterService.OFF_TOPIC:
+            return AskResponse(
+                question=question,
+                answer=self.prefilter_service.canned_answer(prefilter.language),
+                sources=[],
+                usage=Usage(input_tokens=0, output_tokens=0),
+            )
+        raise HTTPException(status_code=400, detail=prefilter.reason)
@@ -0,0 +1,85 @@
+from typing import Callable, List, Optional, Tuple
+
+from app.config import settings
+from app.cruds.conversation_crud import ConversationCrud
+from app.db.models.conversation import Conversation, ConversationTurn
+from app.dtos.ask_response import AskResponse
+from app.utils.tokens import estimate_tokens
+
+
+class ConversationService:
+    """
+    Server-side conversation history. Recent turns are sent to the model verbatim, older turns are folded
+    into a rolling summary once the history exceeds CONVERSATION_HISTORY_TOKENS, so prompts stop growing
+    with every turn.
+    """
+
+    def __init__(self, db):
+        self.conversation_crud = ConversationCrud(db)
+
+    def start_conversation(self) -> Conversation:
+        return self.conversation_crud.create_conversation()
+
+    def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
+        return self.conversation_crud.get_conversation(conversation_id)
+
+    def get_history(self, conversation: Conversation,
+                    summarize: Callable[[str, List[Tuple[str, str]]], str]) -> Tuple[str, List[ConversationTurn]]:
+        """
+        History of the conversation for the next prompt, compacted first when it is over the token budget.
+
+        Args:
+            conversation (Conversation): The conversation
+            summarize: Function (summary, [(question, answer)]) -> new summary
+
+        Returns:
+            Tuple[str, List[ConversationTurn]]: history text ("" for a new conversation) and turns sent verbatim
+        """
+        turns = self.conversation_crud.get_turns(conversation.id, offset=conversation.summarized_turns)
+        turns = self._compact(conversation, turns, summarize)
+
+        lines = []
+        if conversation.summary:
+            lines.append(f"Summary of earlier conversation: {conversation.summary}")
+        for turn in turns:
+            lines.append(f"User: {turn.question}")
+            lines.append(f"Assistant: {turn.answer}")
+        return "\n".join(lines), turns
+
+    def add_turn(self, conversation_id: str, question: str, response: AskResponse) -> ConversationTurn:
+        return self.conversation_crud.add_turn(
+            conversation_id,
+            question=question,
+            answer=response.answer,
+            sources=response.sources,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
+
+    def _compact(self, conversation: Conversation, turns: List[ConversationTurn],
+                 summarize: Callable[[str, List[Tuple[str, str]]], str]) -> List[ConversationTurn]:
+        """
+        Folds all but the last CONVERSATION_RECENT_TURNS turns into the summary when history is over budget.
+
+        Returns:
+            List[ConversationTurn]: turns that stay verbatim
+        """
+        if self._history_tokens(conversation.summary, turns) <= settings.CONVERSATION_HISTORY_TOKENS:
+            return turns
+        split = max(len(turns) - settings.CONVERSATION_RECENT_TURNS, 0)
+        if split == 0:
+            return turns
+
+        folded, recent = turns[:split], turns[split:]
+        try:
+            summary = summarize(conversation.summary, [(turn.question, turn.answer) for turn in folded])
+        except Exception as e:
+            # Send only recent turns this time, folding is retried on the next question
+            print(f"[ConversationService] @_compact: {e}")
+            return recent
+        self.conversation_crud.update_summary(conversation.id, summary, conversation.summarized_turns + split)
+        return recent
+
+    @staticmethod
+    def _history_tokens(summary: str, turns: List[ConversationTurn]) -> int:
+        return estimate_tokens(summary) + sum(estimate_tokens(turn.question + turn.answer) for turn in turns)
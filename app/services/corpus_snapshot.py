@@ -0,0 +1,263 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.config import settings
+
+
+MAGIC = b"TICORPUS"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQ")
+"""
+magic, format version, pages count, corpus version (creation timestamp in nanoseconds)
+"""
+ENTRY = struct.Struct("<QIQIQI")
+"""
+url offset, url length, content offset, content length, digest offset, digest length
+(offsets into the blob, lengths in bytes, digest length 0 for pages without a digest)
+"""
+ENTRIES = {1: struct.Struct("<QIQI"), 2: ENTRY}
+"""
+Entry layout by format version, version 1 snapshots (without digests) are still readable.
+"""
+
+
+class CorpusSnapshot:
+    """
+    Read-only corpus of crawled pages in a single binary file, memory-mapped so all worker processes
+    share the same pages of the OS page cache instead of each loading the corpus from the database.
+
+    Layout: header, offset index (one entry per page), UTF-8 blob of urls, contents and digests.
+    A new snapshot is written to a temporary file and swapped in with os.replace, readers that still
+    map the old file keep reading it until they let go.
+
+    Attributes:
+        version: corpus version (creation timestamp in nanoseconds)
+    """
+
+    def __init__(self, buffer: mmap.mmap, count: int, version: int, format_version: int = FORMAT_VERSION):
+        self._buffer = buffer
+        self._count = count
+        self._entry = ENTRIES[format_version]
+        self.version = version
+        self._blob_start = HEADER.size + count * self._entry.size
+        self._pages: Optional[CorpusPages] = None
+
+    @staticmethod
+    def write(path: str, pages: Dict[str, str], digests: Optional[Dict[str, str]] = None) -> int:
+        """
+        Write new snapshot and atomically replace the current one.
+
+        Args:
+            path (str): Snapshot file path
+            pages (Dict[str, str]): {"https://example.com": "Page content..."}
+            digests (Dict[str, str]): Condensed content by url, pages without a digest are left out
+
+        Returns:
+            int: Written corpus version
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        version = time.time_ns()
+
+        digests = digests or {}
+        index = bytearray()
+        blob = bytearray()
+        for url, content in pages.items():
+            url_bytes = url.encode("utf-8")
+            content_bytes = content.encode("utf-8")
+            digest_bytes = (digests.get(url) or "").encode("utf-8")
+            url_offset = len(blob)
+            content_offset = url_offset + len(url_bytes)
+            digest_offset = content_offset + len(content_bytes)
+            index += ENTRY.pack(url_offset, len(url_bytes), content_offset, len(content_bytes),
+                                digest_offset, len(digest_bytes))
+            blob += url_bytes
+            blob += content_bytes
+            blob += digest_bytes
+
+        tmp_path = target.with_name(f"{target.name}.tmp")
+        with tmp_path.open("wb") as snapshot_file:
+            snapshot_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(pages), version))
+            snapshot_file.write(index)
+            snapshot_file.write(blob)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(tmp_path, target)
+        return version
+
+    @staticmethod
+    def load(path: str) -> Optional["CorpusSnapshot"]:
+        """
+        Memory-map the snapshot file.
+
+        Returns:
+            CorpusSnapshot or None if snapshot does not exist
+
+        Raises:
+            ValueError: If the file is not a corpus snapshot of a supported format version
+        """
+        try:
+            with open(path, "rb") as snapshot_file:
+                size = os.fstat(snapshot_file.fileno()).st_size
+                if size < HEADER.size:
+                    raise ValueError(f"Corpus snapshot {path} is truncated")
+                # The mapping stays valid after the file is closed or replaced
+                buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        magic, format_version, count, version = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a corpus snapshot")
+        if format_version not in ENTRIES:
+            raise ValueError(f"Unsupported corpus snapshot format version {format_version}")
+        if size < HEADER.size + count * ENTRIES[format_version].size:
+            raise ValueError(f"Corpus snapshot {path} is truncated")
+        return CorpusSnapshot(buffer, count, version, format_version)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Pages in stored order, decoded on the fly.
+        """
+        for entry in self._entries():
+            yield self._read(entry[0], entry[1]), self._read(entry[2], entry[3])
+
+    def digests(self) -> Iterator[Tuple[str, str]]:
+        """
+        Digests of pages that have one, in stored order.
+        """
+        for entry in self._entries():
+            if len(entry) > 4 and entry[5]:
+                yield self._read(entry[0], entry[1]), self._read(entry[4], entry[5])
+
+    def pages(self) -> "CorpusPages":
+        """
+        Read-only url -> content mapping of the snapshot, built once and shared by all requests.
+        """
+        if self._pages is None:
+            self._pages = CorpusPages(self)
+        return self._pages
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.items())
+
+    def _entries(self) -> Iterator[tuple]:
+        return self._entry.iter_unpack(self._buffer[HEADER.size:self._blob_start])
+
+    def _read(self, offset: int, length: int) -> str:
+        start = self._blob_start + offset
+        return self._buffer[start:start + length].decode("utf-8")
+
+
+class CorpusPages(Mapping):
+    """
+    Pages of a snapshot as a read-only mapping. Only the url index is held in memory, contents are decoded
+    from the mapped file when accessed, so a request does not copy the whole corpus.
+    """
+
+    def __init__(self, snapshot: CorpusSnapshot):
+        self._snapshot = snapshot
+        self._index = {snapshot._read(entry[0], entry[1]): (entry[2], entry[3]) for entry in snapshot._entries()}
+
+    def __getitem__(self, url: str) -> str:
+        offset, length = self._index[url]
+        return self._snapshot._read(offset, length)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, url) -> bool:
+        return url in self._index
+
+
+_snapshot_lock = threading.Lock()
+_snapshot_cache: Dict[str, tuple] = {}
+"""
+Mapped snapshots by path, (file identity, CorpusSnapshot). Shared by all requests of the process.
+"""
+
+
+class CorpusService:
+    """
+    Serves crawled pages from the memory-mapped corpus snapshot, so the request path does not query the database.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path or settings.CORPUS_SNAPSHOT_PATH
+
+    def write_snapshot(self, pages: Dict[str, str], digests: Optional[Dict[str, str]] = None) -> int:
+        """
+        Write new snapshot, workers pick it up on their next request.
+
+        Returns:
+            int: Written corpus version
+        """
+        return CorpusSnapshot.write(self.snapshot_path, pages, digests)
+
+    def load_snapshot(self) -> Optional[CorpusSnapshot]:
+        """
+        Current snapshot of the process, remapped when a new version is written.
+
+        Returns:
+            CorpusSnapshot or None if snapshot was not written yet
+        """
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+
+        # Snapshot is replaced with os.replace, so a new version is a new inode
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        with _snapshot_lock:
+            cached = _snapshot_cache.get(self.snapshot_path)
+            if cached and cached[0] == identity:
+                return cached[1]
+            snapshot = CorpusSnapshot.load(self.snapshot_path)
+            if snapshot is None:
+                return cached[1] if cached else None
+            _snapshot_cache[self.snapshot_path] = (identity, snapshot)
+            return snapshot
+
+    def get_pages(self) -> Optional[Mapping]:
+        """
+        All pages of the current snapshot, contents are read from the mapped file on access.
+
+        Returns:
+            CorpusPages (url -> content) or None if there is no usable snapshot, the caller falls back to the database
+        """
+        try:
+            snapshot = self.load_snapshot()
+        except Exception as e:
+            print(f"[CorpusService] @get_pages: {e}")
+            return None
+        if snapshot is None or len(snapshot) == 0:
+            return None
+        return snapshot.pages()
+
+    def get_digests(self) -> Optional[Dict[str, str]]:
+        """
+        Page digests of the current snapshot.
+
+        Returns:
+            Dict[str, str] or None if there is no usable snapshot, the caller falls back to the database
+        """
+        try:
+            snapshot = self.load_snapshot()
+        except Exception as e:
+            print(f"[CorpusService] @get_digests: {e}")
+            return None
+        if snapshot is None or len(snapshot) == 0:
+            return None
+        return dict(snapshot.digests())
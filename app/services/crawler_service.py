@@ -1,28 +1,156 @@
+import os
+import shutil
 import subprocess
 import threading
+import time
+
+from app.config import settings
+from app.cruds.crawl_job_crud import CrawlJobCrud
+from app.db.database import get_db
+from app.db.models.crawl_job import CrawlJob
+from app.services.revisit_service import RevisitScheduler
+
+
+SHUTDOWN_GRACE_PERIOD = 60
+"""
+Seconds the crawler gets to save its queue and progress after it was asked to stop.
+"""
 
 
 class CrawlerService:
     """
          Runs text_spider.py in subprocess for web crawling once when application is started.
+         Unfinished crawl job of the previous run is resumed instead of starting from scratch.
+         With REVISIT_ENABLED, pages due for a revisit are refetched by revisit_spider.py every REVISIT_TICK seconds.
     """
     def __init__(self):
         self.thread = threading.Thread(target=self._run_crawl, daemon=True)
         self.thread.start()
 
     def _run_crawl(self):
+        db = next(get_db())
         try:
-            result = subprocess.run(
-                ["scrapy", "crawl", "text_spider"],
-                capture_output=True,
-                text=True,
-                timeout=3600,
-            )
-            if result.returncode == 0:
-                print("[CrawlerService] Crawl finished successfully")
+            crawl_job_crud = CrawlJobCrud(db)
+            job, resume = self._prepare_job(crawl_job_crud)
+            returncode, stderr = self._run_spider(job, resume)
+
+            if returncode == 0:
+                print(f"[CrawlerService] Crawl job {job.id} stopped")
             else:
-                print(f"[CrawlerService] Crawl failed: {result.stderr}")
-        except subprocess.TimeoutExpired:
-            print("[CrawlerService] Crawl timed out")
+                print(f"[CrawlerService] Crawl job {job.id} failed: {stderr}")
+                self._mark_failed(crawl_job_crud, job, returncode)
         except Exception as e:
             print(f"[CrawlerService] Unexpected error: {e}")
+        finally:
+            db.close()
+
+        if settings.REVISIT_ENABLED:
+            self._revisit_loop()
+
+    @staticmethod
+    def _mark_failed(crawl_job_crud: CrawlJobCrud, job: CrawlJob, returncode: int):
+        """
+        Crawl that exited with an error without closing its job is not resumed, the next start crawls anew.
+        A negative return code means the process was killed by a signal, such a job stays resumable.
+        """
+        crawl_job_crud.db.expire_all()
+        if returncode > 0 and crawl_job_crud.get_job(job.id).status == CrawlJob.RUNNING:
+            crawl_job_crud.set_status(job.id, CrawlJob.FAILED)
+
+    def _revisit_loop(self):
+        while True:
+            time.sleep(settings.REVISIT_TICK)
+            try:
+                self.revisit_due()
+            except Exception as e:
+                print(f"[CrawlerService] @revisit: {e}")
+
+    def revisit_due(self) -> int:
+        """
+        Refetches pages that are due, at most one round of the revisit budget.
+
+        Returns:
+            int: Number of revisited pages
+        """
+        db = next(get_db())
+        try:
+            urls = [schedule.url for schedule in RevisitScheduler(db).due()]
+        finally:
+            db.close()
+        if not urls:
+            return 0
+
+        os.makedirs(settings.CRAWL_JOBS_DIR, exist_ok=True)
+        urls_file = os.path.join(settings.CRAWL_JOBS_DIR, "revisit.txt")
+        with open(urls_file, "w", encoding="utf-8") as file:
+            file.write("\n".join(urls))
+
+        process = subprocess.run(
+            ["scrapy", "crawl", "revisit_spider", "-a", f"urls_file={urls_file}"] + self._archive_settings(),
+            capture_output=True, text=True, timeout=settings.CRAWL_TIMEOUT,
+        )
+        if process.returncode != 0:
+            print(f"[CrawlerService] Revisit of {len(urls)} pages failed: {process.stderr}")
+        return len(urls)
+
+    @staticmethod
+    def _archive_settings() -> list[str]:
+        if not settings.CRAWL_ARCHIVE_MODE:
+            return []
+        return [
+            "-s", f"CRAWL_ARCHIVE_MODE={settings.CRAWL_ARCHIVE_MODE}",
+            "-s", f"CRAWL_ARCHIVE_DIR={settings.CRAWL_ARCHIVE_DIR}",
+        ]
+
+    def _prepare_job(self, crawl_job_crud: CrawlJobCrud) -> tuple[CrawlJob, bool]:
+        """
+        Picks up unfinished crawl job or creates a new one.
+
+        Job interrupted cleanly keeps its JOBDIR (request queue and seen URLs). Job that is still
+        "running" was killed, its queue state can not be trusted, so JOBDIR is reset and the spider
+        rebuilds the frontier from stored pages and seeds. Failed jobs are not resumed.
+
+        Returns:
+            tuple[CrawlJob, bool]: crawl job and whether it is resumed
+        """
+        job = crawl_job_crud.get_resumable_job()
+        if job is None:
+            return crawl_job_crud.create_job(settings.CRAWL_JOBS_DIR), False
+
+        if job.status == CrawlJob.RUNNING:
+            print(f"[CrawlerService] Crawl job {job.id} was not stopped cleanly, resetting its frontier")
+            shutil.rmtree(job.job_dir, ignore_errors=True)
+
+        print(f"[CrawlerService] Resuming crawl job {job.id} ({job.pages_stored} pages, {job.total_chars} chars)")
+        return crawl_job_crud.set_status(job.id, CrawlJob.RUNNING), True
+
+    def _run_spider(self, job: CrawlJob, resume: bool) -> tuple[int, str]:
+        """
+        Runs spider until it finishes or CRAWL_TIMEOUT passes. On timeout the spider is stopped with SIGTERM,
+        so Scrapy saves JOBDIR state and the job can be resumed.
+
+        Returns:
+            tuple[int, str]: process return code and stderr
+        """
+        os.makedirs(job.job_dir, exist_ok=True)
+        command = [
+            "scrapy", "crawl", "text_spider",
+            "-a", f"job_id={job.id}",
+            "-s", f"JOBDIR={job.job_dir}",
+        ]
+        if resume:
+            command += ["-a", "resume=1"]
+        command += self._archive_settings()
+
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            _, stderr = process.communicate(timeout=settings.CRAWL_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            print(f"[CrawlerService] Crawl job {job.id} timed out, stopping it to resume later")
+            process.terminate()
+            try:
+                _, stderr = process.communicate(timeout=SHUTDOWN_GRACE_PERIOD)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                _, stderr = process.communicate()
+        return process.returncode, stderr
@@ -0,0 +1,195 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.prefilter_service import STEM_LENGTH, STOPWORDS, WORD_PATTERN
+
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+"""
+Sentence borders: whitespace after terminal punctuation, and line breaks (headings, list items, table rows).
+"""
+
+LEAD_BONUS = 0.5
+"""
+Score bonus of the first sentences, pages usually open with what they are about.
+"""
+LEAD_SENTENCES = 2
+
+ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence and sentence.strip()]
+
+
+class ExtractiveDigestProvider:
+    """
+    Local digest: sentences are scored by how many of their content words recur on the page (words compared
+    by stem, so inflected forms count together), the best ones are kept in their original order. Needs no network, keeps the page's own wording (names, prices, contacts).
+    """
+
+    name = "extractive"
+
+    def digest(self, content: str, max_chars: int) -> str:
+        sentences = []
+        seen = set()
+        for sentence in split_sentences(content):
+            # Navigation and footers repeat the same lines, keep one copy
+            key = sentence.lower()
+            if key not in seen:
+                seen.add(key)
+                sentences.append(sentence)
+
+        frequencies = Counter(
+            word for sentence in sentences for word in self._content_words(sentence)
+        )
+        if not frequencies:
+            return content[:max_chars]
+        top = max(frequencies.values())
+
+        def score(position: int, sentence: str) -> float:
+            words = self._content_words(sentence)
+            # Words used once on the page say little about what the page is about
+            value = sum(frequencies[word] for word in words if frequencies[word] > 1) / top / (len(words) or 1)
+            return value + (LEAD_BONUS if position < LEAD_SENTENCES else 0)
+
+        scores = [score(position, sentence) for position, sentence in enumerate(sentences)]
+        ranked = sorted(range(len(sentences)), key=lambda position: scores[position], reverse=True)
+        selected = []
+        length = 0
+        for position in ranked:
+            if scores[position] <= 0:
+                break
+            sentence_length = len(sentences[position]) + 1
+            if length + sentence_length > max_chars:
+                continue
+            selected.append(position)
+            length += sentence_length
+        return "\n".join(sentences[position] for position in sorted(selected))
+
+    @staticmethod
+    def _content_words(sentence: str) -> List[str]:
+        words = [word.lower() for word in WORD_PATTERN.findall(sentence)]
+        return [word[:STEM_LENGTH] for word in words if len(word) >= 3 and word not in ALL_STOPWORDS]
+
+
+class OpenAIDigestProvider:
+    """
+    LLM digest: the page is summarized by an OpenAI model. Better compression than sentence selection,
+    costs one model call per page at crawl time.
+    Requires OPENAI_API_KEY in .env
+    """
+
+    name = "openai"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def digest(self, content: str, max_chars: int) -> str:
+        import openai
+
+        if not settings.OPENAI_API_KEY:
+            raise Exception('OPENAI_API_KEY not set')
+        openai.api_key = settings.OPENAI_API_KEY
+
+        response = openai.responses.create(
+            model=self.model,
+            input=[
+                {"role": "system", "content": (
+                    f"Condense the web page below to at most {max_chars} characters, in the language of the page. "
+                    "Keep every fact a visitor could ask about: services, products, prices, names, dates, "
+                    "contacts and conditions. Leave out navigation, marketing phrases and repetition. "
+                    "Write plain text without headings or commentary."
+                )},
+                {"role": "user", "content": content},
+            ],
+        )
+        return response.output_text.strip()
+
+
+class StubDigestProvider:
+    """
+    Stand-in provider for tests and benchmarks, digests are produced by a function of the content
+    (default: first max_chars characters).
+
+    Attributes:
+        calls: number of digested pages
+    """
+
+    name = "stub"
+
+    def __init__(self, digest_factory: Optional[Callable[[str, int], str]] = None):
+        self.digest_factory = digest_factory or (lambda content, max_chars: content[:max_chars])
+        self.calls = 0
+
+    def digest(self, content: str, max_chars: int) -> str:
+        self.calls += 1
+        return self.digest_factory(content, max_chars)
+
+
+def get_digest_provider():
+    """
+    Digest provider selected by DIGEST_PROVIDER setting.
+
+    Raises:
+        ValueError: If provider is unknown
+    """
+    if settings.DIGEST_PROVIDER == "extractive":
+        return ExtractiveDigestProvider()
+    if settings.DIGEST_PROVIDER == "openai":
+        return OpenAIDigestProvider(settings.DIGEST_MODEL)
+    raise ValueError(f"Unknown DIGEST_PROVIDER: {settings.DIGEST_PROVIDER}")
+
+
+class DigestService:
+    """
+    Post-crawl context compression. Every page long enough gets a digest of about DIGEST_RATIO of its length,
+    /ask can send digests instead of full content. Digests are kept per url, so sources stay attributable.
+    """
+
+    def __init__(self, provider=None):
+        self._provider = provider
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            self._provider = get_digest_provider()
+        return self._provider
+
+    def digest(self, content: str) -> Optional[str]:
+        """
+        Digest of one page.
+
+        Returns:
+            str or None when the page is short enough to be sent verbatim or the digest would not be shorter
+        """
+        content = content.strip()
+        if len(content) < settings.DIGEST_MIN_CHARS:
+            return None
+        max_chars = min(settings.DIGEST_MAX_CHARS,
+                        max(settings.DIGEST_MIN_CHARS, int(len(content) * settings.DIGEST_RATIO)))
+        digest = self.provider.digest(content, max_chars).strip()
+        if not digest or len(digest) >= len(content):
+            return None
+        return digest
+
+    def build_digests(self, pages: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Digests of all pages, a page that fails to digest is sent verbatim.
+
+        Args:
+            pages (Dict[str, str]): {"https://example.com": "Page content..."}
+
+        Returns:
+            Dict[str, Optional[str]]: digest by url, None for pages without a digest
+        """
+        digests = {}
+        for url, content in pages.items():
+            try:
+                digests[url] = self.digest(content)
+            except Exception as e:
+                print(f"[DigestService] @build_digests: {url}: {e}")
+                digests[url] = None
+        return digests
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.vector_index import VectorIndex
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """
+    Split text into chunks of about chunk_size characters on word boundaries.
+    Neighbouring chunks share about overlap characters, so sentences on a border are not lost.
+    """
+    words = text.split()
+    chunks = []
+    start = 0
+    while start < len(words):
+        length = 0
+        end = start
+        while end < len(words) and (length == 0 or length + len(words[end]) + 1 <= chunk_size):
+            length += len(words[end]) + 1
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+
+        # Step back so the next chunk starts with the last ~overlap characters of this one
+        back = 0
+        next_start = end
+        while next_start > start + 1 and back + len(words[next_start - 1]) + 1 <= overlap:
+            next_start -= 1
+            back += len(words[next_start]) + 1
+        start = next_start
+    return chunks
+
+
+class HashingEmbeddingProvider:
+    """
+    Deterministic local embedding provider (feature hashing of words and character trigrams).
+    Needs no network and no model, used in tests and as an offline stand-in. Only captures lexical similarity.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        return _normalize(vectors)
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        features = []
+        for word in re.findall(r"\w+", text.lower()):
+            features.append(word)
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+
+class OpenAIEmbeddingProvider:
+    """
+    OpenAI embeddings API provider. Multilingual, so English questions match Estonian pages.
+    Requires OPENAI_API_KEY in .env
+    """
+
+    name = "openai"
+    batch_size = 100
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        import openai
+
+        if not settings.OPENAI_API_KEY:
+            raise Exception('OPENAI_API_KEY not set')
+        openai.api_key = settings.OPENAI_API_KEY
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = openai.embeddings.create(model=self.model, input=texts[start:start + self.batch_size])
+            vectors.extend(item.embedding for item in response.data)
+        return _normalize(np.array(vectors, dtype=np.float32))
+
+
+def get_embedding_provider():
+    """
+    Embedding provider selected by EMBEDDING_PROVIDER setting.
+
+    Raises:
+        ValueError: If provider is unknown
+    """
+    if settings.EMBEDDING_PROVIDER == "openai":
+        return OpenAIEmbeddingProvider(settings.EMBEDDING_MODEL)
+    if settings.EMBEDDING_PROVIDER == "hashing":
+        return HashingEmbeddingProvider()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {settings.EMBEDDING_PROVIDER}")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+_index_lock = threading.Lock()
+_index_cache: Dict[str, tuple] = {}
+"""
+Loaded indexes by path, (metadata file identity, VectorIndex). Shared by all requests of the process.
+"""
+
+
+class EmbeddingService:
+    """
+    Semantic retrieval over page chunks. Index is built at crawl time and memory-mapped by every worker.
+    """
+
+    def __init__(self, provider=None, index_path: Optional[str] = None):
+        self._provider = provider
+        self.index_path = index_path or settings.EMBEDDING_INDEX_PATH
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            self._provider = get_embedding_provider()
+        return self._provider
+
+    def build_index(self, pages: Dict[str, str]) -> int:
+        """
+        Chunk and embed all pages and write a new index version.
+
+        Args:
+            pages (Dict[str, str]): {"https://example.com": "Page content..."}
+
+        Returns:
+            int: Number of indexed chunks
+        """
+        chunks = [
+            {"url": url, "text": chunk}
+            for url, content in pages.items()
+            for chunk in chunk_text(content, settings.EMBEDDING_CHUNK_SIZE, settings.EMBEDDING_CHUNK_OVERLAP)
+        ]
+        if chunks:
+            vectors = self.provider.embed([chunk["text"] for chunk in chunks])
+        else:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        VectorIndex.write(self.index_path, vectors, chunks, quantize=settings.EMBEDDING_QUANTIZE,
+                          provider=self.provider.name)
+        return len(chunks)
+
+    def load_index(self) -> Optional[VectorIndex]:
+        """
+        Current index of the process, reloaded when a new version is written.
+
+        Returns:
+            VectorIndex or None if index was not built yet
+        """
+        metadata_path = f"{self.index_path}.json"
+        try:
+            stat = os.stat(metadata_path)
+        except FileNotFoundError:
+            return None
+
+        # Metadata is replaced with os.replace, so a new version is a new inode
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        with _index_lock:
+            cached = _index_cache.get(self.index_path)
+            if cached and cached[0] == identity:
+                return cached[1]
+            try:
+                index = VectorIndex.load(self.index_path)
+            except FileNotFoundError:
+                # New version replaced the files while loading, it is picked up on the next call
+                return cached[1] if cached else None
+            _index_cache[self.index_path] = (identity, index)
+            return index
+
+    def retrieve(self, question: str, k: int) -> List[dict]:
+        """
+        Most similar chunks to the question.
+
+        Returns:
+            List[dict]: [{"url": ..., "text": ..., "score": ...}], best first
+        """
+        index = self.load_index()
+        if index is None or not index.chunks:
+            return []
+        if index.provider and index.provider != self.provider.name:
+            print(f"[EmbeddingService] @retrieve: index was built with {index.provider}, not {self.provider.name}")
+            return []
+        query = self.provider.embed([question])[0]
+        return [{**index.chunks[row], "score": score} for row, score in index.search(query, k)]
+
+    def select_context(self, question: str, pages: Dict[str, str]) -> Dict[str, str]:
+        """
+        Narrow pages down to the chunks most relevant to the question. Returns pages unchanged
+        when retrieval is disabled or the index is not built yet.
+
+        Args:
+            question (str): The user's question
+            pages (Dict[str, str]): {"https://example.com": "Page content..."}
+
+        Returns:
+            Dict[str, str]: {"https://example.com": "Relevant chunk...\\n...another chunk"}
+        """
+        if not settings.EMBEDDING_RETRIEVAL_ENABLED:
+            return pages
+
+        try:
+            chunks = self.retrieve(question, settings.EMBEDDING_TOP_K)
+        except Exception as e:
+            print(f"[EmbeddingService] @select_context: {e}")
+            return pages
+
+        context: Dict[str, List[str]] = {}
+        for chunk in chunks:
+            if chunk["url"] in pages:
+                context.setdefault(chunk["url"], []).append(chunk["text"])
+        if not context:
+            return pages
+        return {url: "\n...\n".join(texts) for url, texts in context.items()}
@@ -0,0 +1,94 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.dtos.ask_response import AskResponse, Usage
+from app.services.digest_service import ALL_STOPWORDS, split_sentences
+from app.services.prefilter_service import STEM_LENGTH, WORD_PATTERN, PrefilterService
+
+
+INTRODUCTIONS = {
+    "et": "Vastust ei õnnestunud praegu koostada. Kõige asjakohasemad lõigud veebilehelt:",
+    "en": "The answer could not be generated right now. Most relevant passages from the website:",
+}
+
+NO_PASSAGES = {
+    "et": "Vastust ei õnnestunud praegu koostada, palun proovi hiljem uuesti.",
+    "en": "The answer could not be generated right now, please try again later.",
+}
+
+
+class FallbackService:
+    """
+    Local answer for when the model is too slow or fails: the passages of the crawled pages that share
+    most (rare) words with the question, quoted with their page URLs as sources. No network, a few milliseconds.
+    """
+
+    def answer(self, question: str, pages: Dict[str, str]) -> AskResponse:
+        """
+        Returns:
+            AskResponse marked degraded, without model and token usage
+        """
+        language = PrefilterService.detect_language(question) or "en"
+        passages = self.passages(question, pages, settings.ASK_FALLBACK_PASSAGES)
+        if passages:
+            lines = [INTRODUCTIONS.get(language, INTRODUCTIONS["en"])]
+            lines += [f"- {passage} ({url})" for url, passage in passages]
+            answer = "\n".join(lines)
+        else:
+            answer = NO_PASSAGES.get(language, NO_PASSAGES["en"])
+
+        return AskResponse(
+            question=question,
+            answer=answer,
+            sources=list(dict.fromkeys(url for url, _ in passages)),
+            usage=Usage(input_tokens=0, output_tokens=0),
+            degraded=True,
+        )
+
+    @staticmethod
+    def passages(question: str, pages: Dict[str, str], limit: int) -> List[Tuple[str, str]]:
+        """
+        Best matching sentences, scored by the inverse page frequency of the question's words they contain.
+
+        Returns:
+            List of (url, passage), best first
+        """
+        question_stems = set(FallbackService._stems(question))
+        if not question_stems:
+            return []
+
+        sentences_by_page = {url: split_sentences(content) for url, content in pages.items()}
+        page_frequency = Counter()
+        for sentences in sentences_by_page.values():
+            page_frequency.update(question_stems.intersection(
+                stem for sentence in sentences for stem in FallbackService._stems(sentence)))
+        weights = {stem: math.log(1 + len(pages) / count) for stem, count in page_frequency.items()}
+
+        scored = []
+        seen = set()
+        for url, sentences in sentences_by_page.items():
+            for sentence in sentences:
+                key = sentence.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = sum(weights.get(stem, 0) for stem in set(FallbackService._stems(sentence)))
+                if score > 0:
+                    scored.append((score, url, FallbackService._shorten(sentence)))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(url, passage) for _, url, passage in scored[:limit]]
+
+    @staticmethod
+    def _stems(text: str) -> List[str]:
+        words = [word.lower() for word in WORD_PATTERN.findall(text)]
+        return [word[:STEM_LENGTH] for word in words if len(word) >= 3 and word not in ALL_STOPWORDS]
+
+    @staticmethod
+    def _shorten(passage: str, max_chars: Optional[int] = None) -> str:
+        max_chars = max_chars or settings.ASK_FALLBACK_PASSAGE_CHARS
+        if len(passage) <= max_chars:
+            return passage
+        return passage[:max_chars].rsplit(" ", 1)[0] + "…"
@@ -0,0 +1,192 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.cruds.conversation_crud import ConversationCrud
+from app.cruds.faq_crud import FaqCrud
+from app.db.models.faq_answer import FaqAnswer
+from app.dtos.ask_response import AskResponse, Usage
+from app.services.embedding_service import EmbeddingService
+from app.services.prefilter_service import PrefilterService
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lookup key of a question: case, punctuation and spacing are ignored,
+    so "Milliseid koolitusi pakute?" and "milliseid koolitusi pakute" match.
+    """
+    return " ".join(TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", question).casefold()))
+
+
+_answers_lock = threading.Lock()
+_answers_cache: dict = {}
+"""
+Precomputed answers of the corpus version served by this process, (version, loaded at, answers by normalized
+question). Answers of a version are stored in one transaction, so a non-empty set is final; an empty one is
+reloaded every FAQ_RELOAD_INTERVAL seconds, answers are computed after the snapshot is published.
+"""
+
+
+class FaqService:
+    """
+    Answers to popular questions, precomputed after every crawl and served from memory by /ask.
+    Questions are configured (FAQ_QUESTIONS, FAQ_QUESTIONS_FILE) or mined from the opening questions
+    of conversations. Answers are stored with the corpus version they were computed from and are only
+    served while workers serve the same corpus.
+    """
+
+    def __init__(self, db, openai_service=None, embedding_service: Optional[EmbeddingService] = None):
+        self.faq_crud = FaqCrud(db)
+        self.conversation_crud = ConversationCrud(db)
+        self._openai_service = openai_service
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.prefilter_service = PrefilterService()
+
+    @property
+    def openai_service(self):
+        # Only precomputation calls the model, lookups work without OPENAI_API_KEY
+        if self._openai_service is None:
+            from app.services.openai_service import OpenAIService
+            self._openai_service = OpenAIService()
+        return self._openai_service
+
+    def lookup(self, question: str, corpus_version: int) -> Optional[AskResponse]:
+        """
+        Precomputed answer of an exactly or normalized matching question.
+
+        Returns:
+            AskResponse marked cached, without token usage, None when the question has no answer for this corpus version
+        """
+        answer = self._answers(corpus_version).get(normalize_question(question))
+        if answer is None:
+            return None
+        return AskResponse(
+            question=question,
+            answer=answer["answer"],
+            sources=list(answer["sources"]),
+            usage=Usage(input_tokens=0, output_tokens=0),
+            model=answer["model"],
+            cached=True,
+        )
+
+    def refresh(self, pages: Dict[str, str], corpus_version: int, changed_urls: Optional[Set[str]] = None) -> int:
+        """
+        Answer the FAQ questions against a new corpus version and replace the stored answers.
+        Questions the /ask prefilter would reject are not answered.
+
+        Args:
+            pages (Dict[str, str]): Context the answers are computed from, as /ask would send it
+            corpus_version (int): Version of the published corpus snapshot
+            changed_urls (Set[str]): Pages changed since the previous version (revisits), answers whose sources
+                                     did not change are carried over without a model call. All are answered when None
+
+        Returns:
+            int: Number of stored answers
+
+        Raises:
+            SQLAlchemyError: If the answers can not be stored
+        """
+        previous = {}
+        if changed_urls is not None:
+            previous = {answer.normalized: answer for answer in self.faq_crud.get_latest_answers()}
+
+        carried = []
+        questions = []
+        for question in self.questions():
+            answer = previous.get(normalize_question(question))
+            if answer is not None and not changed_urls.intersection(answer.sources):
+                carried.append(self._copy(answer))
+            elif self.prefilter_service.check(question, pages).allowed:
+                questions.append(question)
+
+        with ThreadPoolExecutor(max_workers=settings.BATCH_CONCURRENCY) as executor:
+            answered = [answer for answer in executor.map(lambda q: self._answer(q, pages), questions) if answer]
+        stored = self.faq_crud.replace_answers(corpus_version, carried + answered)
+        print(f"[FaqService] @refresh: {len(answered)} answered, {len(carried)} carried over, "
+              f"{len(questions) - len(answered)} failed")
+        return stored
+
+    def questions(self) -> List[str]:
+        """
+        Configured questions first, then the most asked opening questions of conversations
+        (asked at least FAQ_MIN_ASKS times), one phrasing per normalized question.
+        """
+        questions = list(settings.FAQ_QUESTIONS)
+        if settings.FAQ_QUESTIONS_FILE and os.path.exists(settings.FAQ_QUESTIONS_FILE):
+            with open(settings.FAQ_QUESTIONS_FILE, encoding="utf-8") as questions_file:
+                questions += [line.strip() for line in questions_file if line.strip() and not line.startswith("#")]
+        if settings.FAQ_MINED_QUESTIONS:
+            questions += self._mined_questions()
+
+        unique = {}
+        for question in questions:
+            unique.setdefault(normalize_question(question), question)
+        return [question for normalized, question in unique.items() if normalized]
+
+    def _mined_questions(self) -> List[str]:
+        phrasings = defaultdict(Counter)
+        for question in self.conversation_crud.get_first_questions(settings.FAQ_MINING_WINDOW):
+            phrasings[normalize_question(question)][question.strip()] += 1
+        popular = sorted(phrasings.values(), key=lambda counts: sum(counts.values()), reverse=True)
+        return [
+            counts.most_common(1)[0][0] for counts in popular[:settings.FAQ_MINED_QUESTIONS]
+            if sum(counts.values()) >= settings.FAQ_MIN_ASKS
+        ]
+
+    def _answer(self, question: str, pages: Dict[str, str]) -> Optional[FaqAnswer]:
+        try:
+            context = self.embedding_service.select_context(question, pages)
+            response = self.openai_service.answer_question(question, context)
+        except Exception as e:
+            print(f"[FaqService] @refresh: {question}: {e}")
+            return None
+        return FaqAnswer(
+            normalized=normalize_question(question),
+            question=question,
+            answer=response.answer,
+            sources=response.sources,
+            model=response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
+
+    @staticmethod
+    def _copy(answer: FaqAnswer) -> FaqAnswer:
+        return FaqAnswer(
+            normalized=answer.normalized,
+            question=answer.question,
+            answer=answer.answer,
+            sources=answer.sources,
+            model=answer.model,
+            input_tokens=answer.input_tokens,
+            output_tokens=answer.output_tokens,
+        )
+
+    def _answers(self, corpus_version: int) -> dict:
+        now = time.monotonic()
+        with _answers_lock:
+            cached = _answers_cache.get("faq")
+            if cached and cached[0] == corpus_version and (cached[2] or now - cached[1] < settings.FAQ_RELOAD_INTERVAL):
+                return cached[2]
+
+        answers = {
+            answer.normalized: {"answer": answer.answer, "sources": answer.sources, "model": answer.model}
+            for answer in self.faq_crud.get_answers(corpus_version)
+        }
+        with _answers_lock:
+            _answers_cache["faq"] = (corpus_version, now, answers)
+        return answers
+
+    @staticmethod
+    def clear_cache():
+        with _answers_lock:
+            _answers_cache.clear()
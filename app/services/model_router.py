@@ -0,0 +1,227 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """
+    Attributes:
+        name: OpenAI model name
+        tier: capability level, 1 is the cheapest model that answers simple questions well
+        max_context_tokens: context window of the model
+        input_cost: USD per 1M input tokens
+        output_cost: USD per 1M output tokens
+    """
+    name: str
+    tier: int
+    max_context_tokens: int
+    input_cost: float
+    output_cost: float
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_cost + output_tokens * self.output_cost) / 1_000_000
+
+
+class ModelStats:
+    """
+    Running statistics of one model: exponentially weighted latency and error rate, so routing reacts to
+    the current state of the API, plus totals of calls, tokens and cost. last_call_at is time.monotonic()
+    of the latest recorded call.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        self.last_call_at: Optional[float] = None
+
+    def record_success(self, latency: float, input_tokens: int, output_tokens: int, cost: float):
+        self.calls += 1
+        self.last_call_at = time.monotonic()
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = (1 - self.alpha) * self.error_rate
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+
+    def record_failure(self, latency: float):
+        self.calls += 1
+        self.last_call_at = time.monotonic()
+        self.failures += 1
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+COMPLEX_QUESTION_PATTERN = re.compile(
+    r"\b(compare|comparison|difference|differences|versus|vs|why|explain|analy[sz]e|pros and cons|step by step|"
+    r"võrdle|võrdlus|erinevus|erinevused|miks|selgita|analüüsi|plussid|miinused)\b",
+    re.IGNORECASE,
+)
+
+
+def is_complex_question(question: str) -> bool:
+    """
+    Heuristic for questions that need reasoning over several pages rather than a lookup.
+    """
+    return (
+        len(question.split()) > settings.MODEL_COMPLEX_QUESTION_WORDS
+        or question.count("?") > 1
+        or COMPLEX_QUESTION_PATTERN.search(question) is not None
+    )
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Timeouts, connection errors and 5xx responses are worth retrying on another model,
+    client errors (bad request, authentication) would fail on every model.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in ("APITimeoutError", "APIConnectionError", "InternalServerError"):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+_stats_lock = threading.Lock()
+_stats: dict[str, ModelStats] = {}
+"""
+Process-wide statistics by model name, shared by all requests.
+"""
+
+
+class ModelRouter:
+    """
+    Chooses the model chain for a request. The primary model is the cheapest healthy model of the needed tier
+    (higher for complex questions) whose context window fits the prompt. The rest of the chain are fallbacks
+    for timeouts and server errors: remaining healthy models by tier, then unhealthy ones (high recent error
+    rate or latency) as a last resort. Demoted models get hardly any calls to update their statistics, so a model
+    not called for MODEL_RECOVERY_INTERVAL seconds counts as healthy again and is tried with the next request.
+    """
+
+    def __init__(self, profiles: Optional[List[ModelProfile]] = None):
+        if profiles is None:
+            profiles = [ModelProfile(**profile) for profile in settings.MODEL_PROFILES]
+        self.profiles = profiles
+
+    def route(self, question: str, context_tokens: int) -> List[ModelProfile]:
+        """
+        Returns:
+            List[ModelProfile]: models to try in order, empty when no model fits the context
+        """
+        needed_tier = settings.MODEL_COMPLEX_QUESTION_TIER if is_complex_question(question) else 1
+        fitting = [
+            profile for profile in self.profiles
+            if context_tokens + settings.MODEL_OUTPUT_TOKENS_RESERVE <= profile.max_context_tokens
+        ]
+
+        def order(profile: ModelProfile):
+            below_needed = profile.tier < needed_tier
+            return not self.is_healthy(profile.name), below_needed, abs(profile.tier - needed_tier), profile.input_cost
+
+        return sorted(fitting, key=order)
+
+    def is_healthy(self, model: str, now: Optional[float] = None) -> bool:
+        stats = self.stats(model)
+        now = time.monotonic() if now is None else now
+        if stats.last_call_at is not None and now - stats.last_call_at >= settings.MODEL_RECOVERY_INTERVAL:
+            return True
+        if stats.error_rate > settings.MODEL_MAX_ERROR_RATE:
+            return False
+        return stats.latency is None or stats.latency <= settings.MODEL_MAX_LATENCY
+
+    def stats(self, model: str) -> ModelStats:
+        with _stats_lock:
+            if model not in _stats:
+                _stats[model] = ModelStats(settings.MODEL_STATS_ALPHA)
+            return _stats[model]
+
+    def record_success(self, profile: ModelProfile, latency: float, input_tokens: int, output_tokens: int):
+        stats = self.stats(profile.name)
+        with _stats_lock:
+            stats.record_success(latency, input_tokens, output_tokens, profile.cost(input_tokens, output_tokens))
+
+    def record_failure(self, profile: ModelProfile, latency: float):
+        stats = self.stats(profile.name)
+        with _stats_lock:
+            stats.record_failure(latency)
+
+    def stats_report(self) -> dict[str, dict]:
+        """
+        Returns:
+            dict[str, dict]: statistics and health of every configured model
+        """
+        report = {}
+        for profile in self.profiles:
+            stats = self.stats(profile.name)
+            with _stats_lock:
+                report[profile.name] = {**stats.to_dict(), "tier": profile.tier}
+            report[profile.name]["healthy"] = self.is_healthy(profile.name)
+        return report
+
+    @staticmethod
+    def reset_stats():
+        with _stats_lock:
+            _stats.clear()
+
+
+class OpenAIModelClient:
+    """
+    Calls the OpenAI Responses API with structured output parsing.
+    """
+
+    def parse(self, model: str, messages: list[dict], text_format, timeout: float):
+        import openai
+
+        return openai.responses.parse(model=model, input=messages, text_format=text_format, timeout=timeout)
+
+
+class StubModelClient:
+    """
+    Local stand-in for OpenAI used in tests and benchmarks. Every model answers after a configurable latency,
+    chosen models fail with a timeout or a server error.
+
+    Attributes:
+        latency: seconds per call by model name (default 0)
+        failures: exception to raise by model name
+        calls: models called, in order
+    """
+
+    def __init__(self, answer_factory, latency: Optional[dict[str, float]] = None,
+                 failures: Optional[dict[str, Exception]] = None):
+        self.answer_factory = answer_factory
+        self.latency = latency or {}
+        self.failures = failures or {}
+        self.calls: list[str] = []
+
+    def parse(self, model: str, messages: list[dict], text_format, timeout: float):
+        self.calls.append(model)
+        latency = self.latency.get(model, 0)
+        if latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{model} timed out after {timeout}s")
+        time.sleep(latency)
+        if model in self.failures:
+            raise self.failures[model]
+        return self.answer_factory(model, messages)
@@ -1,19 +1,53 @@
-from typing import Dict
-import openai
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
 
 from app.config import settings
 from app.dtos.ask_response import AskResponse, AskFormat, Usage
+from app.utils.timing import timed
+from app.utils.usage import record_usage
+from app.services.model_router import ModelProfile, ModelRouter, OpenAIModelClient, is_retryable_error
+from app.utils.tokens import estimate_tokens
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    No model answered before the deadline of the request.
+    """
+
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+"""
+Worker threads of model calls, shared by all requests of the process.
+"""
+
+
+def get_model_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.MODEL_CALL_THREADS, thread_name_prefix="model-call")
+        return _executor
 
 
 class OpenAIService:
     """
     Requires OPENAI_API_KEY in .env
+    The openai package is imported on first use, it is the slowest import of the application.
+    Model of every question is chosen by ModelRouter, timeouts and server errors fall back to the next model.
     """
 
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None, client=None):
         """
         Initialize the OpenAI service with API credentials.
 
+        Args:
+            router (ModelRouter): Model selection, configured from MODEL_PROFILES by default
+            client: Model client with parse(model, messages, text_format, timeout), OpenAI API by default
+
         Raises:
             Exception: If OPENAI_API_KEY is not set in environment variables
         """
@@ -21,9 +55,14 @@ class OpenAIService:
         if not settings.OPENAI_API_KEY:
             raise Exception('OPENAI_API_KEY not set')
 
+        import openai
         openai.api_key = settings.OPENAI_API_KEY
 
-    def answer_question(self, question: str, data: Dict[str, str]) -> AskResponse:
+        self.router = router or ModelRouter()
+        self.client = client or OpenAIModelClient()
+
+    def answer_question(self, question: str, data: Dict[str, str], history: Optional[str] = None,
+                        deadline: Optional[float] = None) -> AskResponse:
         """
         Generate an AI-powered answer to a question using provided context.
 
@@ -31,12 +70,15 @@ class OpenAIService:
             question (str): The user's question to be answered
             data (Dict[str, str]):
                 Example: {"https://example.com": "Page content..."}
+            history (str): Earlier turns of the conversation, used to resolve follow-up questions
+            deadline (float): time.monotonic() by which the answer is needed, None to wait for the whole chain
 
         Returns:
             AskResponse
 
         Raises:
-            Exception: If the OpenAI API call fails
+            DeadlineExceeded: If no model answered before the deadline
+            Exception: If the OpenAI API call fails on every model of the chain
         """
         try:
             context = self._concatinate_content(data)
@@ -59,17 +101,20 @@ Guidelines:
             user_prompt = f"""Question: {question}
 
 Information: {context}"""
+            if history:
+                user_prompt = f"""Conversation so far:
+{history}
 
-            response = openai.responses.parse(
-                model=settings.CHATGPT_MODEL,
-                input=[
-                    {"role": "system", "content": system_rules},
-                    {"role": "user", "content": user_prompt},
-                ],
-                text_format=AskFormat,
-            )
+{user_prompt}"""
+
+            messages = [
+                {"role": "system", "content": system_rules},
+                {"role": "user", "content": user_prompt},
+            ]
+            response, profile = self._parse_with_fallback(question, messages, deadline)
 
             structured_answer = response.output_parsed
+            record_usage(response.usage.input_tokens, response.usage.output_tokens)
 
             return AskResponse(
                 question=structured_answer.question,
@@ -78,12 +123,130 @@ Information: {context}"""
                 usage=Usage(
                     input_tokens=response.usage.input_tokens,
                     output_tokens=response.usage.output_tokens
-                )
+                ),
+                model=profile.name,
             )
 
         except Exception as e:
             print(f"[OpenAIService] @answer_question: {e}")
             raise e
 
+    def _parse_with_fallback(self, question: str, messages: List[dict],
+                             deadline: Optional[float] = None) -> Tuple[object, ModelProfile]:
+        """
+        Calls models of the routed chain until one answers, timeouts and server errors move on to the next model.
+        With ASK_HEDGE_DELAY, a model that has not answered by then gets a parallel request to the next model
+        of the chain and the first answer wins. Latency, errors, tokens and cost are tracked per model.
+
+        Calls run in the shared model call threads, so the deadline holds even when a call hangs. Calls still
+        running at the deadline are abandoned, they finish in the background and are recorded in the model
+        statistics. Every attempt gets at most an equal share of the time left to the deadline, so a slow
+        primary model times out while the next models of the chain can still answer.
+
+        Returns:
+            Tuple: parsed response and the model that produced it
+
+        Raises:
+            DeadlineExceeded: If no model answered before the deadline
+            Exception: Non-retryable error of a model, or the last error when every model failed
+        """
+        context_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        chain = self.router.route(question, context_tokens)
+        if not chain:
+            raise Exception(f"Prompt of about {context_tokens} tokens does not fit any model")
+
+        remaining = list(chain)
+        pending = {}
+        last_error = None
+        hedge_at = time.monotonic() + settings.ASK_HEDGE_DELAY if settings.ASK_HEDGE_DELAY else None
+        executor = get_model_executor()
+
+        def call(profile: ModelProfile, timeout: float):
+            started = time.perf_counter()
+            try:
+                with timed("upstream"):
+                    response = self.client.parse(profile.name, messages, AskFormat, timeout)
+            except Exception as e:
+                if is_retryable_error(e):
+                    self.router.record_failure(profile, time.perf_counter() - started)
+                raise
+            self.router.record_success(profile, time.perf_counter() - started,
+                                       response.usage.input_tokens, response.usage.output_tokens)
+            return response
+
+        def launch(profile: ModelProfile):
+            timeout = settings.MODEL_TIMEOUT
+            if deadline is not None:
+                # This model and every model left in the chain get an equal share of the time left
+                timeout = max(min(timeout, (deadline - time.monotonic()) / (len(remaining) + 1)), 0.001)
+            # Copy context so timings are recorded to the request
+            pending[executor.submit(contextvars.copy_context().run, call, profile, timeout)] = profile
+
+        try:
+            launch(remaining.pop(0))
+            while pending:
+                wake_at = min((moment for moment in (deadline, hedge_at) if moment is not None), default=None)
+                timeout = None if wake_at is None else max(wake_at - time.monotonic(), 0)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    profile = pending.pop(future)
+                    try:
+                        return future.result(), profile
+                    except Exception as e:
+                        if not is_retryable_error(e):
+                            raise
+                        print(f"[OpenAIService] @answer_question: {profile.name} failed ({e}), trying next model")
+                        last_error = e
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DeadlineExceeded("No model answered before the deadline")
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    if pending:
+                        profile = remaining.pop(0) if remaining else next(iter(pending.values()))
+                        print(f"[OpenAIService] @answer_question: no answer yet, hedging with {profile.name}")
+                        launch(profile)
+                if not pending and remaining:
+                    launch(remaining.pop(0))
+            raise last_error
+        finally:
+            # Calls that have not started are dropped, running ones finish in the background
+            for future in pending:
+                future.cancel()
+
+    def summarize_conversation(self, summary: str, turns: List[Tuple[str, str]]) -> str:
+        """
+        Fold older conversation turns into a short rolling summary.
+
+        Args:
+            summary (str): Current summary, empty for the first compaction
+            turns (List[Tuple[str, str]]): (question, answer) pairs to add to the summary
+
+        Returns:
+            str: New summary
+
+        Raises:
+            Exception: If the OpenAI API call fails
+        """
+        import openai
+
+        try:
+            transcript = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+            response = openai.responses.create(
+                model=settings.CHATGPT_MODEL,
+                input=[
+                    {"role": "system", "content": "Summarize the conversation in at most 5 short sentences. "
+                                                  "Keep names, products, prices and what the user is asking "
+                                                  "about. Write in the language of the conversation."},
+                    {"role": "user", "content": f"Summary so far: {summary or '-'}\n\n{transcript}"},
+                ],
+            )
+            record_usage(response.usage.input_tokens, response.usage.output_tokens)
+            return response.output_text.strip()
+        except Exception as e:
+            print(f"[OpenAIService] @summarize_conversation: {e}")
+            raise e
+
     def _concatinate_content(self, data: Dict[str, str]) -> str:
         return "\n\n".join([f"[{url}]\n{content}" for url, content in data.items()])
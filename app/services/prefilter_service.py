@@ -0,0 +1,231 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.config import settings
+
+
+STOPWORDS = {
+    "et": {
+        "ja", "ning", "et", "kas", "see", "seda", "selle", "on", "ei", "ole", "oli", "mis", "mida", "mille", "kes",
+        "keda", "kus", "kui", "kuidas", "miks", "millal", "milline", "millised", "milliseid", "palju", "teie",
+        "te", "ma", "mina", "meie", "me", "mul", "teil", "oma", "ka", "ega", "aga", "või", "siis", "nii", "veel",
+        "kõik", "kõike", "saab", "saan", "olete", "pakute", "tehke", "palun", "mulle", "teile",
+    },
+    "en": {
+        "the", "a", "an", "and", "or", "is", "are", "was", "be", "do", "does", "did", "what", "which", "who",
+        "how", "why", "when", "where", "can", "could", "you", "your", "we", "our", "i", "me", "my", "it", "of",
+        "to", "in", "on", "for", "with", "about", "this", "that", "there", "have", "has", "any", "much", "many",
+        "please", "tell", "offer", "provide",
+    },
+}
+"""
+Frequent function words per language, used for language detection and ignored in relevance scoring.
+"""
+
+CANNED_ANSWERS = {
+    "et": "Sellele küsimusele ei leidu veebilehel vastust.",
+    "en": "This question is not covered by the website.",
+}
+
+INJECTION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"\b(ignore|disregard|forget|override)\b.{0,30}\b(previous|prior|above|earlier|all|your|system)\b.{0,20}"
+    r"\b(instructions?|rules|prompts?|guidelines|context)\b",
+    r"\b(reveal|show|print|repeat|output)\b.{0,30}\b(system prompt|instructions|initial prompt|rules)\b",
+    r"\byou are now (dan|an? (unrestricted|unfiltered|uncensored|different|new) (ai|assistant|model|bot))\b",
+    r"\byou are no longer (bound|restricted|limited|an? (ai|assistant|model|bot))\b",
+    r"\bfrom now on,? you (are|will|must|should)\b",
+    r"\b(jailbreak|developer mode|dan mode|do anything now)\b",
+    r"\bpretend (to be|you are)\b",
+    r"<\|?(system|im_start|endoftext)\|?>",
+    r"\bignoreeri\b.{0,30}\b(juhiseid|juhised|reegleid|eelnevat)\b",
+)]
+"""
+Prompt-injection phrasings (English and Estonian). Matches are rejected before any model call.
+Only imperative role overrides are matched, questions about prompts or the company ("What is a system prompt?") pass.
+"""
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+VOWELS = set("aeiouyäöüõ")
+STEM_LENGTH = 5
+"""
+Words are compared by prefix, so inflected forms match (e.g. "koolitusi" and "koolitused").
+"""
+
+
+@dataclass(frozen=True)
+class PrefilterResult:
+    """
+    Attributes:
+        verdict: PrefilterService.ALLOW, REJECT (invalid question) or OFF_TOPIC (answer with a canned answer)
+        reason: why the question was stopped, empty when allowed
+        language: detected language code or None
+        relevance: share of the question's content words found in the corpus, None when not scored
+    """
+    verdict: str
+    reason: str = ""
+    language: Optional[str] = None
+    relevance: Optional[float] = None
+
+    @property
+    def allowed(self) -> bool:
+        return self.verdict == PrefilterService.ALLOW
+
+
+_stats_lock = threading.Lock()
+_stats = {"checked": 0, "allowed": 0, "gibberish": 0, "injection": 0, "off_topic": 0}
+"""
+Process-wide prefilter counters, every stopped question is an OpenAI call that was not made.
+"""
+
+_vocabulary_lock = threading.Lock()
+_vocabulary_cache: dict = {}
+
+
+class PrefilterService:
+    """
+    Cheap local checks that run before the paid model call: gibberish and repetition heuristics,
+    prompt-injection patterns, language detection and lexical relevance to the crawled corpus.
+    """
+
+    ALLOW = "allow"
+    REJECT = "reject"
+    OFF_TOPIC = "off_topic"
+
+    def check(self, question: str, pages: Optional[Dict[str, str]] = None) -> PrefilterResult:
+        """
+        Runs all checks. Relevance is scored only when pages are given and the question is in a language
+        the corpus is written in, questions in other languages are left to the model.
+
+        Args:
+            question (str): The user's question
+            pages (Dict[str, str]): Corpus to score relevance against, None to skip relevance (e.g. follow-ups)
+
+        Returns:
+            PrefilterResult
+        """
+        if not settings.PREFILTER_ENABLED:
+            return PrefilterResult(self.ALLOW)
+
+        result = self._check_question(question)
+        if not result.allowed or pages is None or not settings.PREFILTER_MIN_RELEVANCE:
+            return self._allowed(result)
+
+        stems, languages = self._corpus_vocabulary(pages)
+        if result.language not in languages:
+            return self._allowed(result)
+
+        relevance = self.relevance(question, stems, result.language)
+        if relevance is not None and relevance < settings.PREFILTER_MIN_RELEVANCE:
+            self._count("off_topic")
+            return PrefilterResult(self.OFF_TOPIC, "Question is not covered by the website", result.language,
+                                   relevance)
+        return self._allowed(PrefilterResult(self.ALLOW, language=result.language, relevance=relevance))
+
+    def _check_question(self, question: str) -> PrefilterResult:
+        """
+        Question-only checks, REJECT verdict for gibberish and injection attempts.
+        """
+        language = self.detect_language(question)
+        reason = self._gibberish_reason(question)
+        if reason:
+            self._count("gibberish")
+            return PrefilterResult(self.REJECT, reason, language)
+        if any(pattern.search(question) for pattern in INJECTION_PATTERNS):
+            self._count("injection")
+            return PrefilterResult(self.REJECT, "Question contains instructions to the assistant", language)
+        return PrefilterResult(self.ALLOW, language=language)
+
+    @staticmethod
+    def canned_answer(language: Optional[str]) -> str:
+        return CANNED_ANSWERS.get(language or "", CANNED_ANSWERS["en"])
+
+    @staticmethod
+    def detect_language(text: str) -> Optional[str]:
+        """
+        Language with most stopword hits, None when no stopwords are found.
+        """
+        words = [word.lower() for word in WORD_PATTERN.findall(text)]
+        hits = {language: sum(word in stopwords for word in words) for language, stopwords in STOPWORDS.items()}
+        language, count = max(hits.items(), key=lambda item: item[1])
+        if count == 0:
+            # Estonian letters are a strong hint even without stopwords
+            return "et" if re.search(r"[õäöü]", text.lower()) else None
+        return language
+
+    @staticmethod
+    def relevance(question: str, stems: set, language: Optional[str]) -> Optional[float]:
+        """
+        Share of the question's content words whose stem occurs in the corpus.
+
+        Returns:
+            float between 0 and 1, None when the question has no content words
+        """
+        stopwords = STOPWORDS.get(language, set())
+        words = [word.lower() for word in WORD_PATTERN.findall(question)]
+        content = [word for word in words if len(word) >= 3 and word not in stopwords]
+        if not content:
+            return None
+        return sum(word[:STEM_LENGTH] in stems for word in content) / len(content)
+
+    @staticmethod
+    def stats() -> dict:
+        with _stats_lock:
+            stats = dict(_stats)
+        stats["avoided_calls"] = stats["gibberish"] + stats["injection"] + stats["off_topic"]
+        return stats
+
+    @staticmethod
+    def _count(key: str):
+        with _stats_lock:
+            _stats["checked"] += 1
+            _stats[key] += 1
+
+    def _allowed(self, result: PrefilterResult) -> PrefilterResult:
+        if result.allowed:
+            self._count("allowed")
+        return result
+
+    @staticmethod
+    def _gibberish_reason(question: str) -> str:
+        characters = [char for char in question if not char.isspace()]
+        letters = [char.lower() for char in characters if char.isalpha()]
+        if not characters or len(letters) / len(characters) < 0.5:
+            return "Question consists mostly of symbols"
+        # Only letters count, punctuation ("???????"), dashes and numbers ("1000000") repeat in real questions
+        runs = [len(match.group(0)) for match in re.finditer(r"([^\W\d_])\1{5,}", question, re.IGNORECASE)]
+        if runs and max(runs) / len(characters) > 0.5:
+            return "Question contains long repeated characters"
+
+        words = [word.lower() for word in WORD_PATTERN.findall(question)]
+        if len(words) >= 6 and len(set(words)) / len(words) < 0.4:
+            return "Question repeats the same words"
+
+        latin = [char for char in letters if "a" <= char <= "z" or char in VOWELS]
+        if len(latin) >= 8 and sum(char in VOWELS for char in latin) / len(latin) < 0.15:
+            return "Question does not look like words"
+        return ""
+
+    @staticmethod
+    def _corpus_vocabulary(pages: Dict[str, str]) -> tuple[set, set]:
+        """
+        Word stems and detected languages of the corpus, cached until the corpus changes.
+        """
+        key = (len(pages), sum(len(content) for content in pages.values()), hash(tuple(pages)))
+        with _vocabulary_lock:
+            cached = _vocabulary_cache.get("corpus")
+            if cached and cached[0] == key:
+                return cached[1], cached[2]
+
+        stems = set()
+        languages = set()
+        for content in pages.values():
+            stems.update(word.lower()[:STEM_LENGTH] for word in WORD_PATTERN.findall(content))
+            language = PrefilterService.detect_language(content[:2000])
+            if language:
+                languages.add(language)
+
+        with _vocabulary_lock:
+            _vocabulary_cache["corpus"] = (key, stems, languages)
+        return stems, languages
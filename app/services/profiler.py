@@ -0,0 +1,204 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+
+
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+}
+"""
+Innermost frames of threads that wait for work (thread pools, the event loop), their samples are dropped.
+"""
+
+
+class Profile:
+    """
+    Aggregated stack samples of one profiling run.
+
+    Attributes:
+        id: profile id
+        label: what was profiled, e.g. "POST /ask" or "window"
+        started_at: unix time the run started
+        duration: seconds sampled, None while running
+        samples: stack samples taken (one per busy thread per tick)
+        stacks: sample counts by stack, outermost frame first
+    """
+
+    def __init__(self, label: str, profile_id: Optional[str] = None):
+        self.id = profile_id or uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        return self.duration is None
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "samples": self.samples,
+            "running": self.running,
+        }
+
+    def functions(self, limit: int) -> list[dict]:
+        """
+        Functions with most samples. Self samples are spent in the function itself,
+        total samples include the functions it called.
+        """
+        own = Counter()
+        total = Counter()
+        for stack, count in self._stacks().items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+        samples = self.samples or 1
+        return [
+            {
+                "function": frame,
+                "self_samples": own[frame],
+                "total_samples": count,
+                "self_share": round(own[frame] / samples, 3),
+                "total_share": round(count / samples, 3),
+            }
+            for frame, count in total.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        """
+        Stacks in collapsed format ("outer;inner count" per line), readable by flamegraph.pl and speedscope.
+        """
+        stacks = sorted(self._stacks().items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks)
+
+    def _stacks(self) -> dict:
+        # dict() copies in one step, the sampler thread may be adding stacks of a running profile
+        return dict(self.stacks)
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of all threads of the process at a fixed interval from a background thread.
+    Unlike cProfile it also sees work running in thread pools, and the profiled code is not slowed down
+    by per-call instrumentation. On a busy worker other requests show up in the samples too.
+    """
+
+    def __init__(self, profile: Profile, interval: Optional[float] = None):
+        self.profile = profile
+        self.interval = interval or settings.PROFILING_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profile.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+    def run_for(self, seconds: float) -> Profile:
+        """
+        Sample for the given time in the calling thread.
+        """
+        self._started = time.perf_counter()
+        threading.Timer(seconds, self._stop.set).start()
+        self._run()
+        self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+    def _run(self):
+        own_thread = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = self._stack(frame)
+                if stack:
+                    self.profile.stacks[stack] += 1
+                    self.profile.samples += 1
+
+    @staticmethod
+    def _stack(frame) -> Optional[tuple]:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+
+_profiles_lock = threading.Lock()
+_profiles: "OrderedDict[str, Profile]" = OrderedDict()
+"""
+Latest profiles of the process by id, oldest are dropped beyond PROFILING_MAX_PROFILES.
+"""
+
+
+def save_profile(profile: Profile):
+    with _profiles_lock:
+        _store(profile)
+
+
+def _store(profile: Profile):
+    _profiles[profile.id] = profile
+    while len(_profiles) > settings.PROFILING_MAX_PROFILES:
+        _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def list_profiles() -> list[Profile]:
+    """
+    Stored profiles, newest first.
+    """
+    with _profiles_lock:
+        return list(reversed(_profiles.values()))
+
+
+def start_window_profile(seconds: float) -> Optional[Profile]:
+    """
+    Profile the whole process for the next seconds in a background thread.
+
+    Returns:
+        Profile (running) or None when a window profile is already running
+    """
+    profile = Profile("window")
+    with _profiles_lock:
+        if any(other.running and other.label == "window" for other in _profiles.values()):
+            return None
+        _store(profile)
+    threading.Thread(target=SamplingProfiler(profile).run_for, args=(seconds,), name=f"profiler-{profile.id}",
+                     daemon=True).start()
+    return profile
+
+
+def clear_profiles():
+    with _profiles_lock:
+        _profiles.clear()
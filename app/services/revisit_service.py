@@ -0,0 +1,151 @@
+import hashlib
+import math
+import time
+from typing import List, Optional
+
+from app.config import settings
+from app.cruds.page_schedule_crud import PageScheduleCrud
+from app.db.models.page_schedule import PageHistory, PageSchedule
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def estimate_change_rate(checks: int, changes: int, observed_seconds: float) -> Optional[float]:
+    """
+    Change rate of a page checked at (roughly) regular intervals, assuming changes arrive as a Poisson process.
+    A check only tells whether the page changed since the previous one, not how many times, so the naive
+    changes / time underestimates frequently changing pages. This is the bias-reduced estimator of
+    Cho and Garcia-Molina: -ln((n - X + 0.5) / (n + 0.5)) / mean interval.
+
+    Args:
+        checks (int): Number of intervals between consecutive checks (n)
+        changes (int): Intervals in which the content changed (X)
+        observed_seconds (float): Time from the first to the last check
+
+    Returns:
+        float: changes per second, None when there is nothing to estimate from
+    """
+    if checks <= 0 or observed_seconds <= 0:
+        return None
+    mean_interval = observed_seconds / checks
+    return -math.log((checks - changes + 0.5) / (checks + 0.5)) / mean_interval
+
+
+class RevisitScheduler:
+    """
+    Plans revisits of crawled pages. Every check of a page is stored in page_history with its content hash,
+    the change rate estimated from the latest checks sets the desired revisit interval: about the expected
+    time between changes, bounded by REVISIT_MIN_INTERVAL and REVISIT_MAX_INTERVAL. Frequently changing
+    pages are revisited often, static ones rarely. When the pages together ask for more than
+    REVISIT_REQUESTS_PER_HOUR, every interval is stretched by the same factor.
+    """
+
+    def __init__(self, db):
+        self.crud = PageScheduleCrud(db)
+
+    def record_check(self, url: str, content: Optional[str], status: int = 200,
+                     now: Optional[float] = None) -> bool:
+        """
+        Store the outcome of a fetch and reschedule the page.
+
+        Args:
+            url (str): Canonical URL of the page
+            content (str): Extracted content, None when the fetch failed
+            status (int): HTTP status of the response, 0 when there was no response
+            now (float): Unix time of the check, current time by default
+
+        Returns:
+            bool: content is new or differs from the last successful check, so it has to be stored
+        """
+        now = time.time() if now is None else now
+        new_hash = content_hash(content) if content is not None else None
+        schedule = self.crud.get_schedule(url)
+        if schedule is None:
+            schedule = PageSchedule(url=url, interval=settings.REVISIT_INITIAL_INTERVAL, checks=0, changes=0)
+
+        changed = new_hash is not None and schedule.content_hash is not None and new_hash != schedule.content_hash
+        self.crud.add_history(url, new_hash, status, changed, now)
+        history = self.crud.get_history(url, settings.REVISIT_HISTORY_SIZE)
+        self.crud.prune_history(url, settings.REVISIT_HISTORY_SIZE)
+
+        is_new = schedule.content_hash is None and new_hash is not None
+        # Demand of the page at its previous interval is replaced by the one at its new interval
+        previous_demand = 3600 / schedule.interval if schedule.id is not None else 0.0
+        schedule.checks += 1
+        if changed:
+            schedule.changes += 1
+            schedule.last_changed_at = now
+        if new_hash is not None:
+            schedule.content_hash = new_hash
+        schedule.last_checked_at = now
+
+        rate = self._change_rate(history)
+        schedule.change_rate = rate * 86400 if rate is not None else None
+        schedule.interval = self.interval_for(rate) if rate is not None else schedule.interval
+        demand = self.crud.get_revisits_per_hour() - previous_demand + 3600 / schedule.interval
+        schedule.next_due_at = now + schedule.interval * self.budget_factor(demand)
+        self.crud.save_schedule(schedule)
+        return changed or is_new
+
+    @staticmethod
+    def interval_for(rate: float) -> float:
+        """
+        Desired revisit interval for a change rate (changes per second): expected time between changes.
+        """
+        interval = 1 / rate if rate > 0 else settings.REVISIT_MAX_INTERVAL
+        return min(max(interval, settings.REVISIT_MIN_INTERVAL), settings.REVISIT_MAX_INTERVAL)
+
+    def budget_factor(self, demand: Optional[float] = None) -> float:
+        """
+        How much intervals are stretched so all pages fit REVISIT_REQUESTS_PER_HOUR, 1 when they fit.
+
+        Args:
+            demand (float): Revisits per hour the pages ask for, read from the schedules when None
+        """
+        if demand is None:
+            demand = self.crud.get_revisits_per_hour()
+        return max(1.0, demand / settings.REVISIT_REQUESTS_PER_HOUR)
+
+    @staticmethod
+    def batch_size() -> int:
+        """
+        Pages fetched per revisit round (REVISIT_TICK) within the hourly budget.
+        """
+        return max(1, int(settings.REVISIT_REQUESTS_PER_HOUR * settings.REVISIT_TICK / 3600))
+
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[PageSchedule]:
+        """
+        Pages due for a revisit, most overdue first, at most one round of the budget.
+        """
+        now = time.time() if now is None else now
+        return self.crud.get_queue(limit or self.batch_size(), due_before=now)
+
+    def queue(self, limit: int) -> List[PageSchedule]:
+        """
+        Upcoming revisits, overdue ones first.
+        """
+        return self.crud.get_queue(limit)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: pages scheduled, revisits per hour they ask for, budget and the stretch factor applied
+        """
+        demand = self.crud.get_revisits_per_hour()
+        return {
+            "pages": self.crud.count_schedules(),
+            "requests_per_hour": settings.REVISIT_REQUESTS_PER_HOUR,
+            "demand_per_hour": round(demand, 3),
+            "budget_factor": round(self.budget_factor(demand), 3),
+            "batch_size": self.batch_size(),
+        }
+
+    @staticmethod
+    def _change_rate(history: List[PageHistory]) -> Optional[float]:
+        checks = [entry for entry in history if entry.content_hash is not None]
+        if len(checks) < 2:
+            return None
+        changes = sum(1 for entry in checks[1:] if entry.changed)
+        return estimate_change_rate(len(checks) - 1, changes, checks[-1].checked_at - checks[0].checked_at)
@@ -0,0 +1,207 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from app.config import settings
+from app.cruds.usage_crud import UsageCrud
+from app.db.models.usage_record import UsageRecord
+from app.dtos.ask_response import AskResponse
+from app.services.faq_service import normalize_question
+from app.services.model_router import ModelRouter
+
+
+PERIODS = {"hour": 3600, "day": 86400}
+
+
+def percentile(values: List[float], share: float) -> Optional[float]:
+    """
+    Nearest-rank percentile, None for no values.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def summarize(records: List[UsageRecord]) -> dict:
+    """
+    Totals and latency percentiles of ledger records.
+    """
+    latencies = [record.latency for record in records]
+    return {
+        "requests": len(records),
+        "input_tokens": sum(record.input_tokens for record in records),
+        "output_tokens": sum(record.output_tokens for record in records),
+        "cost": round(sum(record.cost for record in records), 6),
+        "cached": sum(1 for record in records if record.cached),
+        "degraded": sum(1 for record in records if record.degraded),
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+    }
+
+
+def usage_report(records: List[UsageRecord], period: str, since: float) -> dict:
+    """
+    Ledger records summarized in total and per UTC hour or day, buckets without records are left out.
+
+    Returns:
+        dict: period, since, total and buckets (oldest first, each with its start)
+    """
+    seconds = PERIODS[period]
+    buckets = {}
+    for record in records:
+        buckets.setdefault(int(record.created_at // seconds) * seconds, []).append(record)
+    return {
+        "period": period,
+        "since": _isoformat(since),
+        "total": summarize(records),
+        "buckets": [{"start": _isoformat(start), **summarize(bucket)} for start, bucket in sorted(buckets.items())],
+    }
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class UsageLedger:
+    """
+    Buffered writer of the usage ledger. Requests only append to an in-memory buffer, a background thread
+    inserts the buffer in batches every USAGE_LEDGER_FLUSH_INTERVAL seconds or as soon as USAGE_LEDGER_BATCH_SIZE
+    records are waiting. Records of a failed insert are kept for the next flush; past USAGE_LEDGER_MAX_BUFFER
+    the oldest are dropped, the ledger never holds requests up or grows without bound while the database is down.
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, max_buffer: Optional[int] = None):
+        if session_factory is None:
+            from app.db.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.USAGE_LEDGER_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.USAGE_LEDGER_FLUSH_INTERVAL
+        self.max_buffer = max_buffer or settings.USAGE_LEDGER_MAX_BUFFER
+        self.written = 0
+        self.dropped = 0
+        self._buffer: list[tuple] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, endpoint: str, response: AskResponse, latency: float):
+        """
+        Queue an answered question for the ledger. Normalization and cost are computed by the writer.
+
+        Args:
+            endpoint (str): "ask", "ask_batch" or "conversation"
+            response (AskResponse): The answer
+            latency (float): Seconds spent answering
+        """
+        if not settings.USAGE_LEDGER_ENABLED or self._closed:
+            return
+        entry = (time.time(), endpoint, response.question, response.model, response.usage.input_tokens,
+                 response.usage.output_tokens, latency, response.cached, response.degraded, len(response.sources))
+        with self._lock:
+            self._buffer.append(entry)
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Insert all buffered records now.
+
+        Returns:
+            int: Number of inserted records, 0 when the insert failed
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+
+            profiles = {profile.name: profile for profile in ModelRouter().profiles}
+            db = self.session_factory()
+            try:
+                UsageCrud(db).add_records([self._to_row(entry, profiles) for entry in entries])
+            except Exception as e:
+                print(f"[UsageLedger] @flush: {e}, {len(entries)} records kept for the next flush")
+                with self._lock:
+                    self._buffer[:0] = entries
+                    self._trim()
+                return 0
+            finally:
+                db.close()
+            self.written += len(entries)
+            return len(entries)
+
+    def close(self):
+        """
+        Stop the writer thread and insert what is left in the buffer.
+        """
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: buffered, written and dropped records of this worker process
+        """
+        with self._lock:
+            return {"buffered": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _trim(self):
+        excess = len(self._buffer) - self.max_buffer
+        if excess > 0:
+            del self._buffer[:excess]
+            self.dropped += excess
+
+    @staticmethod
+    def _to_row(entry: tuple, profiles: dict) -> dict:
+        created_at, endpoint, question, model, input_tokens, output_tokens, latency, cached, degraded, sources = entry
+        profile = profiles.get(model)
+        return {
+            "created_at": created_at,
+            "endpoint": endpoint,
+            "question": question,
+            "normalized": normalize_question(question),
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": profile.cost(input_tokens, output_tokens) if profile else 0.0,
+            "latency": latency,
+            "cached": cached,
+            "degraded": degraded,
+            "sources": sources,
+        }
+
+
+_ledger_lock = threading.Lock()
+_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """
+    Ledger writer of this worker process.
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger()
+        return _ledger
@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+SEARCH_BLOCK_ROWS = 8192
+"""
+Rows multiplied at once during search. Bounds temporary memory when int8 vectors are upcast to float32.
+"""
+
+
+class VectorIndex:
+    """
+    Brute-force vector index stored as a contiguous matrix in a .npy file and memory-mapped read-only,
+    so all worker processes share the same pages of the OS page cache instead of holding own copies.
+
+    Files (for path "data/embeddings"):
+        data/embeddings.json            metadata: version, dimension, quantization, matrix file name, chunks
+        data/embeddings-<version>.npy   float32 (or int8 when quantized) matrix, one row per chunk
+        data/embeddings-<version>.scales.npy   float32 per-row scales of int8 matrix
+
+    Metadata is replaced atomically after the matrix is written, so readers always see a complete version.
+
+    Attributes:
+        vectors: memory-mapped matrix of unit-length chunk embeddings
+        scales: per-row dequantization scales, None for float32 matrix
+        chunks: chunk metadata ({"url": ..., "text": ...}) in the same order as rows
+        version: index version (creation timestamp in nanoseconds)
+        provider: name of the embedding provider, queries must be embedded with the same one
+    """
+
+    def __init__(self, vectors: np.ndarray, chunks: list[dict], version: int, scales: Optional[np.ndarray] = None,
+                 provider: Optional[str] = None):
+        self.vectors = vectors
+        self.chunks = chunks
+        self.version = version
+        self.scales = scales
+        self.provider = provider
+
+    @staticmethod
+    def write(path: str, vectors: np.ndarray, chunks: list[dict], quantize: bool = False,
+              provider: Optional[str] = None) -> int:
+        """
+        Write new index version and remove matrices of older versions.
+
+        Args:
+            path (str): Index path without extension
+            vectors (np.ndarray): (n, dim) matrix of unit-length embeddings
+            chunks (list[dict]): Metadata for every row
+            quantize (bool): Store int8 matrix with per-row scales (4x smaller, slightly less precise)
+            provider (str): Name of the embedding provider
+
+        Returns:
+            int: Written index version
+        """
+        if len(vectors) != len(chunks):
+            raise ValueError("Every vector needs its chunk metadata")
+
+        base = Path(path)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        version = time.time_ns()
+        matrix_name = f"{base.name}-{version}.npy"
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        scales_name = None
+        if quantize:
+            scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+            scales[scales == 0] = 1.0
+            matrix = np.round(vectors / scales[:, None]).astype(np.int8)
+            scales_name = f"{base.name}-{version}.scales.npy"
+            np.save(base.parent / scales_name, scales.astype(np.float32))
+        else:
+            matrix = vectors
+        np.save(base.parent / matrix_name, matrix)
+
+        metadata = {
+            "version": version,
+            "dimension": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "quantized": quantize,
+            "matrix": matrix_name,
+            "scales": scales_name,
+            "provider": provider,
+            "chunks": chunks,
+        }
+        tmp_path = base.with_name(f"{base.name}.json.tmp")
+        tmp_path.write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, base.with_name(f"{base.name}.json"))
+
+        VectorIndex._remove_old_versions(base, keep={matrix_name, scales_name})
+        return version
+
+    @staticmethod
+    def load(path: str) -> Optional["VectorIndex"]:
+        """
+        Memory-map the current index version.
+
+        Returns:
+            VectorIndex or None if index does not exist
+        """
+        base = Path(path)
+        metadata_path = base.with_name(f"{base.name}.json")
+        if not metadata_path.exists():
+            return None
+
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        vectors = np.load(base.parent / metadata["matrix"], mmap_mode="r")
+        scales = None
+        if metadata.get("scales"):
+            scales = np.load(base.parent / metadata["scales"], mmap_mode="r")
+        return VectorIndex(vectors, metadata["chunks"], metadata["version"], scales, metadata.get("provider"))
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        """
+        Exact top-k search by cosine similarity (dot product of unit vectors).
+
+        Returns:
+            list[tuple[int, float]]: (row, score) pairs, best first
+        """
+        if len(self.chunks) == 0 or k <= 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), SEARCH_BLOCK_ROWS):
+            block = self.vectors[start:start + SEARCH_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ query
+        if self.scales is not None:
+            scores *= self.scales
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    @staticmethod
+    def _remove_old_versions(base: Path, keep: set):
+        for file in base.parent.glob(f"{base.name}-*.npy"):
+            if file.name not in keep:
+                # Workers that still map the old file keep reading it, the file is freed when they let go
+                file.unlink(missing_ok=True)
@@ -0,0 +1,19 @@
+import secrets
+from typing import Optional, Union
+
+from app.config import settings
+
+
+def is_admin_key(key: Optional[Union[str, bytes]]) -> bool:
+    """
+    Checks a X-Admin-Key header value against ADMIN_API_KEY in constant time, False when ADMIN_API_KEY is not set.
+    Compared as bytes, compare_digest raises TypeError for str with non-ASCII characters.
+
+    Args:
+        key (str | bytes): Raw header bytes, or the header decoded as latin-1 (as Starlette decodes headers)
+    """
+    if not settings.ADMIN_API_KEY:
+        return False
+    if isinstance(key, str):
+        key = key.encode("latin-1", errors="replace")
+    return secrets.compare_digest(key or b"", settings.ADMIN_API_KEY.encode("utf-8"))
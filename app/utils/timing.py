@@ -0,0 +1,77 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestTimings:
+    """
+    Time spent in named sections of one HTTP request (database, context assembly, upstream call...).
+    Sections entered several times (e.g. model fallbacks) are summed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections: dict[str, list] = {}
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            section = self.sections.setdefault(name, [0.0, 0])
+            section[0] += seconds
+            section[1] += 1
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """
+        Server-Timing header value, durations in milliseconds.
+        Example: db;dur=12.4, context;dur=3.1, upstream;dur=820.7;desc="2 calls", total;dur=841.0
+        """
+        with self._lock:
+            sections = list(self.sections.items())
+        metrics = []
+        for name, (seconds, count) in sections:
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                metric += f';desc="{count} calls"'
+            metrics.append(metric)
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+"""
+Timings of the request being profiled, None for all other requests. Threadpool workers get a copy
+of the context, so sections timed in worker threads add to the same object.
+"""
+
+
+def start_timing() -> tuple[RequestTimings, object]:
+    """
+    Bind new request timings to the current context.
+
+    Returns:
+        tuple: timings and token for stop_timing
+    """
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def stop_timing(token):
+    _current_timings.reset(token)
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Time a section of the current request. Outside of a profiled request it only reads the context variable.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
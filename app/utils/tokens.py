@@ -0,0 +1,11 @@
+import math
+
+
+CHARS_PER_TOKEN = 4
+"""
+Average characters per token used to estimate prompt size without a tokenizer.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,55 @@
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+
+class UsageCounter:
+    """
+    OpenAI token usage of one HTTP request. Services running in worker threads add to it
+    through record_usage, middleware reads it after the response is sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, input_tokens: int, output_tokens: int):
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+
+_current_usage: ContextVar[Optional[UsageCounter]] = ContextVar("current_usage", default=None)
+"""
+Usage counter of the request being handled. Threadpool workers (sync endpoints, batch executors)
+get a copy of the context, so they add to the same counter object.
+"""
+
+
+def start_usage_tracking() -> tuple[UsageCounter, object]:
+    """
+    Bind a new usage counter to the current context.
+
+    Returns:
+        tuple: counter and token for stop_usage_tracking
+    """
+    counter = UsageCounter()
+    return counter, _current_usage.set(counter)
+
+
+def stop_usage_tracking(token):
+    _current_usage.reset(token)
+
+
+def record_usage(input_tokens: int, output_tokens: int):
+    """
+    Report tokens spent on an OpenAI call. Does nothing outside of a tracked request (CLI, crawler, tests).
+    """
+    counter = _current_usage.get()
+    if counter is not None:
+        counter.add(input_tokens, output_tokens)
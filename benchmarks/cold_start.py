@@ -0,0 +1,103 @@
+"""
+Cold start benchmark. Starts the API with uvicorn in a fresh process (crawler disabled with SKIP_CRAWL)
+and measures the time to the first served request (/health) and to readiness (/ready), plus the import
+time of app.main alone.
+
+    python -m benchmarks.cold_start --runs 5
+
+/ready needs crawled pages in the database, without them only /health timings are reported.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, started: float, timeout: float) -> float | None:
+    """
+    Polls url until it answers 200.
+
+    Returns:
+        float: seconds since started, None if it did not answer 200 in time
+    """
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_import() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True, env={**os.environ, "SKIP_CRAWL": "true"})
+    return time.perf_counter() - started
+
+
+def measure_server(timeout: float) -> tuple[float | None, float | None]:
+    """
+    Runs one server start.
+
+    Returns:
+        tuple: seconds to first /health response and to first ready /ready response
+    """
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "SKIP_CRAWL": "true"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        health = wait_for(f"http://127.0.0.1:{port}/health", started, timeout)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", started, timeout) if health is not None else None
+        return health, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report(name: str, timings: list):
+    timings = [timing for timing in timings if timing is not None]
+    if not timings:
+        print(f"{name}: not reached")
+        return
+    print(f"{name}: median {statistics.median(timings):.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each endpoint")
+    args = parser.parse_args()
+
+    imports, healths, readies = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import())
+        health, ready = measure_server(args.timeout)
+        healths.append(health)
+        readies.append(ready)
+
+    print(f"runs: {args.runs}")
+    report("import app.main (incl. interpreter start)", imports)
+    report("first served request (/health)", healths)
+    report("ready (/ready)", readies)
+
+
+if __name__ == "__main__":
+    main()
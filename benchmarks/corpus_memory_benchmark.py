@@ -0,0 +1,64 @@
+"""
+Memory of serving pages from the corpus snapshot: a dict decoded per request (snapshot.to_dict())
+against the shared CorpusPages view, for a request that reads a few pages (retrieved context)
+and one that scans every page (prefilter, all pages sent to the model).
+
+    python -m benchmarks.corpus_memory_benchmark --pages 2000 --page-size 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.services.corpus_snapshot import CorpusService
+
+
+def read_few(pages) -> int:
+    return sum(len(pages[url]) for url in list(pages)[:5])
+
+
+def scan_all(pages) -> int:
+    return max(len(content) for content in pages.values())
+
+
+def measure(function) -> tuple[float, float]:
+    """
+    Returns:
+        tuple[float, float]: peak allocated MB and milliseconds of one call
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    function()
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=5000, help="characters per page")
+    args = parser.parse_args()
+
+    text = ("Tehisintellekti lahendused ettevõtetele. " * (args.page_size // 40 + 1))[:args.page_size]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = CorpusService(os.path.join(tmp_dir, "corpus.bin"))
+        service.write_snapshot({f"https://tehisintellekt.ee/leht/{i}": text for i in range(args.pages)})
+        snapshot = service.load_snapshot()
+        # Url index of the view is built once per snapshot, not per request
+        index_peak, _ = measure(service.get_pages)
+
+        print(f"{args.pages} pages, {os.path.getsize(service.snapshot_path) / 1024 / 1024:.1f} MB snapshot, "
+              f"view index {index_peak:.2f} MB once per snapshot")
+        for name, access in {"read 5 pages": read_few, "scan all pages": scan_all}.items():
+            print(name)
+            for path, get_pages in {"to_dict per request": snapshot.to_dict,
+                                    "CorpusPages view": service.get_pages}.items():
+                peak, elapsed = measure(lambda: access(get_pages()))
+                print(f"  {path:<22} {peak:8.2f} MB peak {elapsed:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Offline crawl benchmark. Replays a crawl archive (by default the bundled fixture site) through the real
+TextSpider, so extraction, link following and DB writes are measured without touching the live site.
+
+Record an archive of the live site once:
+    scrapy crawl text_spider -s CRAWL_ARCHIVE_MODE=record -s CRAWL_ARCHIVE_DIR=crawl_archive
+
+Then benchmark against it:
+    python -m benchmarks.crawl_benchmark --archive crawl_archive --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def run_replay_crawl(archive_dir: str, database_url: str, snapshot_path: str) -> float:
+    """
+    Runs one replay crawl into given database.
+
+    Returns:
+        float: wall time in seconds
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [
+            "scrapy", "crawl", "text_spider",
+            "-s", "CRAWL_ARCHIVE_MODE=replay",
+            "-s", f"CRAWL_ARCHIVE_DIR={archive_dir}",
+            "-s", "LOG_LEVEL=WARNING",
+        ],
+        env={**os.environ, "DATABASE_URL": database_url, "CORPUS_SNAPSHOT_PATH": snapshot_path},
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", default="tests/fixtures/site", help="crawl archive directory")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.db.database import Base
+    from app.cruds.page_crud import PageCrud
+
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+
+        for _ in range(args.runs):
+            timings.append(run_replay_crawl(args.archive, database_url, os.path.join(tmp_dir, 'corpus.bin')))
+
+        session = sessionmaker(bind=engine)()
+        pages, chars = PageCrud(session).get_content_stats()
+        session.close()
+        engine.dispose()
+
+    print(f"archive: {args.archive}")
+    print(f"pages stored: {pages}, chars stored: {chars}")
+    print(f"runs: {args.runs}, median: {statistics.median(timings):.3f}s, "
+          f"min: {min(timings):.3f}s, max: {max(timings):.3f}s")
+    print(f"pages/s (median run): {pages / statistics.median(timings):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Context compression benchmark: estimated prompt tokens of the whole corpus with full page content
+and with page digests, and the time it takes to build the digests.
+
+Pages are read from the corpus snapshot (CORPUS_SNAPSHOT_PATH), written by a crawl or a replayed crawl archive.
+
+    python -m benchmarks.digest_benchmark --snapshot data/corpus.bin --provider extractive
+"""
+import argparse
+import sys
+import time
+
+from app.config import settings
+from app.services.corpus_snapshot import CorpusService
+from app.services.digest_service import DigestService, get_digest_provider
+from app.utils.tokens import estimate_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=settings.CORPUS_SNAPSHOT_PATH, help="corpus snapshot path")
+    parser.add_argument("--provider", default=settings.DIGEST_PROVIDER, help="extractive or openai")
+    args = parser.parse_args()
+
+    pages = CorpusService(args.snapshot).get_pages()
+    if not pages:
+        print(f"No pages in {args.snapshot}, run a crawl first", file=sys.stderr)
+        return 1
+
+    settings.DIGEST_PROVIDER = args.provider
+    service = DigestService(get_digest_provider())
+    started = time.perf_counter()
+    digests = service.build_digests(pages)
+    elapsed = time.perf_counter() - started
+
+    full_tokens = sum(estimate_tokens(content) for content in pages.values())
+    digest_tokens = sum(estimate_tokens(digests.get(url) or content) for url, content in pages.items())
+    print(f"pages: {len(pages)}, with digest: {sum(1 for digest in digests.values() if digest)}")
+    print(f"full content: {full_tokens} tokens")
+    print(f"digests:      {digest_tokens} tokens ({full_tokens / max(digest_tokens, 1):.1f}x smaller)")
+    print(f"built in {elapsed:.2f}s with {args.provider}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
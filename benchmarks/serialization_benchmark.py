@@ -0,0 +1,78 @@
+"""
+Response serialization benchmark: small /ask response and a large /source_info corpus,
+through the serialization paths FastAPI and the application can take.
+
+    python -m benchmarks.serialization_benchmark --pages 200 --page-size 2000
+"""
+import argparse
+import json
+import timeit
+from typing import Dict
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.responses import FastJSONResponse
+from app.dtos.ask_response import AskResponse, Usage
+
+
+def ask_response() -> AskResponse:
+    return AskResponse(
+        question="Milliseid teenuseid ettevõte pakub?",
+        answer="Ettevõte pakub tehisintellekti koolitusi, konsultatsioone ja lahenduste arendust. " * 3,
+        sources=["https://tehisintellekt.ee/teenused", "https://tehisintellekt.ee/teenused/koolitused"],
+        usage=Usage(input_tokens=1250, output_tokens=87),
+    )
+
+
+def corpus(pages: int, page_size: int) -> Dict[str, str]:
+    text = ("Tehisintellekti lahendused ettevõtetele. " * (page_size // 40 + 1))[:page_size]
+    return {f"https://tehisintellekt.ee/leht/{i}": text for i in range(pages)}
+
+
+def measure(function, number: int) -> float:
+    """
+    Returns:
+        float: best time of one call in milliseconds
+    """
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=2000, help="characters per page")
+    parser.add_argument("--number", type=int, default=200, help="calls per measurement")
+    args = parser.parse_args()
+
+    ask = ask_response()
+    ask_adapter = TypeAdapter(AskResponse)
+    pages = corpus(args.pages, args.page_size)
+    pages_adapter = TypeAdapter(Dict[str, str])
+
+    cases = {
+        f"/ask response ({len(ask.model_dump_json())} bytes)": {
+            "validate + jsonable_encoder + json.dumps": lambda: json.dumps(
+                jsonable_encoder(AskResponse.model_validate(ask.model_dump()))).encode(),
+            "validate + pydantic dump_json (FastAPI default)": lambda: ask_adapter.dump_json(
+                ask_adapter.validate_python(ask)),
+            "model_dump_json": lambda: ask.model_dump_json().encode(),
+            "FastJSONResponse render": lambda: FastJSONResponse(ask).body,
+        },
+        f"/source_info ({args.pages} pages, {sum(map(len, pages.values()))} chars)": {
+            "jsonable_encoder + json.dumps": lambda: json.dumps(jsonable_encoder(pages)).encode(),
+            "validate + pydantic dump_json (FastAPI default)": lambda: pages_adapter.dump_json(
+                pages_adapter.validate_python(pages)),
+            "FastJSONResponse render": lambda: FastJSONResponse(pages).body,
+        },
+    }
+
+    for case, paths in cases.items():
+        print(case)
+        number = args.number if case.startswith("/ask") else max(args.number // 10, 1)
+        for name, function in paths.items():
+            print(f"  {name:<50} {measure(function, number):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
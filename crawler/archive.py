@@ -0,0 +1,129 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urldefrag
+
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CrawlArchive:
+    """
+    WARC-like archive of fetched responses: an index.jsonl with one entry per response
+    (url, method, status, headers, body file) and response bodies stored as separate files.
+    Bodies are stored exactly as received (still compressed, redirects included), so replay
+    goes through the same downloader middlewares as a live crawl.
+
+    Attributes:
+        path: archive directory
+        entries: index entries by (method, url without fragment). URLs are not canonicalized, "/about" and
+                 "/about/" can be different responses (e.g. a redirect to the trailing slash)
+    """
+
+    INDEX_FILE = "index.jsonl"
+    BODIES_DIR = "bodies"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: dict[tuple[str, str], dict] = {}
+
+    def load(self) -> "CrawlArchive":
+        index_path = self.path / self.INDEX_FILE
+        if not index_path.exists():
+            return self
+        with index_path.open(encoding="utf-8") as index_file:
+            for line in index_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[self._key(entry["url"], entry.get("method", "GET"))] = entry
+        return self
+
+    def get(self, url: str, method: str = "GET") -> Optional[dict]:
+        return self.entries.get(self._key(url, method))
+
+    def read_body(self, entry: dict) -> bytes:
+        return (self.path / entry["body"]).read_bytes()
+
+    def record(self, url: str, method: str, status: int, headers: dict[str, list[str]], body: bytes) -> dict:
+        """
+        Stores response body and appends its entry to the index. Later entries for the same URL win on load.
+        """
+        body_name = f"{self.BODIES_DIR}/{hashlib.sha1(body).hexdigest()}"
+        (self.path / self.BODIES_DIR).mkdir(parents=True, exist_ok=True)
+        (self.path / body_name).write_bytes(body)
+
+        entry = {"url": url, "method": method, "status": status, "headers": headers, "body": body_name}
+        with (self.path / self.INDEX_FILE).open("a", encoding="utf-8") as index_file:
+            index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.entries[self._key(url, method)] = entry
+        return entry
+
+    @staticmethod
+    def _key(url: str, method: str) -> tuple[str, str]:
+        return method.upper(), urldefrag(url)[0]
+
+
+class ArchiveMiddleware:
+    """
+    Downloader middleware that records responses to a CrawlArchive or replays a crawl from it.
+
+    Settings:
+        CRAWL_ARCHIVE_MODE: "record" or "replay", middleware is disabled when empty
+        CRAWL_ARCHIVE_DIR: archive directory
+
+    In replay mode nothing goes to the network: archived requests are answered from the archive
+    and requests missing from it are ignored, so crawls are offline and deterministic.
+    Placed after RedirectMiddleware (600), so redirects are recorded and replayed as they are.
+    """
+
+    def __init__(self, mode: str, archive: CrawlArchive, stats=None):
+        self.mode = mode
+        self.archive = archive
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mode = crawler.settings.get("CRAWL_ARCHIVE_MODE")
+        if not mode:
+            raise NotConfigured
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown CRAWL_ARCHIVE_MODE: {mode}")
+        path = crawler.settings.get("CRAWL_ARCHIVE_DIR")
+        if not path:
+            raise ValueError("CRAWL_ARCHIVE_DIR is required with CRAWL_ARCHIVE_MODE")
+        return cls(mode, CrawlArchive(path).load(), crawler.stats)
+
+    def process_request(self, request, spider=None):
+        if self.mode != REPLAY:
+            return None
+
+        entry = self.archive.get(request.url, request.method)
+        if entry is None:
+            self._inc_stats("archive/replay/missing")
+            raise IgnoreRequest(f"Not in crawl archive: {request.url}")
+
+        self._inc_stats("archive/replay/hit")
+        headers = Headers(entry["headers"])
+        body = self.archive.read_body(entry)
+        response_class = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        return response_class(url=request.url, status=entry["status"], headers=headers, body=body, request=request)
+
+    def process_response(self, request, response, spider=None):
+        if self.mode == RECORD:
+            headers = {
+                name.decode("latin-1"): [value.decode("latin-1") for value in values]
+                for name, values in response.headers.items()
+            }
+            self.archive.record(request.url, request.method, response.status, headers, response.body)
+            self._inc_stats("archive/record/count")
+        return response
+
+    def _inc_stats(self, key: str):
+        if self.stats is not None:
+            self.stats.inc_value(key)
@@ -0,0 +1,100 @@
+import math
+from collections import Counter
+from typing import Optional
+from urllib.parse import urlsplit
+
+from app.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+def url_section(url: str) -> str:
+    """
+    Section of the site a page belongs to: first path segment ("" for the root page).
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    return segments[0].lower() if segments else ""
+
+
+class ContentBudget:
+    """
+    Limits how much content the crawl stores. Only content that was actually committed
+    to the database is counted, so failed inserts, duplicates and empty pages are free.
+
+    Attributes:
+        max_chars: total characters limit
+        max_tokens: total estimated tokens limit, None for no limit
+        max_page_chars: characters stored per page, longer pages are truncated, None for no limit
+        section_quotas: characters limit per site section (first path segment), e.g. {"blogi": 30000}
+    """
+
+    def __init__(self, max_chars: int, max_tokens: Optional[int] = None, max_page_chars: Optional[int] = None,
+                 section_quotas: Optional[dict[str, int]] = None):
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+        self.max_page_chars = max_page_chars
+        self.section_quotas = {section.lower(): quota for section, quota in (section_quotas or {}).items()}
+
+        self.total_chars = 0
+        self.total_tokens = 0
+        self.section_chars: Counter = Counter()
+
+    @property
+    def is_exhausted(self) -> bool:
+        if self.total_chars >= self.max_chars:
+            return True
+        return self.max_tokens is not None and self.total_tokens >= self.max_tokens
+
+    def has_room_for(self, url: str) -> bool:
+        """
+        Checks if a page of the URL could still be stored, used to skip requests before downloading them.
+        """
+        return not self.is_exhausted and self._section_remaining(url_section(url)) > 0
+
+    def fit(self, url: str, content: str) -> Optional[str]:
+        """
+        Cuts content to the per-page cap and to what is left of total, token and section budgets.
+
+        Returns:
+            str: content to store, or None if it is empty or there is no budget left for it
+        """
+        content = content.strip()
+        limit = min(self.max_chars - self.total_chars, self._section_remaining(url_section(url)))
+        if self.max_page_chars is not None:
+            limit = min(limit, self.max_page_chars)
+        if self.max_tokens is not None:
+            limit = min(limit, (self.max_tokens - self.total_tokens) * CHARS_PER_TOKEN)
+
+        if not content or limit <= 0:
+            return None
+        return self._truncate(content, limit)
+
+    def commit(self, url: str, content: str):
+        """
+        Counts content that was stored.
+        """
+        self.total_chars += len(content)
+        self.total_tokens += estimate_tokens(content)
+        self.section_chars[url_section(url)] += len(content)
+
+    def release(self, url: str, content: str):
+        """
+        Stops counting content that was committed before, e.g. a stored page that is replaced.
+        """
+        self.total_chars -= len(content)
+        self.total_tokens -= estimate_tokens(content)
+        self.section_chars[url_section(url)] -= len(content)
+
+    def _section_remaining(self, section: str) -> float:
+        quota = self.section_quotas.get(section)
+        if quota is None:
+            return math.inf
+        return quota - self.section_chars[section]
+
+    @staticmethod
+    def _truncate(content: str, limit: int) -> str:
+        if len(content) <= limit:
+            return content
+        cut = content[:int(limit)]
+        # Do not leave a half of a word at the end
+        if " " in cut and not content[int(limit)].isspace():
+            cut = cut.rsplit(" ", 1)[0]
+        return cut.rstrip()
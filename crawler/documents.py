@@ -0,0 +1,152 @@
+import importlib.util
+import io
+import re
+import zipfile
+from typing import Optional
+from urllib.parse import urlsplit
+from xml.etree.ElementTree import iterparse
+
+
+HTML = "html"
+PDF = "pdf"
+DOCX = "docx"
+TEXT = "txt"
+
+CONTENT_TYPES = {
+    "text/html": HTML,
+    "application/xhtml+xml": HTML,
+    "application/pdf": PDF,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": DOCX,
+    "text/plain": TEXT,
+}
+"""
+Content types the spider stores as pages, anything else is not downloaded.
+"""
+
+DOCUMENT_EXTENSIONS = {".pdf": PDF, ".docx": DOCX, ".txt": TEXT}
+"""
+Extensions of documents that are followed although Scrapy ignores them by default.
+Also used when a server sends a generic content type (application/octet-stream) for a document.
+"""
+
+GENERIC_CONTENT_TYPES = {"", "application/octet-stream", "binary/octet-stream", "application/download"}
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def content_kind(content_type: str, url: str) -> Optional[str]:
+    """
+    What the spider can do with a response: HTML, PDF, DOCX, TEXT or None for unsupported content.
+
+    Args:
+        content_type (str): Content-Type header value, parameters (charset) are ignored
+        url (str): Response URL, its extension decides for generic content types
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPES:
+        return CONTENT_TYPES[media_type]
+    if media_type in GENERIC_CONTENT_TYPES:
+        path = urlsplit(url).path.lower()
+        return next((kind for extension, kind in DOCUMENT_EXTENSIONS.items() if path.endswith(extension)), None)
+    return None
+
+
+def available_kinds() -> set[str]:
+    """
+    Content kinds that can be extracted here, PDF needs the optional pypdf package.
+    """
+    kinds = {HTML, DOCX, TEXT}
+    if importlib.util.find_spec("pypdf") is not None:
+        kinds.add(PDF)
+    return kinds
+
+
+def document_extensions() -> set[str]:
+    """
+    Extensions of documents worth following.
+    """
+    kinds = available_kinds()
+    return {extension for extension, kind in DOCUMENT_EXTENSIONS.items() if kind in kinds}
+
+
+def should_download(content_type: str, content_length: Optional[int], url: str, max_size: int) -> bool:
+    """
+    Decision made on response headers, before the body is downloaded.
+
+    Args:
+        content_type (str): Content-Type header value
+        content_length (int): Content-Length header value, None when unknown
+        url (str): Response URL
+        max_size (int): Maximum body size in bytes
+    """
+    if content_length is not None and content_length > max_size:
+        return False
+    return content_kind(content_type, url) in available_kinds()
+
+
+def extract_document_text(kind: str, body: bytes, max_chars: Optional[int], encoding: str = "utf-8") -> str:
+    """
+    Text of a PDF, DOCX or plain text document, whitespace collapsed.
+    Extraction stops once max_chars are collected, so a long document is not parsed to the end.
+
+    Raises:
+        ValueError: If the kind is not a document kind
+        Exception: If the document is broken or its parser (pypdf for PDF) is not installed
+    """
+    if kind == PDF:
+        return _pdf_text(body, max_chars)
+    if kind == DOCX:
+        return _docx_text(body, max_chars)
+    if kind == TEXT:
+        return _limit(_collapse(body.decode(encoding or "utf-8", errors="replace")), max_chars)
+    raise ValueError(f"Not a document: {kind}")
+
+
+def _pdf_text(body: bytes, max_chars: Optional[int]) -> str:
+    # Optional dependency, only needed when the site links PDFs
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(body))
+    parts = []
+    length = 0
+    for page in reader.pages:
+        text = _collapse(page.extract_text() or "")
+        if text:
+            parts.append(text)
+            length += len(text) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    return _limit(" ".join(parts), max_chars)
+
+
+def _docx_text(body: bytes, max_chars: Optional[int]) -> str:
+    """
+    Paragraph texts of word/document.xml, parsed incrementally, elements are freed as soon as they are read.
+    """
+    parts = []
+    length = 0
+    with zipfile.ZipFile(io.BytesIO(body)) as archive, archive.open("word/document.xml") as document:
+        paragraph = []
+        for event, element in iterparse(document, events=("end",)):
+            if element.tag == f"{WORD_NAMESPACE}t" and element.text:
+                paragraph.append(element.text)
+            elif element.tag == f"{WORD_NAMESPACE}tab":
+                paragraph.append(" ")
+            elif element.tag == f"{WORD_NAMESPACE}p":
+                text = _collapse("".join(paragraph))
+                paragraph = []
+                if text:
+                    parts.append(text)
+                    length += len(text) + 1
+                element.clear()
+                if max_chars is not None and length >= max_chars:
+                    break
+    return _limit(" ".join(parts), max_chars)
+
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _limit(text: str, max_chars: Optional[int]) -> str:
+    return text if max_chars is None else text[:max_chars]
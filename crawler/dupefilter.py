@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.utils.job import job_dir
+
+from crawler.url_frontier import url_fingerprint
+
+
+FINGERPRINT_SIZE = 20
+"""
+Size of SHA1 digest returned by url_fingerprint in bytes.
+"""
+
+
+class CanonicalRequestFingerprinter:
+    """
+    Request fingerprinter (REQUEST_FINGERPRINTER_CLASS) based on canonical URL from url_frontier,
+    so "/about/", "/about#team" and "/about?utm_source=x" are the same request.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls()
+
+    def fingerprint(self, request) -> bytes:
+        return url_fingerprint(request.url, request.method, request.body)
+
+
+class FrontierDupeFilter(BaseDupeFilter):
+    """
+    Dupefilter (DUPEFILTER_CLASS) that shares seen-set with spider's UrlFrontier.
+    Spider checks the set before yielding links, scheduler checks it again for requests
+    that arrive from other places (start requests, redirects). A redirect to another spelling
+    of its own URL is let through.
+
+    When JOBDIR is set, fingerprints are appended to JOBDIR/requests.seen and loaded back
+    when the job is resumed.
+    """
+
+    def __init__(self, crawler, fingerprinter, path: str = None):
+        self.crawler = crawler
+        self.fingerprinter = fingerprinter
+        self.seen: set[bytes] = set()
+        self.file = None
+        if path:
+            self.file = Path(path, "requests.seen").open("a+b")
+            self.file.seek(0)
+            fingerprints = self._read_fingerprints(self.file.read())
+            self.file.truncate(len(fingerprints) * FINGERPRINT_SIZE)
+            self.seen.update(fingerprints)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler, crawler.request_fingerprinter, job_dir(crawler.settings))
+
+    def open(self):
+        frontier = getattr(self.crawler.spider, "frontier", None)
+        if frontier is not None:
+            frontier.seen.update(self.seen)
+            self.seen = frontier.seen
+
+    def close(self, reason: str):
+        if self.file:
+            self.file.close()
+
+    def request_seen(self, request) -> bool:
+        fingerprint = self.fingerprinter.fingerprint(request)
+        if fingerprint in self.seen:
+            return not self._is_canonical_redirect(request, fingerprint)
+        self.seen.add(fingerprint)
+        if self.file:
+            self.file.write(fingerprint)
+            self.file.flush()
+        return False
+
+    def _is_canonical_redirect(self, request, fingerprint: bytes) -> bool:
+        """
+        Redirect to another spelling of the URL it came from, e.g. "/about" -> "/about/" on trailing-slash sites.
+        It has the fingerprint of its source and would be dropped, losing the page. RedirectMiddleware's
+        REDIRECT_MAX_TIMES still ends redirect loops.
+        """
+        redirect_urls = request.meta.get("redirect_urls")
+        if not redirect_urls:
+            return False
+        return url_fingerprint(redirect_urls[-1], request.method, request.body) == fingerprint
+
+    def log(self, request, spider):
+        spider.crawler.stats.inc_value("dupefilter/filtered")
+
+    @staticmethod
+    def _read_fingerprints(data: bytes) -> list[bytes]:
+        # Incomplete trailing fingerprint (unclean shutdown) is ignored
+        return [
+            data[position:position + FINGERPRINT_SIZE]
+            for position in range(0, len(data) - FINGERPRINT_SIZE + 1, FINGERPRINT_SIZE)
+        ]
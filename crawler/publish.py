@@ -0,0 +1,106 @@
+from typing import Optional
+
+from app.config import settings
+from app.cruds.page_crud import PageCrud
+from app.services.corpus_snapshot import CorpusService
+from app.services.digest_service import DigestService
+from app.services.embedding_service import EmbeddingService
+from app.services.faq_service import FaqService
+
+
+# ============================================================================
+# Post-crawl steps shared by the full crawl (text_spider) and revisits
+# (revisit_spider): page digests, corpus snapshot, embedding index and FAQ
+# answers are rebuilt from the pages stored in the database.
+# ============================================================================
+
+
+def publish_corpus(page_crud: PageCrud, changed_urls: Optional[set[str]] = None):
+    """
+    Publishes stored pages to API workers.
+
+    Args:
+        page_crud (PageCrud): Pages of the crawl
+        changed_urls (set[str]): Pages whose content changed, only their digests are rebuilt. All pages when None
+    """
+    try:
+        stored_pages = page_crud.get_all_pages()
+    except Exception as e:
+        print(f'[Publish] @publish_corpus: {e}')
+        return
+    pages = {page.url: page.content for page in stored_pages}
+    digests = {page.url: page.digest for page in stored_pages if page.digest}
+
+    if settings.DIGEST_ENABLED:
+        if changed_urls is None:
+            digests = build_digests(page_crud, pages) or digests
+        else:
+            digests.update(build_digests(page_crud, {url: pages[url] for url in changed_urls if url in pages}))
+    version = write_corpus_snapshot(pages, digests)
+    if settings.EMBEDDING_RETRIEVAL_ENABLED:
+        build_embedding_index(pages)
+    if settings.FAQ_ENABLED and version is not None:
+        if settings.ASK_USE_DIGESTS:
+            pages = {url: digests.get(url) or content for url, content in pages.items()}
+        build_faq(page_crud, pages, version, changed_urls)
+
+
+def build_digests(page_crud: PageCrud, pages: dict[str, str]) -> dict[str, str]:
+    """
+    Condenses pages into digests /ask can send instead of full content.
+
+    Returns:
+        dict[str, str]: digests by url, empty if they could not be stored
+    """
+    if not pages:
+        return {}
+    try:
+        digests = DigestService().build_digests(pages)
+        page_crud.update_digests(digests)
+    except Exception as e:
+        print(f'[Publish] @build_digests: {e}')
+        return {}
+    digests = {url: digest for url, digest in digests.items() if digest}
+    content_chars = sum(len(content) for content in pages.values())
+    context_chars = content_chars - sum(len(pages[url]) - len(digest) for url, digest in digests.items())
+    print(f'[Publish] @build_digests: {len(digests)} digests, context {content_chars} -> {context_chars} chars')
+    return digests
+
+
+def write_corpus_snapshot(pages: dict[str, str], digests: dict[str, str] = None) -> Optional[int]:
+    """
+    Writes pages and their digests to the memory-mapped corpus snapshot served to API workers.
+
+    Returns:
+        int: Written corpus version, None if the snapshot could not be written
+    """
+    try:
+        version = CorpusService().write_snapshot(pages, digests)
+        print(f'[Publish] @write_corpus_snapshot: {len(pages)} pages, version {version}')
+        return version
+    except Exception as e:
+        print(f'[Publish] @write_corpus_snapshot: {e}')
+        return None
+
+
+def build_embedding_index(pages: dict[str, str]):
+    """
+    Embeds chunks of all pages into the index used by /ask for retrieval.
+    """
+    try:
+        chunks = EmbeddingService().build_index(pages)
+        print(f'[Publish] @build_embedding_index: {chunks} chunks indexed')
+    except Exception as e:
+        print(f'[Publish] @build_embedding_index: {e}')
+
+
+def build_faq(page_crud: PageCrud, pages: dict[str, str], version: int, changed_urls: Optional[set[str]] = None):
+    """
+    Precomputes answers to popular questions for the published corpus version.
+    On revisits, answers whose sources did not change are carried over.
+    """
+    try:
+        answers = FaqService(page_crud.db).refresh(pages, version, changed_urls)
+        print(f'[Publish] @build_faq: {answers} answers for version {version}')
+    except Exception as e:
+        print(f'[Publish] @build_faq: {e}')
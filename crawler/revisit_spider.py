@@ -0,0 +1,107 @@
+import scrapy
+
+from app.config import settings
+from app.cruds.page_crud import PageCrud
+from app.db.database import get_db
+from app.services.revisit_service import RevisitScheduler
+from crawler.publish import publish_corpus
+from crawler.text_spider import TextSpider
+from crawler.url_frontier import canonicalize_url
+
+
+class RevisitSpider(scrapy.Spider):
+    """
+    Scrapy spider that refetches pages due for a revisit (see RevisitScheduler). Every fetch is recorded
+    in the page's change history, changed content replaces the stored page, and the corpus snapshot
+    is republished when anything changed. Links are not followed, new pages are found by the full crawl.
+
+    Attributes:
+        name: name that scrapy will use to find the spider
+
+    Arguments (scrapy crawl revisit_spider -a urls_file=crawl_jobs/revisit.txt):
+        urls_file: file with one URL per line
+    """
+
+    name = "revisit_spider"
+    allowed_domains = [settings.DOMAIN]
+
+    custom_settings = {
+        "DEPTH_LIMIT": 0,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 0.5,
+        "AUTOTHROTTLE_MAX_DELAY": 10,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
+    }
+
+    def __init__(self, urls_file=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if not urls_file:
+            raise ValueError("urls_file argument is required")
+        with open(urls_file, encoding="utf-8") as file:
+            self.urls = [line.strip() for line in file if line.strip()]
+        self.changed_urls: set[str] = set()
+        self.db = next(get_db())
+        self.page_crud = PageCrud(self.db)
+        self.scheduler = RevisitScheduler(self.db)
+        # Stored pages count towards the budget, a changed page only gets the room of the content it replaces
+        self.budget = TextSpider.content_budget()
+        self.stored = {page.url: page.content for page in self.page_crud.get_all_pages()}
+        for url, content in self.stored.items():
+            self.budget.commit(url, content)
+
+    async def start(self):
+        for url in self.urls:
+            yield scrapy.Request(url, callback=self.parse, errback=self.failed, dont_filter=True,
+                                 cb_kwargs={"url": url})
+
+    def parse(self, response, url: str):
+        """
+        Records the check and stores the page if its content changed.
+        """
+        url = canonicalize_url(url) or url
+        content = TextSpider.page_text(response)
+        if content is not None:
+            # Hashed as it would be stored, so the crawl and revisits agree on unchanged pages
+            content = self._fit(url, content)
+        try:
+            # Content that can no longer be extracted, or has no budget left, counts as a failed check
+            if self.scheduler.record_check(url, content, response.status) and content:
+                self.page_crud.upsert_page(url, content)
+                self._replace(url, content)
+                self.changed_urls.add(url)
+        except Exception as e:
+            print(f'[RevisitSpider] @parse. Unexpected error: {e}')
+
+    def _fit(self, url: str, content: str):
+        previous = self.stored.get(url)
+        if previous is not None:
+            self.budget.release(url, previous)
+        content = self.budget.fit(url, content)
+        if previous is not None:
+            self.budget.commit(url, previous)
+        return content
+
+    def _replace(self, url: str, content: str):
+        previous = self.stored.get(url)
+        if previous is not None:
+            self.budget.release(url, previous)
+        self.budget.commit(url, content)
+        self.stored[url] = content
+
+    def failed(self, failure):
+        """
+        Failed fetch still counts as a check, the page is revisited again after its interval.
+        """
+        url = failure.request.cb_kwargs["url"]
+        response = getattr(failure.value, "response", None)
+        try:
+            self.scheduler.record_check(canonicalize_url(url) or url, None, response.status if response else 0)
+        except Exception as e:
+            print(f'[RevisitSpider] @failed: {e}')
+
+    def closed(self, reason):
+        print(f'[RevisitSpider] @closed: {reason}, {len(self.urls)} pages checked, {len(self.changed_urls)} changed')
+        if self.changed_urls:
+            publish_corpus(self.page_crud, self.changed_urls)
+        self.db.close()
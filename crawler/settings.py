@@ -15,6 +15,10 @@ SPIDER_MODULES = ['crawler']
 NEWSPIDER_MODULE = 'crawler'
 LOG_ENABLED = True
 
+# Canonical URL fingerprints, seen-set is shared with the spider's UrlFrontier
+REQUEST_FINGERPRINTER_CLASS = 'crawler.dupefilter.CanonicalRequestFingerprinter'
+DUPEFILTER_CLASS = 'crawler.dupefilter.FrontierDupeFilter'
+
 # Crawl responsibly by identifying yourself (and your website) on the user-agent
 #USER_AGENT = 'crawler (+http://www.yourdomain.com)'
 
@@ -52,9 +56,14 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable downloader middlewares
 # See http://scrapy.readthedocs.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    'crawler.middlewares.MyCustomDownloaderMiddleware': 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    'crawler.archive.ArchiveMiddleware': 650,
+}
+
+# Record responses to / replay the crawl offline from a crawl archive, see crawler/archive.py
+# Example: scrapy crawl text_spider -s CRAWL_ARCHIVE_MODE=replay -s CRAWL_ARCHIVE_DIR=tests/fixtures/site
+CRAWL_ARCHIVE_MODE = None
+CRAWL_ARCHIVE_DIR = None
 
 # Enable or disable extensions
 # See http://scrapy.readthedocs.org/en/latest/topics/extensions.html
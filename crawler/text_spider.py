@@ -1,11 +1,40 @@
+import os
 import re
 import scrapy
 
 from textwrap import dedent
+from typing import Optional
+from urllib.parse import urlsplit
+from scrapy import signals
+from scrapy.exceptions import CloseSpider, StopDownload
+from scrapy.http import HtmlResponse, XmlResponse
+from scrapy.utils.gz import gunzip, gzip_magic_number
+from scrapy.utils.job import job_dir
+from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
 
 from app.db.database import get_db
 from app.cruds.page_crud import PageCrud
+from app.cruds.crawl_job_crud import CrawlJobCrud
+from app.db.models.crawl_job import CrawlJob
+from app.services.revisit_service import RevisitScheduler
 from app.config import settings
+from crawler.content_budget import ContentBudget
+from crawler.documents import DOCUMENT_EXTENSIONS, HTML, available_kinds, content_kind, document_extensions, \
+    extract_document_text, should_download
+from crawler.priority import PriorityScorer
+from crawler.publish import publish_corpus
+from crawler.url_frontier import UrlFrontier, canonicalize_url, url_fingerprint
+
+
+START_PRIORITY = 1000
+"""
+Priority of start page, robots.txt and sitemaps. They seed the frontier, so they are fetched before any other page.
+"""
+
+INTERRUPTED_CLOSE_REASONS = ("shutdown", "cancelled")
+"""
+Spider close reasons after which the crawl job can be resumed (SIGTERM/SIGINT, engine cancelled).
+"""
 
 
 class TextSpider(scrapy.Spider):
@@ -15,6 +44,10 @@ class TextSpider(scrapy.Spider):
 
     Attributes:
         name: name that scrapy will use to find the spider
+
+    Arguments (scrapy crawl text_spider -a job_id=1 -a resume=1 -s JOBDIR=crawl_jobs/job-1):
+        job_id: CrawlJob id to checkpoint progress to, optional
+        resume: keep stored pages and continue counting from them instead of starting from scratch
     """
 
     name = "text_spider"
@@ -23,60 +56,277 @@ class TextSpider(scrapy.Spider):
 
     custom_settings = {
         "DEPTH_LIMIT": 0,
-        "DOWNLOAD_DELAY": 0.5,
+        "DOWNLOAD_DELAY": 0,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 0.5,
+        "AUTOTHROTTLE_MAX_DELAY": 10,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 4.0,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 8,
+        "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
+        "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleFifoDiskQueue",
+        "DOWNLOAD_MAXSIZE": settings.DOCUMENT_MAX_SIZE,
     }
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, job_id=None, resume=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
-        self.total_chars = 0
+        self.job_id = int(job_id) if job_id else None
+        self.resume = str(resume).lower() in ("1", "true", "yes")
+        # Set by from_crawler: the resumed job has its JOBDIR queue and seen requests
+        self.queue_restored = False
+        self.budget = self.content_budget()
+        self.pages_stored = 0
+        self.stored_urls: set[str] = set()
+        self.frontier = UrlFrontier(
+            self.allowed_domains,
+            document_extensions=document_extensions() if settings.DOCUMENT_INGESTION_ENABLED else (),
+        )
+        self.scorer = PriorityScorer()
         self.db = next(get_db())
         self.page_crud = PageCrud(self.db)
-        self.page_crud.delete_all_pages()
+        self.crawl_job_crud = CrawlJobCrud(self.db)
+
+        if self.resume:
+            self._restore_progress()
+        else:
+            self.page_crud.delete_all_pages()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.on_headers_received, signal=signals.headers_received)
+        # Checked before the dupefilter opens requests.seen, a killed job's JOBDIR is reset by CrawlerService
+        directory = job_dir(crawler.settings)
+        seen_file = os.path.join(directory, "requests.seen") if directory else None
+        spider.queue_restored = spider.resume and seen_file is not None and \
+            os.path.exists(seen_file) and os.path.getsize(seen_file) > 0
+        return spider
+
+    def on_headers_received(self, headers, body_length, request, spider):
+        """
+        Stops the download of a page response that could not be stored (unsupported type or too large)
+        once its headers arrive, so the body is never transferred. Robots.txt and sitemaps are not checked.
+        """
+        if request.callback != self.parse:
+            return
+        content_type = headers.get(b"Content-Type", b"").decode("latin-1")
+        # Without Content-Length the length is Twisted's UNKNOWN_LENGTH constant, not a number
+        content_length = body_length if isinstance(body_length, int) and body_length >= 0 else None
+        if not should_download(content_type, content_length, request.url, settings.DOCUMENT_MAX_SIZE):
+            raise StopDownload(fail=False)
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        """
+        Seeds the crawl with start page and, if enabled, with sitemaps listed in robots.txt and /sitemap.xml.
+        """
+        # Resumed crawl fetches seeds again, links of pages stored before the restart may be missing from the queue
+        for url in self.start_urls:
+            yield scrapy.Request(url, callback=self.parse, priority=START_PRIORITY, dont_filter=self.resume)
+
+        # Without JOBDIR state (killed job) the queued links of stored pages are lost, stored pages are fetched
+        # again for their links only (they are not stored twice). Documents have no links
+        reseeded = self.stored_urls.difference(self.start_urls) if self.resume and not self.queue_restored else ()
+        for url in sorted(reseeded):
+            if not urlsplit(url).path.lower().endswith(tuple(DOCUMENT_EXTENSIONS)):
+                yield scrapy.Request(url, callback=self.parse, dont_filter=True)
+
+        if settings.CRAWL_USE_SITEMAPS:
+            yield scrapy.Request(f"https://{settings.DOMAIN}/robots.txt", callback=self.parse_robots,
+                                 priority=START_PRIORITY, dont_filter=self.resume)
+            yield scrapy.Request(f"https://{settings.DOMAIN}/sitemap.xml", callback=self.parse_sitemap,
+                                 priority=START_PRIORITY, dont_filter=self.resume)
+
+    def parse_robots(self, response):
+        """
+        Follows "Sitemap:" entries of robots.txt.
+        """
+        for url in sitemap_urls_from_robots(response.body, base_url=response.url):
+            if self.frontier.normalize(url):
+                yield scrapy.Request(url, callback=self.parse_sitemap, priority=START_PRIORITY)
+
+    def parse_sitemap(self, response):
+        """
+        Schedules pages listed in sitemap (or nested sitemaps of sitemap index) ordered by their priority score.
+        """
+        body = self._get_sitemap_body(response)
+        if not body:
+            print(f'[TextSpider] @parse_sitemap: Ignoring invalid sitemap {response.url}')
+            return
+
+        sitemap = Sitemap(body)
+        for entry in sitemap:
+            url = self.frontier.normalize(entry.get("loc", ""))
+            if not url:
+                continue
+
+            if sitemap.type == "sitemapindex":
+                yield scrapy.Request(url, callback=self.parse_sitemap, priority=START_PRIORITY)
+            elif not self.frontier.is_seen(url) and self.budget.has_room_for(url):
+                self.scorer.add_sitemap_entry(url, entry.get("priority"), entry.get("lastmod"))
+                yield scrapy.Request(url, callback=self.parse, priority=self.scorer.score(url, depth=1))
 
     def parse(self, response):
         """
         Scrapy spider's default function to crawl and parse web page content.
         """
+        content = self.page_text(response)
+        if content is None:
+            return
+        url = canonicalize_url(response.url) or response.url
 
-        # Filter out JavaScript, CSS and html tags to get text
-        texts = response.xpath(
-            '//body//*[not(self::script or self::style or self::noscript)]/text()'
-        ).getall()
+        content = self.budget.fit(url, content) if url not in self.stored_urls else None
+        if content:
+            try:
+                self.page_crud.add_page(url, content)
+                self.budget.commit(url, content)
+                self._on_page_stored(url)
+            except Exception as e:
+                print(f'[TextSpider] @parse. Unexpected error: {e}')
 
-        content = self._extract_content(texts)
+        if self.budget.is_exhausted:
+            raise CloseSpider('content_budget_exhausted')
 
+        # Documents have no links to follow
+        if not isinstance(response, HtmlResponse):
+            return
+
+        depth = response.meta.get('depth', 0) + 1
+        for link in self._extract_links(response):
+            yield response.follow(link, callback=self.parse, priority=self.scorer.score(link, depth))
+
+    def closed(self, reason):
+        """
+        Called by Scrapy when spider is closed. Saves final progress of the crawl job.
+        Job closed by a signal stays resumable, otherwise it is marked as finished.
+        Post-crawl steps (revisit schedule, page digests, corpus snapshot, embedding index) run on the stored pages.
+        """
+        status = CrawlJob.INTERRUPTED if reason in INTERRUPTED_CLOSE_REASONS else CrawlJob.FINISHED
+        self._checkpoint(status)
+        print(f'[TextSpider] @closed: {reason}, {self.pages_stored} pages, {self.budget.total_chars} chars stored')
+
+        if settings.REVISIT_ENABLED:
+            self._schedule_revisits()
+        publish_corpus(self.page_crud)
+
+    def _schedule_revisits(self):
+        """
+        Records every stored page as a check of the revisit schedule, so change history carries across crawls.
+        """
         try:
-            self._process_content_limit(len(content))
-            self.page_crud.add_page(response.url, content)
+            scheduler = RevisitScheduler(self.db)
+            for page in self.page_crud.get_all_pages():
+                scheduler.record_check(page.url, page.content)
         except Exception as e:
-            print(f'[TextSpider] @parse. Unexpected error: {e}')
+            print(f'[TextSpider] @_schedule_revisits: {e}')
 
-        links = response.css('a::attr(href)').getall()
-        absolute_links = [response.urljoin(link) for link in links]
+    def _on_page_stored(self, url: str):
+        self.stored_urls.add(url)
+        self.pages_stored += 1
+        if self.pages_stored % settings.CRAWL_CHECKPOINT_PAGES == 0:
+            self._checkpoint()
 
-        for link in absolute_links:
-            if self._is_internal_link(link):
-                yield response.follow(link, callback=self.parse)
+    def _checkpoint(self, status: str = None):
+        if self.job_id is None:
+            return
+        try:
+            self.crawl_job_crud.checkpoint(self.job_id, self.pages_stored, self.budget.total_chars, status)
+        except Exception as e:
+            print(f'[TextSpider] @_checkpoint: {e}')
 
-    def _is_internal_link(self, url: str) -> bool:
+    def _restore_progress(self):
         """
-        Checks if fetched links is a part of domain.
+        Continues interrupted crawl. Stored pages are the source of truth for progress: they are marked as seen,
+        so links to them are not followed again, and their content counts towards the content budget.
+        When the JOBDIR queue was lost, start_requests fetches them once more to queue their links.
         """
-        return any(domain in url for domain in self.allowed_domains)
+        for page in self.page_crud.get_all_pages():
+            self.stored_urls.add(page.url)
+            self.budget.commit(page.url, page.content)
+            self.frontier.mark_seen(url_fingerprint(page.url))
+        self.pages_stored = len(self.stored_urls)
+        print(f'[TextSpider] @_restore_progress: resuming with {self.pages_stored} pages, {self.budget.total_chars} chars')
 
-    def _extract_content(self, texts: list[str]) -> str:
+    def _extract_links(self, response) -> list[str]:
+        """
+        Returns canonical internal links from the page that were not scheduled yet.
+        Links are deduplicated within the page, cross-page duplicates are filtered by the shared seen-set.
+        Every distinct link counts towards in-degree of its target, even if it was already scheduled.
+        Links into sections without content budget left are not followed.
+        """
+        links = []
+        page_links = set()
+        for href in response.css('a::attr(href)').getall():
+            url = self.frontier.normalize(response.urljoin(href))
+            if not url or url in page_links:
+                continue
+            page_links.add(url)
+            self.scorer.add_link(url)
+            if not self.frontier.is_seen(url) and self.budget.has_room_for(url):
+                links.append(url)
+        return links
+
+    @staticmethod
+    def _get_sitemap_body(response):
+        if gzip_magic_number(response):
+            try:
+                return gunzip(response.body)
+            except OSError:
+                return None
+        head = response.body[:4096]
+        if isinstance(response, XmlResponse) or b'<urlset' in head or b'<sitemapindex' in head:
+            return response.body
+        return None
+
+    @staticmethod
+    def content_budget() -> ContentBudget:
+        """
+        Content budget of the configured limits, shared with the revisit spider.
+        """
+        return ContentBudget(
+            max_chars=settings.MAX_CONTENT_SIZE,
+            max_tokens=settings.MAX_CONTENT_TOKENS,
+            max_page_chars=settings.MAX_PAGE_CONTENT_SIZE,
+            section_quotas=settings.SECTION_CONTENT_QUOTAS,
+        )
+
+    @staticmethod
+    def page_text(response) -> Optional[str]:
+        """
+        Visible text of an HTML page or text of a linked document (PDF, DOCX, plain text).
+        Shared with the revisit spider.
+
+        Returns:
+            str or None for content that is not stored: unsupported types and downloads stopped on headers
+        """
+        if "download_stopped" in response.flags:
+            return None
+
+        kind = content_kind(response.headers.get(b"Content-Type", b"").decode("latin-1"), response.url)
+        if kind == HTML or (kind is None and isinstance(response, HtmlResponse)):
+            # Filter out JavaScript, CSS and html tags to get text
+            texts = response.xpath(
+                '//body//*[not(self::script or self::style or self::noscript)]/text()'
+            ).getall()
+            return TextSpider._extract_content(texts)
+
+        if kind is None or kind not in available_kinds() or not settings.DOCUMENT_INGESTION_ENABLED:
+            return None
+        try:
+            return extract_document_text(kind, response.body, settings.MAX_PAGE_CONTENT_SIZE,
+                                         getattr(response, "encoding", None) or "utf-8")
+        except Exception as e:
+            print(f'[TextSpider] @page_text: {response.url}: {e}')
+            return None
+
+    @staticmethod
+    def _extract_content(texts: list[str]) -> str:
         """
         Concatenate lists of string (default returned by Scrapy) into a single string removing indents and extra spaces.
         """
         united_string = ' '.join(texts)
         united_string = re.sub(r'\s+', ' ', united_string).strip()
         return dedent(united_string)
-
-    def _process_content_limit(self, content_len=0) -> bool:
-        """
-        Checks if saved content length is less than MAC_CONTENT_SIZE. Throws Exception if limit exceeded.
-        """
-        self.total_chars += content_len
-        if self.total_chars >= settings.MAX_CONTENT_SIZE:
-            raise Exception('Limit exceeded')
@@ -0,0 +1,153 @@
+import hashlib
+from typing import Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from scrapy.linkextractors import IGNORED_EXTENSIONS
+
+
+ALLOWED_SCHEMES = {"http", "https"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+TRACKING_QUERY_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "igshid", "ref", "ref_src", "replytocom", "share",
+}
+"""
+Query parameters that never change page content and only multiply the number of crawled URLs.
+Any parameter starting with "utm_" is dropped as well.
+"""
+
+IGNORED_FILE_EXTENSIONS = {f".{extension}" for extension in IGNORED_EXTENSIONS}
+"""
+File extensions (images, archives, media, office documents...) the spider never downloads.
+"""
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Normalize URL so that every spelling of the same page maps to a single string.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking query parameters
+    and trailing slashes (except for the root path), sorts the remaining query parameters.
+
+    Args:
+        url (str): Absolute URL
+
+    Returns:
+        str: Canonical URL, or None if URL is not a http(s) link
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in ALLOWED_SCHEMES or not parts.hostname:
+        return None
+
+    host = parts.hostname.rstrip(".")
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query_params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(key)
+    ]
+    query = urlencode(sorted(query_params))
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_fingerprint(url: str, method: str = "GET", body: bytes = b"") -> bytes:
+    """
+    SHA1 fingerprint of a canonical URL. Used both by spider and dupefilter, so they agree on what "seen" means.
+    """
+    canonical = canonicalize_url(url) or url
+    fingerprint = hashlib.sha1()
+    fingerprint.update(method.upper().encode())
+    fingerprint.update(canonical.encode())
+    fingerprint.update(body or b"")
+    return fingerprint.digest()
+
+
+def is_internal_host(host: str, domain: str) -> bool:
+    """
+    Checks if host is the domain itself or one of its subdomains.
+    Substring matching is not used, so "evil.com/?q=domain" or "notdomain.ee" do not pass.
+    """
+    host = (host or "").lower().rstrip(".")
+    domain = domain.lower().rstrip(".")
+    return host == domain or host.endswith(f".{domain}")
+
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key.startswith("utm_") or key in TRACKING_QUERY_PARAMS
+
+
+def _has_ignored_extension(path: str, followed_extensions: Iterable[str] = ()) -> bool:
+    path = path.lower()
+    if any(path.endswith(extension) for extension in followed_extensions):
+        return False
+    return any(path.endswith(extension) for extension in IGNORED_FILE_EXTENSIONS)
+
+
+class UrlFrontier:
+    """
+    Per-crawl URL frontier. Decides which links are worth requesting and remembers
+    fingerprints of already scheduled URLs. The same seen-set is used by FrontierDupeFilter,
+    so spider and scheduler never disagree about duplicates.
+
+    Attributes:
+        domains: domains (with subdomains) the crawl is limited to
+        document_extensions: extensions of ignored file types that are followed anyway (e.g. ".pdf")
+        seen: fingerprints of URLs that were already scheduled
+    """
+
+    def __init__(self, domains: list[str], document_extensions: Iterable[str] = ()):
+        self.domains = domains
+        self.document_extensions = tuple(document_extensions)
+        self.seen: set[bytes] = set()
+
+    def normalize(self, url: str) -> Optional[str]:
+        """
+        Returns canonical URL if it should be crawled, otherwise None.
+
+        Filters out non http(s) links (mailto:, tel:, javascript:...), external hosts
+        and links to files the spider can not extract text from.
+        """
+        canonical = canonicalize_url(url)
+        if not canonical:
+            return None
+
+        parts = urlsplit(canonical)
+        if not any(is_internal_host(parts.hostname, domain) for domain in self.domains):
+            return None
+
+        if _has_ignored_extension(parts.path, self.document_extensions):
+            return None
+
+        return canonical
+
+    def is_seen(self, url: str) -> bool:
+        return url_fingerprint(url) in self.seen
+
+    def mark_seen(self, fingerprint: bytes) -> bool:
+        """
+        Adds fingerprint to the seen-set.
+
+        Returns:
+            bool: True if fingerprint was new, False if it was already seen
+        """
+        if fingerprint in self.seen:
+            return False
+        self.seen.add(fingerprint)
+        return True
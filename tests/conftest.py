@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.db.database import Base
+from app.middleware import get_rate_limit_backend
 
 
 @pytest.fixture(scope='function')
@@ -18,6 +19,15 @@ def setup_test_database():
     yield session
     session.close()
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """
+    Every test starts with full rate limit buckets, all test requests come from the same client.
+    """
+    yield
+    get_rate_limit_backend().reset()
+
+
 @pytest.fixture(scope="session")
 def client():
     return TestClient(app)
\ No newline at end of file
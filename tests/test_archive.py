@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import Mock
+from scrapy import Request
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse, Response
+from scrapy.settings import Settings
+
+from crawler.archive import ArchiveMiddleware, CrawlArchive, RECORD, REPLAY
+
+
+FIXTURE_SITE = "tests/fixtures/site"
+
+
+class TestCrawlArchive:
+
+    def test_load_fixture_site(self):
+        archive = CrawlArchive(FIXTURE_SITE).load()
+
+        entry = archive.get("https://tehisintellekt.ee/teenused")
+
+        assert entry["status"] == 200
+        assert b"Teenused" in archive.read_body(entry)
+
+    def test_trailing_slash_is_a_different_entry(self):
+        archive = CrawlArchive(FIXTURE_SITE).load()
+
+        assert archive.get("https://tehisintellekt.ee/partnerid")["status"] == 301
+        assert archive.get("https://tehisintellekt.ee/partnerid/")["status"] == 200
+
+    def test_record_and_load(self, tmp_path):
+        archive = CrawlArchive(str(tmp_path))
+        archive.record("https://example.com/a", "GET", 200, {"Content-Type": ["text/html"]}, b"<html>A</html>")
+
+        loaded = CrawlArchive(str(tmp_path)).load()
+        entry = loaded.get("https://example.com/a#top")
+
+        assert entry["status"] == 200
+        assert loaded.read_body(entry) == b"<html>A</html>"
+        assert loaded.get("https://example.com/a", method="POST") is None
+
+
+class TestArchiveMiddleware:
+
+    def _crawler(self, **settings):
+        crawler = Mock()
+        crawler.settings = Settings(settings)
+        return crawler
+
+    def test_disabled_without_mode(self):
+        with pytest.raises(NotConfigured):
+            ArchiveMiddleware.from_crawler(self._crawler())
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            ArchiveMiddleware.from_crawler(self._crawler(CRAWL_ARCHIVE_MODE="live", CRAWL_ARCHIVE_DIR=FIXTURE_SITE))
+
+    def test_replay_hit(self):
+        middleware = ArchiveMiddleware.from_crawler(
+            self._crawler(CRAWL_ARCHIVE_MODE=REPLAY, CRAWL_ARCHIVE_DIR=FIXTURE_SITE)
+        )
+
+        response = middleware.process_request(Request("https://tehisintellekt.ee/meist"))
+
+        assert isinstance(response, HtmlResponse)
+        assert response.status == 200
+        assert "Meist" in response.css("h1::text").get()
+
+    def test_replay_redirect(self):
+        middleware = ArchiveMiddleware(REPLAY, CrawlArchive(FIXTURE_SITE).load())
+
+        response = middleware.process_request(Request("https://tehisintellekt.ee/vana-kontakt"))
+
+        assert response.status == 301
+        assert response.headers["Location"] == b"https://tehisintellekt.ee/kontakt"
+
+    def test_replay_missing_is_ignored(self):
+        middleware = ArchiveMiddleware(REPLAY, CrawlArchive(FIXTURE_SITE).load())
+
+        with pytest.raises(IgnoreRequest):
+            middleware.process_request(Request("https://tehisintellekt.ee/missing"))
+
+    def test_record(self, tmp_path):
+        middleware = ArchiveMiddleware(RECORD, CrawlArchive(str(tmp_path)))
+        request = Request("https://example.com/page")
+        response = Response("https://example.com/page", status=200, headers={"Content-Type": "text/html"},
+                            body=b"<html>Page</html>", request=request)
+
+        assert middleware.process_request(request) is None
+        assert middleware.process_response(request, response) is response
+
+        entry = CrawlArchive(str(tmp_path)).load().get("https://example.com/page")
+        assert entry["headers"]["Content-Type"] == ["text/html"]
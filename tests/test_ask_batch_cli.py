@@ -0,0 +1,36 @@
+import io
+import json
+from unittest.mock import patch
+
+from app.cli.ask_batch import main, read_questions
+from app.dtos.ask_response import Usage
+from app.dtos.batch_response import BatchItemResult, BatchSummary, BatchSummaryLine
+
+
+class TestAskBatchCli:
+
+    def test_read_questions(self):
+        questions_file = io.StringIO('What is AI?\n\n{"question": "Kes te olete?", "id": 7}\n')
+
+        assert read_questions(questions_file) == ["What is AI?", "Kes te olete?"]
+
+    def test_main_writes_ndjson(self, tmp_path, capsys):
+        questions_path = tmp_path / "questions.txt"
+        questions_path.write_text("What is AI?\nHi\n", encoding="utf-8")
+        output_path = tmp_path / "answers.ndjson"
+        usage = Usage(input_tokens=10, output_tokens=5)
+
+        with patch('app.cli.ask_batch.AppService') as mock_service_class:
+            mock_service_class.return_value.ask_batch.return_value = iter([
+                BatchItemResult(index=1, question="Hi", error="Question is too short"),
+                BatchSummaryLine(summary=BatchSummary(total=2, succeeded=1, failed=1, usage=usage)),
+            ])
+
+            exit_code = main([str(questions_path), "--output", str(output_path), "--concurrency", "3"])
+
+        mock_service_class.return_value.ask_batch.assert_called_once_with(["What is AI?", "Hi"], 3)
+        lines = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+        assert lines[0]["index"] == 1
+        assert lines[1]["summary"]["failed"] == 1
+        assert exit_code == 2
+        assert "1/2 answered" in capsys.readouterr().err
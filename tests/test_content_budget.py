@@ -0,0 +1,77 @@
+import pytest
+
+from crawler.content_budget import ContentBudget, url_section
+
+
+class TestContentBudget:
+
+    def test_url_section(self):
+        assert url_section("https://example.com/") == ""
+        assert url_section("https://example.com/Blogi/post-1") == "blogi"
+
+    def test_only_committed_content_counts(self):
+        budget = ContentBudget(max_chars=100)
+
+        assert budget.fit("https://example.com/a", "x" * 40) == "x" * 40
+        assert budget.total_chars == 0
+
+        budget.commit("https://example.com/a", "x" * 40)
+        assert budget.total_chars == 40
+        assert budget.total_tokens == 10
+
+    def test_empty_content_is_not_stored(self):
+        budget = ContentBudget(max_chars=100)
+
+        assert budget.fit("https://example.com/a", "   ") is None
+
+    def test_page_cap_truncates_at_word_boundary(self):
+        budget = ContentBudget(max_chars=1000, max_page_chars=12)
+
+        assert budget.fit("https://example.com/a", "alpha beta gamma delta") == "alpha beta"
+
+    def test_remaining_budget_truncates_and_exhausts(self):
+        budget = ContentBudget(max_chars=50)
+        budget.commit("https://example.com/a", "x" * 45)
+
+        content = budget.fit("https://example.com/b", "y" * 20)
+        budget.commit("https://example.com/b", content)
+
+        assert content == "y" * 5
+        assert budget.is_exhausted
+        assert budget.fit("https://example.com/c", "z") is None
+        assert not budget.has_room_for("https://example.com/c")
+
+    def test_token_budget(self):
+        budget = ContentBudget(max_chars=10000, max_tokens=10)
+
+        content = budget.fit("https://example.com/a", "x" * 100)
+        budget.commit("https://example.com/a", content)
+
+        assert len(content) == 40
+        assert budget.is_exhausted
+
+    def test_section_quota(self):
+        budget = ContentBudget(max_chars=1000, section_quotas={"Blogi": 30})
+        budget.commit("https://example.com/blogi/1", "x" * 30)
+
+        assert budget.fit("https://example.com/blogi/2", "more blog") is None
+        assert not budget.has_room_for("https://example.com/blogi/2")
+        assert budget.has_room_for("https://example.com/teenused")
+        assert not budget.is_exhausted
+
+    def test_released_content_is_free(self):
+        budget = ContentBudget(max_chars=50, section_quotas={"blogi": 30})
+        budget.commit("https://example.com/blogi/1", "x" * 30)
+
+        budget.release("https://example.com/blogi/1", "x" * 30)
+
+        assert budget.total_chars == 0
+        assert budget.total_tokens == 0
+        assert budget.fit("https://example.com/blogi/1", "y" * 40) == "y" * 30
+
+    @pytest.mark.parametrize("max_chars", [0, -1])
+    def test_zero_budget(self, max_chars):
+        budget = ContentBudget(max_chars=max_chars)
+
+        assert budget.is_exhausted
+        assert budget.fit("https://example.com/", "content") is None
@@ -0,0 +1,58 @@
+import pytest
+from app.cruds.conversation_crud import ConversationCrud
+
+
+class TestConversationCrud:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database):
+        self.db = setup_test_database
+        self.conversation_crud = ConversationCrud(self.db)
+
+        yield
+
+        self.db.close()
+
+    def test_create_conversation(self):
+        conversation = self.conversation_crud.create_conversation()
+
+        assert len(conversation.id) == 32
+        assert conversation.summary == ""
+        assert conversation.summarized_turns == 0
+        assert self.conversation_crud.get_conversation(conversation.id) is conversation
+
+    def test_get_conversation_missing(self):
+        assert self.conversation_crud.get_conversation("missing") is None
+
+    def test_add_and_get_turns_in_order(self):
+        conversation = self.conversation_crud.create_conversation()
+        self.conversation_crud.add_turn(conversation.id, "First?", "One", ["https://example.com/a"], 10, 2)
+        self.conversation_crud.add_turn(conversation.id, "Second?", "Two", [])
+
+        turns = self.conversation_crud.get_turns(conversation.id)
+
+        assert [turn.question for turn in turns] == ["First?", "Second?"]
+        assert turns[0].sources == ["https://example.com/a"]
+        assert turns[0].input_tokens == 10
+        assert [turn.question for turn in self.conversation_crud.get_turns(conversation.id, offset=1)] == ["Second?"]
+
+    def test_add_turn_missing_conversation(self):
+        with pytest.raises(ValueError):
+            self.conversation_crud.add_turn("missing", "Question?", "Answer", [])
+
+    def test_update_summary(self):
+        conversation = self.conversation_crud.create_conversation()
+
+        updated = self.conversation_crud.update_summary(conversation.id, "User asked about trainings.", 3)
+
+        assert updated.summary == "User asked about trainings."
+        assert updated.summarized_turns == 3
+
+    def test_get_first_questions(self):
+        first = self.conversation_crud.create_conversation()
+        self.conversation_crud.add_turn(first.id, "Mis koolitusi pakute?", "Answer", [])
+        self.conversation_crud.add_turn(first.id, "Kui palju see maksab?", "Answer", [])
+        second = self.conversation_crud.create_conversation()
+        self.conversation_crud.add_turn(second.id, "Kus te asute?", "Answer", [])
+
+        assert self.conversation_crud.get_first_questions(10) == ["Kus te asute?", "Mis koolitusi pakute?"]
+        assert self.conversation_crud.get_first_questions(1) == ["Kus te asute?"]
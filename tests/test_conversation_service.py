@@ -0,0 +1,83 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.dtos.ask_response import AskResponse, Usage
+from app.services.conversation_service import ConversationService
+
+
+class TestConversationService:
+
+    @pytest.fixture
+    def service(self, setup_test_database):
+        return ConversationService(setup_test_database)
+
+    @pytest.fixture
+    def conversation(self, service):
+        return service.start_conversation()
+
+    def add_turns(self, service, conversation, count, answer="Answer"):
+        for i in range(count):
+            response = AskResponse(question=f"Question {i}?", answer=answer, sources=[f"https://example.com/{i}"],
+                                   usage=Usage(input_tokens=10, output_tokens=5))
+            service.add_turn(conversation.id, f"Question {i}?", response)
+
+    def test_empty_history(self, service, conversation):
+        summarize = Mock()
+
+        history, turns = service.get_history(conversation, summarize)
+
+        assert history == ""
+        assert turns == []
+        summarize.assert_not_called()
+
+    def test_history_within_budget(self, service, conversation):
+        self.add_turns(service, conversation, 2)
+        summarize = Mock()
+
+        history, turns = service.get_history(conversation, summarize)
+
+        assert history == "User: Question 0?\nAssistant: Answer\nUser: Question 1?\nAssistant: Answer"
+        assert [turn.sources for turn in turns] == [["https://example.com/0"], ["https://example.com/1"]]
+        summarize.assert_not_called()
+
+    def test_history_over_budget_is_summarized(self, service, conversation):
+        self.add_turns(service, conversation, 5, answer="Long answer " * 20)
+        summarize = Mock(return_value="User asked five questions.")
+
+        with patch("app.services.conversation_service.settings.CONVERSATION_HISTORY_TOKENS", 200), \
+                patch("app.services.conversation_service.settings.CONVERSATION_RECENT_TURNS", 2):
+            history, turns = service.get_history(conversation, summarize)
+
+        folded = summarize.call_args.args[1]
+        assert [question for question, _ in folded] == ["Question 0?", "Question 1?", "Question 2?"]
+        assert [turn.question for turn in turns] == ["Question 3?", "Question 4?"]
+        assert history.startswith("Summary of earlier conversation: User asked five questions.\nUser: Question 3?")
+        assert conversation.summarized_turns == 3
+
+    def test_summary_is_extended_on_next_compaction(self, service, conversation):
+        self.add_turns(service, conversation, 5, answer="Long answer " * 20)
+        summarize = Mock(side_effect=["First summary.", "Second summary."])
+
+        with patch("app.services.conversation_service.settings.CONVERSATION_HISTORY_TOKENS", 200), \
+                patch("app.services.conversation_service.settings.CONVERSATION_RECENT_TURNS", 2):
+            service.get_history(conversation, summarize)
+            self.add_turns(service, conversation, 2, answer="Long answer " * 20)
+            _, turns = service.get_history(conversation, summarize)
+
+        assert summarize.call_args.args[0] == "First summary."
+        assert len(turns) == 2
+        assert conversation.summary == "Second summary."
+        assert conversation.summarized_turns == 5
+
+    def test_failed_summarization_sends_recent_turns(self, service, conversation):
+        self.add_turns(service, conversation, 4, answer="Long answer " * 20)
+        summarize = Mock(side_effect=Exception("API Error"))
+
+        with patch("app.services.conversation_service.settings.CONVERSATION_HISTORY_TOKENS", 100), \
+                patch("app.services.conversation_service.settings.CONVERSATION_RECENT_TURNS", 1):
+            history, turns = service.get_history(conversation, summarize)
+
+        assert [turn.question for turn in turns] == ["Question 3?"]
+        assert "Summary" not in history
+        assert conversation.summarized_turns == 0
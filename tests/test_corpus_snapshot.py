@@ -0,0 +1,146 @@
+import os
+
+import pytest
+
+from app.services.corpus_snapshot import ENTRIES, HEADER, MAGIC, CorpusService, CorpusSnapshot
+
+
+class TestCorpusSnapshot:
+
+    @pytest.fixture
+    def pages(self):
+        return {
+            "https://example.com/": "Tehisintellekti lahendused ettevõtetele",
+            "https://example.com/kontakt": "Kontakt: info@example.com",
+            "https://example.com/tühi": "",
+        }
+
+    def test_load_missing(self, tmp_path):
+        assert CorpusSnapshot.load(str(tmp_path / "corpus.bin")) is None
+
+    def test_write_and_load(self, tmp_path, pages):
+        path = str(tmp_path / "corpus.bin")
+        version = CorpusSnapshot.write(path, pages)
+
+        snapshot = CorpusSnapshot.load(path)
+
+        assert snapshot.version == version
+        assert len(snapshot) == 3
+        assert snapshot.to_dict() == pages
+        assert list(snapshot.items()) == list(pages.items())
+
+    def test_write_empty(self, tmp_path):
+        path = str(tmp_path / "corpus.bin")
+        CorpusSnapshot.write(path, {})
+
+        snapshot = CorpusSnapshot.load(path)
+
+        assert len(snapshot) == 0
+        assert snapshot.to_dict() == {}
+
+    def test_old_mapping_survives_replace(self, tmp_path, pages):
+        path = str(tmp_path / "corpus.bin")
+        CorpusSnapshot.write(path, pages)
+        old = CorpusSnapshot.load(path)
+
+        CorpusSnapshot.write(path, {"https://example.com/uus": "Uus sisu"})
+
+        assert old.to_dict() == pages
+        assert CorpusSnapshot.load(path).to_dict() == {"https://example.com/uus": "Uus sisu"}
+        assert not os.path.exists(f"{path}.tmp")
+
+    def test_write_and_load_digests(self, tmp_path, pages):
+        path = str(tmp_path / "corpus.bin")
+        CorpusSnapshot.write(path, pages, {"https://example.com/": "Tehisintellekt"})
+
+        snapshot = CorpusSnapshot.load(path)
+
+        assert snapshot.to_dict() == pages
+        assert dict(snapshot.digests()) == {"https://example.com/": "Tehisintellekt"}
+
+    def test_reads_format_version_1(self, tmp_path):
+        url, content = "https://example.com/".encode(), "Sisu".encode()
+        path = tmp_path / "corpus.bin"
+        path.write_bytes(HEADER.pack(MAGIC, 1, 1, 42) + ENTRIES[1].pack(0, len(url), len(url), len(content))
+                         + url + content)
+
+        snapshot = CorpusSnapshot.load(str(path))
+
+        assert snapshot.version == 42
+        assert snapshot.to_dict() == {"https://example.com/": "Sisu"}
+        assert list(snapshot.digests()) == []
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "corpus.bin"
+        path.write_bytes(b"x" * HEADER.size)
+
+        with pytest.raises(ValueError):
+            CorpusSnapshot.load(str(path))
+
+    def test_rejects_unknown_format_version(self, tmp_path):
+        path = tmp_path / "corpus.bin"
+        path.write_bytes(HEADER.pack(MAGIC, 999, 0, 0))
+
+        with pytest.raises(ValueError):
+            CorpusSnapshot.load(str(path))
+
+    def test_rejects_truncated_file(self, tmp_path, pages):
+        path = tmp_path / "corpus.bin"
+        CorpusSnapshot.write(str(path), pages)
+        path.write_bytes(path.read_bytes()[:HEADER.size + 10])
+
+        with pytest.raises(ValueError):
+            CorpusSnapshot.load(str(path))
+
+
+class TestCorpusService:
+
+    def test_get_pages_without_snapshot(self, tmp_path):
+        assert CorpusService(str(tmp_path / "corpus.bin")).get_pages() is None
+
+    def test_get_pages_with_empty_snapshot(self, tmp_path):
+        service = CorpusService(str(tmp_path / "corpus.bin"))
+        service.write_snapshot({})
+
+        assert service.get_pages() is None
+
+    def test_picks_up_new_version(self, tmp_path):
+        service = CorpusService(str(tmp_path / "corpus.bin"))
+        service.write_snapshot({"https://example.com/": "Vana"})
+        first = service.load_snapshot()
+
+        assert service.load_snapshot() is first
+
+        service.write_snapshot({"https://example.com/": "Uus"})
+
+        assert service.load_snapshot() is not first
+        assert service.get_pages() == {"https://example.com/": "Uus"}
+
+    def test_pages_are_a_shared_view_of_the_mapping(self, tmp_path):
+        service = CorpusService(str(tmp_path / "corpus.bin"))
+        service.write_snapshot({"https://example.com/": "Avaleht", "https://example.com/ä": "Sisu ja ümbrus"})
+
+        pages = service.get_pages()
+
+        assert service.get_pages() is pages
+        assert not isinstance(pages, dict)
+        assert len(pages) == 2
+        assert pages["https://example.com/ä"] == "Sisu ja ümbrus"
+        assert "https://example.com/puudub" not in pages
+        assert pages.get("https://example.com/puudub") is None
+        assert dict(pages.items()) == service.load_snapshot().to_dict()
+
+    def test_broken_snapshot_falls_back(self, tmp_path):
+        path = tmp_path / "corpus.bin"
+        path.write_bytes(b"broken")
+
+        assert CorpusService(str(path)).get_pages() is None
+
+    def test_get_digests(self, tmp_path):
+        service = CorpusService(str(tmp_path / "corpus.bin"))
+        assert service.get_digests() is None
+
+        service.write_snapshot({"https://example.com/": "Pikk sisu", "https://example.com/a": "Lühike"},
+                               {"https://example.com/": "Sisu"})
+
+        assert service.get_digests() == {"https://example.com/": "Sisu"}
@@ -0,0 +1,67 @@
+import pytest
+from app.db.models.crawl_job import CrawlJob
+from app.cruds.crawl_job_crud import CrawlJobCrud
+
+
+class TestCrawlJobCrud:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database):
+        self.db = setup_test_database
+        self.crawl_job_crud = CrawlJobCrud(self.db)
+
+        yield
+
+        self.db.close()
+
+    def test_create_job(self):
+        job = self.crawl_job_crud.create_job("crawl_jobs")
+
+        assert job.id is not None
+        assert job.status == CrawlJob.RUNNING
+        assert job.job_dir.endswith(f"job-{job.id}")
+        assert job.pages_stored == 0
+        assert job.total_chars == 0
+
+    def test_get_resumable_job_none(self):
+        assert self.crawl_job_crud.get_resumable_job() is None
+
+    def test_get_resumable_job_running(self):
+        job = self.crawl_job_crud.create_job("crawl_jobs")
+
+        assert self.crawl_job_crud.get_resumable_job().id == job.id
+
+    def test_get_resumable_job_interrupted(self):
+        job = self.crawl_job_crud.create_job("crawl_jobs")
+        self.crawl_job_crud.set_status(job.id, CrawlJob.INTERRUPTED)
+
+        assert self.crawl_job_crud.get_resumable_job().id == job.id
+
+    def test_get_resumable_job_latest_finished(self):
+        old_job = self.crawl_job_crud.create_job("crawl_jobs")
+        self.crawl_job_crud.set_status(old_job.id, CrawlJob.INTERRUPTED)
+        new_job = self.crawl_job_crud.create_job("crawl_jobs")
+        self.crawl_job_crud.set_status(new_job.id, CrawlJob.FINISHED)
+
+        assert self.crawl_job_crud.get_resumable_job() is None
+
+    def test_checkpoint(self):
+        job = self.crawl_job_crud.create_job("crawl_jobs")
+
+        job = self.crawl_job_crud.checkpoint(job.id, pages_stored=12, total_chars=3400)
+
+        assert job.pages_stored == 12
+        assert job.total_chars == 3400
+        assert job.status == CrawlJob.RUNNING
+        assert job.finished_at is None
+
+    def test_checkpoint_finished(self):
+        job = self.crawl_job_crud.create_job("crawl_jobs")
+
+        job = self.crawl_job_crud.checkpoint(job.id, 5, 100, CrawlJob.FINISHED)
+
+        assert job.status == CrawlJob.FINISHED
+        assert job.finished_at is not None
+
+    def test_checkpoint_missing_job(self):
+        with pytest.raises(ValueError):
+            self.crawl_job_crud.checkpoint(999, 1, 1)
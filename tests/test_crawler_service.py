@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import patch
+
+from app.config import settings
+from app.cruds.crawl_job_crud import CrawlJobCrud
+from app.db.models.crawl_job import CrawlJob
+from app.services.crawler_service import CrawlerService
+
+
+class TestCrawlerService:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "CRAWL_JOBS_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "REVISIT_ENABLED", False)
+        self.db = setup_test_database
+        self.crawl_job_crud = CrawlJobCrud(self.db)
+
+    def run_crawl(self, run_spider) -> CrawlJob:
+        with patch("app.services.crawler_service.threading.Thread"), \
+                patch("app.services.crawler_service.get_db", return_value=iter([self.db])), \
+                patch.object(CrawlerService, "_run_spider", side_effect=run_spider), \
+                patch.object(self.db, "close"):
+            CrawlerService()._run_crawl()
+        return self.crawl_job_crud.get_job(1)
+
+    def test_crawl_error_fails_the_job(self):
+        job = self.run_crawl(lambda job, resume: (1, "error"))
+
+        assert job.status == CrawlJob.FAILED
+        assert job.finished_at is not None
+        assert self.crawl_job_crud.get_resumable_job() is None
+
+    def test_killed_crawl_stays_resumable(self):
+        job = self.run_crawl(lambda job, resume: (-9, ""))
+
+        assert job.status == CrawlJob.RUNNING
+        assert self.crawl_job_crud.get_resumable_job().id == job.id
+
+    def test_closed_job_keeps_its_status(self):
+        def run_spider(job, resume):
+            self.crawl_job_crud.set_status(job.id, CrawlJob.FINISHED)
+            return 1, "error"
+
+        assert self.run_crawl(run_spider).status == CrawlJob.FINISHED
@@ -0,0 +1,81 @@
+import pytest
+
+from app.config import settings
+from app.services.digest_service import (
+    DigestService, ExtractiveDigestProvider, StubDigestProvider, get_digest_provider, split_sentences,
+)
+
+
+PAGE = "\n".join([
+    "Tehisintellekt OÜ pakub tehisintellekti koolitusi ja tehisintellekti lahendusi ettevõtetele.",
+    "Avaleht Teenused Koolitused Kontakt",
+    "Meie koolitused õpetavad tehisintellekti kasutama igapäevatöös.",
+    "Ilus ilm on täna väljas ja päike paistab.",
+    "Koolitused toimuvad Tallinnas ja veebis, koolituse hind alates 300 eurot.",
+    "Avaleht Teenused Koolitused Kontakt",
+    "Kirjuta meile info@tehisintellekt.ee või helista +372 5555 5555.",
+] * 3)
+
+
+class TestDigestService:
+
+    @pytest.fixture
+    def service(self):
+        return DigestService(ExtractiveDigestProvider())
+
+    def test_split_sentences(self):
+        assert split_sentences("Esimene lause. Teine lause!\nPealkiri\n\nKolmas?") == [
+            "Esimene lause.", "Teine lause!", "Pealkiri", "Kolmas?"
+        ]
+
+    def test_extractive_digest_is_shorter(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "DIGEST_MIN_CHARS", 100)
+
+        digest = service.digest(PAGE)
+
+        assert digest is not None
+        assert len(digest) <= max(100, int(len(PAGE) * settings.DIGEST_RATIO))
+        assert "tehisintellekti koolitusi" in digest
+
+    def test_extractive_digest_keeps_original_order_and_drops_repetition(self):
+        digest = ExtractiveDigestProvider().digest(PAGE, 250)
+        sentences = digest.split("\n")
+
+        assert len(sentences) == len(set(sentences))
+        assert sentences == [sentence for sentence in dict.fromkeys(split_sentences(PAGE)) if sentence in sentences]
+        assert "Ilus ilm on täna väljas ja päike paistab." not in sentences
+
+    def test_short_page_has_no_digest(self, service):
+        assert service.digest("Kontakt: info@example.com") is None
+
+    def test_digest_not_shorter_is_dropped(self, monkeypatch):
+        monkeypatch.setattr(settings, "DIGEST_MIN_CHARS", 10)
+        service = DigestService(StubDigestProvider(lambda content, max_chars: content + " lisatud"))
+
+        assert service.digest("Lehe sisu, mis on piisavalt pikk") is None
+
+    def test_build_digests_with_stub(self, monkeypatch):
+        monkeypatch.setattr(settings, "DIGEST_MIN_CHARS", 10)
+        provider = StubDigestProvider()
+        service = DigestService(provider)
+
+        digests = service.build_digests({"https://example.com/": "x" * 100, "https://example.com/a": "lühike"})
+
+        assert digests == {"https://example.com/": "x" * 25, "https://example.com/a": None}
+        assert provider.calls == 1
+
+    def test_failing_page_is_sent_verbatim(self, monkeypatch):
+        monkeypatch.setattr(settings, "DIGEST_MIN_CHARS", 10)
+
+        def fail(content, max_chars):
+            raise Exception("Rate limit")
+
+        digests = DigestService(StubDigestProvider(fail)).build_digests({"https://example.com/": "x" * 100})
+
+        assert digests == {"https://example.com/": None}
+
+    def test_unknown_provider(self, monkeypatch):
+        monkeypatch.setattr(settings, "DIGEST_PROVIDER", "unknown")
+
+        with pytest.raises(ValueError):
+            get_digest_provider()
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from crawler.documents import DOCX, HTML, PDF, TEXT, content_kind, extract_document_text, should_download
+
+
+BODIES = Path("tests/fixtures/site/bodies")
+
+
+class TestContentKind:
+
+    @pytest.mark.parametrize("content_type, url, expected", [
+        ("text/html; charset=utf-8", "https://example.com/", HTML),
+        ("application/pdf", "https://example.com/download?id=1", PDF),
+        ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "https://example.com/a", DOCX),
+        ("text/plain", "https://example.com/notes", TEXT),
+        ("application/octet-stream", "https://example.com/files/price-list.DOCX", DOCX),
+        ("", "https://example.com/files/plan.pdf", PDF),
+        ("application/octet-stream", "https://example.com/files/archive.zip", None),
+        ("image/png", "https://example.com/logo", None),
+        ("application/vnd.ms-powerpoint", "https://example.com/slides.pdf", None),
+    ])
+    def test_content_kind(self, content_type, url, expected):
+        assert content_kind(content_type, url) == expected
+
+
+class TestShouldDownload:
+
+    def test_supported_type_within_size(self):
+        assert should_download("text/html", 1000, "https://example.com/", max_size=2000) is True
+
+    def test_unknown_length_is_downloaded(self):
+        assert should_download("text/plain", None, "https://example.com/notes", max_size=2000) is True
+
+    def test_too_large(self):
+        assert should_download("text/html", 3000, "https://example.com/", max_size=2000) is False
+
+    def test_unsupported_type(self):
+        assert should_download("video/mp4", 1000, "https://example.com/video", max_size=2000) is False
+
+
+class TestExtractDocumentText:
+
+    def test_pdf(self):
+        pytest.importorskip("pypdf")
+
+        text = extract_document_text(PDF, (BODIES / "koolituskava.pdf").read_bytes(), None)
+
+        assert text == ("Koolituskava: masinope, keelemudelid ja praktiline too. "
+                        "Koolituse hind on 450 eurot osaleja kohta.")
+
+    def test_pdf_stops_at_max_chars(self):
+        pytest.importorskip("pypdf")
+
+        text = extract_document_text(PDF, (BODIES / "koolituskava.pdf").read_bytes(), 12)
+
+        assert text == "Koolituskava"
+
+    def test_docx(self):
+        text = extract_document_text(DOCX, (BODIES / "hinnakiri.docx").read_bytes(), None)
+
+        assert text == "Hinnakiri Ühepäevane koolitus: 450 eurot Konsultatsioon 120 eurot tunnis"
+
+    def test_docx_stops_at_max_chars(self):
+        text = extract_document_text(DOCX, (BODIES / "hinnakiri.docx").read_bytes(), 9)
+
+        assert text == "Hinnakiri"
+
+    def test_plain_text(self):
+        text = extract_document_text(TEXT, "Avatud\n\n  E-R 9-17".encode("cp1257"), None, encoding="cp1257")
+
+        assert text == "Avatud E-R 9-17"
+
+    def test_broken_document_raises(self):
+        with pytest.raises(Exception):
+            extract_document_text(DOCX, b"not a zip file", None)
+
+    def test_html_is_not_a_document(self):
+        with pytest.raises(ValueError):
+            extract_document_text(HTML, b"<html></html>", None)
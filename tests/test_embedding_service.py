@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from app.services.embedding_service import EmbeddingService, HashingEmbeddingProvider, chunk_text
+
+
+class TestChunkText:
+
+    def test_short_text_is_one_chunk(self):
+        assert chunk_text("one two three", chunk_size=100, overlap=10) == ["one two three"]
+
+    def test_chunks_respect_size_and_overlap(self):
+        text = " ".join(f"word{i}" for i in range(100))
+
+        chunks = chunk_text(text, chunk_size=60, overlap=15)
+
+        assert all(len(chunk) <= 60 for chunk in chunks)
+        assert chunks[0].split()[-1] in chunks[1].split()
+        assert " ".join(chunks).split()[-1] == "word99"
+
+    def test_long_word_is_not_lost(self):
+        assert chunk_text("a" * 50, chunk_size=10, overlap=2) == ["a" * 50]
+
+    def test_empty_text(self):
+        assert chunk_text("   ", chunk_size=10, overlap=2) == []
+
+
+class TestHashingEmbeddingProvider:
+
+    def test_deterministic_unit_vectors(self):
+        provider = HashingEmbeddingProvider(dimension=64)
+
+        first = provider.embed(["AI training for teams", ""])
+        second = provider.embed(["AI training for teams", ""])
+
+        assert first.shape == (2, 64)
+        assert np.array_equal(first, second)
+        assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+        assert not first[1].any()
+
+    def test_similar_texts_are_closer(self):
+        provider = HashingEmbeddingProvider()
+        query, similar, other = provider.embed(["koolituse hind", "koolituste hinnad", "kontakt telefon"])
+
+        assert query @ similar > query @ other
+
+
+class TestEmbeddingService:
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return EmbeddingService(provider=HashingEmbeddingProvider(), index_path=str(tmp_path / "embeddings"))
+
+    @pytest.fixture
+    def pages(self):
+        return {
+            "https://example.com/training": "AI training for teams takes one day and costs 500 euros",
+            "https://example.com/contact": "Call us or write an email to info at example",
+            "https://example.com/about": "We are an artificial intelligence company from Tallinn",
+        }
+
+    def test_retrieve(self, service, pages):
+        assert service.build_index(pages) == 3
+
+        results = service.retrieve("how much does training cost", k=1)
+
+        assert results[0]["url"] == "https://example.com/training"
+
+    def test_retrieve_without_index(self, service):
+        assert service.retrieve("question", k=3) == []
+
+    def test_reload_after_rebuild(self, service, pages):
+        service.build_index(pages)
+        first = service.load_index()
+        service.build_index({"https://example.com/new": "new page"})
+        second = service.load_index()
+
+        assert service.load_index() is second
+        assert second.version != first.version
+        assert second.chunks[0]["url"] == "https://example.com/new"
+
+    def test_select_context_disabled(self, service, pages):
+        with patch("app.services.embedding_service.settings.EMBEDDING_RETRIEVAL_ENABLED", False):
+            assert service.select_context("training cost", pages) is pages
+
+    def test_select_context(self, service, pages):
+        service.build_index(pages)
+
+        with patch("app.services.embedding_service.settings.EMBEDDING_RETRIEVAL_ENABLED", True), \
+                patch("app.services.embedding_service.settings.EMBEDDING_TOP_K", 1):
+            context = service.select_context("training cost", pages)
+
+        assert context == {"https://example.com/training": pages["https://example.com/training"]}
+
+    def test_select_context_without_index_uses_all_pages(self, service, pages):
+        with patch("app.services.embedding_service.settings.EMBEDDING_RETRIEVAL_ENABLED", True):
+            assert service.select_context("training cost", pages) == pages
+
+    def test_retrieve_with_other_provider_index(self, service, pages, tmp_path):
+        service.build_index(pages)
+        other = EmbeddingService(provider=HashingEmbeddingProvider(), index_path=service.index_path)
+        other.provider.name = "other"
+
+        assert other.retrieve("training", k=1) == []
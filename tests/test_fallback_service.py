@@ -0,0 +1,55 @@
+import pytest
+
+from app.config import settings
+from app.services.fallback_service import FallbackService
+
+
+PAGES = {
+    "https://example.com/koolitused": (
+        "Koolitused. Pakume praktilisi tehisintellekti koolitusi juhtidele. Koolituse hind on 450 eurot."
+    ),
+    "https://example.com/kontakt": "Kontakt. Helista meile numbril 5555 5555 või kirjuta info@example.com.",
+    "https://example.com/": "Tehisintellekti lahendused ettevõtetele. Vaata koolitusi ja teenuseid.",
+}
+
+
+class TestFallbackService:
+
+    @pytest.fixture
+    def service(self):
+        return FallbackService()
+
+    def test_passages_match_question_words(self, service):
+        passages = service.passages("Kui palju maksab koolituse hind?", PAGES, limit=1)
+
+        assert passages == [("https://example.com/koolitused", "Koolituse hind on 450 eurot.")]
+
+    def test_rare_words_weigh_more(self, service):
+        # "koolitus" occurs on two pages, "helista" on one
+        passages = service.passages("Koolitus või helista?", PAGES, limit=1)
+
+        assert passages[0][0] == "https://example.com/kontakt"
+
+    def test_degraded_answer(self, service):
+        response = service.answer("Mis on koolituse hind?", PAGES)
+
+        assert response.degraded is True
+        assert response.model is None
+        assert response.answer.startswith("Vastust ei õnnestunud praegu koostada. Kõige asjakohasemad lõigud")
+        assert "- Koolituse hind on 450 eurot. (https://example.com/koolitused)" in response.answer
+        assert response.sources[0] == "https://example.com/koolitused"
+        assert len(response.sources) == len(set(response.sources))
+
+    def test_no_matching_passages(self, service):
+        response = service.answer("What is the weather like tomorrow?", PAGES)
+
+        assert response.answer == "The answer could not be generated right now, please try again later."
+        assert response.sources == []
+
+    def test_long_passages_are_shortened(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "ASK_FALLBACK_PASSAGE_CHARS", 20)
+        pages = {"https://example.com/": "Koolituse kava sisaldab masinõpet keelemudeleid ja praktilist tööd"}
+
+        passages = service.passages("Mis on koolituse kava?", pages, limit=1)
+
+        assert passages == [("https://example.com/", "Koolituse kava…")]
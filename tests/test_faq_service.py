@@ -0,0 +1,123 @@
+import pytest
+from unittest.mock import Mock
+
+from app.config import settings
+from app.cruds.conversation_crud import ConversationCrud
+from app.cruds.faq_crud import FaqCrud
+from app.dtos.ask_response import AskResponse
+from app.services.embedding_service import EmbeddingService
+from app.services.faq_service import FaqService, normalize_question
+from app.services.openai_service import OpenAIService
+
+
+PAGES = {
+    "https://example.com/koolitused": "Koolitused. Pakume tehisintellekti koolitusi juhtidele, hind 450 eurot.",
+    "https://example.com/kontakt": "Kontakt. Meie kontor asub Tallinnas, helista või kirjuta info@example.com.",
+}
+
+
+def model_answer(question, pages, **kwargs):
+    return AskResponse(
+        question=question,
+        answer=f"Answer to {question}",
+        sources=["https://example.com/koolitused"] if "koolitus" in question.lower() else ["https://example.com/kontakt"],
+        usage={"input_tokens": 100, "output_tokens": 10},
+        model="gpt-4o-mini",
+    )
+
+
+class TestFaqService:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "FAQ_QUESTIONS", ["Milliseid koolitusi pakute?", "Kus asub teie kontor?"])
+        monkeypatch.setattr(settings, "FAQ_QUESTIONS_FILE", str(tmp_path / "faq_questions.txt"))
+        monkeypatch.setattr(settings, "FAQ_MIN_ASKS", 2)
+        self.db = setup_test_database
+        self.openai_service = Mock(spec=OpenAIService)
+        self.openai_service.answer_question.side_effect = model_answer
+        self.embedding_service = Mock(spec=EmbeddingService)
+        self.embedding_service.select_context.side_effect = lambda question, pages: pages
+        self.service = FaqService(self.db, self.openai_service, self.embedding_service)
+        FaqService.clear_cache()
+
+        yield
+
+        FaqService.clear_cache()
+
+    def test_normalize_question(self):
+        assert normalize_question("  Milliseid KOOLITUSI pakute?! ") == "milliseid koolitusi pakute"
+        assert normalize_question("Kus  asub teie KONTOR") == normalize_question("kus asub teie kontor?")
+
+    def test_questions(self, tmp_path):
+        (tmp_path / "faq_questions.txt").write_text("# Kontakt\nKUS ASUB TEIE KONTOR?\nKui palju maksab koolitus?\n\n")
+        conversation_crud = ConversationCrud(self.db)
+        for question in ["kas pakute mentorlust", "Kas pakute mentorlust?", "Kas pakute mentorlust?", "Mis kell olete avatud?"]:
+            conversation_crud.add_turn(conversation_crud.create_conversation().id, question, "Answer", [])
+
+        assert self.service.questions() == [
+            "Milliseid koolitusi pakute?", "Kus asub teie kontor?", "Kui palju maksab koolitus?", "Kas pakute mentorlust?",
+        ]
+
+    def test_refresh_and_lookup(self):
+        assert self.service.refresh(PAGES, corpus_version=1) == 2
+
+        response = self.service.lookup("milliseid koolitusi PAKUTE", corpus_version=1)
+
+        assert response.question == "milliseid koolitusi PAKUTE"
+        assert response.answer == "Answer to Milliseid koolitusi pakute?"
+        assert response.sources == ["https://example.com/koolitused"]
+        assert response.usage.input_tokens == 0
+        assert response.model == "gpt-4o-mini"
+        assert response.cached is True
+        assert self.service.lookup("Mis on koolituse hind?", corpus_version=1) is None
+
+    def test_other_corpus_version_misses(self):
+        self.service.refresh(PAGES, corpus_version=1)
+
+        assert self.service.lookup("Kus asub teie kontor?", corpus_version=2) is None
+
+    def test_lookup_is_cached(self):
+        self.service.refresh(PAGES, corpus_version=1)
+        self.service.lookup("Kus asub teie kontor?", corpus_version=1)
+        self.service.faq_crud = Mock(spec=FaqCrud)
+
+        assert self.service.lookup("Kus asub teie kontor?", corpus_version=1) is not None
+        self.service.faq_crud.get_answers.assert_not_called()
+
+    def test_missing_answers_are_reloaded(self, monkeypatch):
+        monkeypatch.setattr(settings, "FAQ_RELOAD_INTERVAL", 0)
+        assert self.service.lookup("Kus asub teie kontor?", corpus_version=1) is None
+
+        self.service.refresh(PAGES, corpus_version=1)
+
+        assert self.service.lookup("Kus asub teie kontor?", corpus_version=1) is not None
+
+    def test_refresh_replaces_previous_version(self):
+        self.service.refresh(PAGES, corpus_version=1)
+        self.service.refresh(PAGES, corpus_version=2)
+
+        assert FaqCrud(self.db).get_answers(1) == []
+        assert len(FaqCrud(self.db).get_answers(2)) == 2
+
+    def test_revisit_carries_over_unchanged_answers(self):
+        self.service.refresh(PAGES, corpus_version=1)
+        self.openai_service.answer_question.reset_mock()
+
+        self.service.refresh(PAGES, corpus_version=2, changed_urls={"https://example.com/kontakt"})
+
+        self.openai_service.answer_question.assert_called_once_with("Kus asub teie kontor?", PAGES)
+        assert self.service.lookup("Milliseid koolitusi pakute?", corpus_version=2) is not None
+
+    def test_failed_answer_is_skipped(self, monkeypatch):
+        monkeypatch.setattr(settings, "BATCH_CONCURRENCY", 1)
+        self.openai_service.answer_question.side_effect = [Exception("API error"), model_answer("Kus asub teie kontor?", PAGES)]
+
+        assert self.service.refresh(PAGES, corpus_version=1) == 1
+        assert self.service.lookup("Kus asub teie kontor?", corpus_version=1) is not None
+
+    def test_off_topic_question_is_not_answered(self, monkeypatch):
+        monkeypatch.setattr(settings, "FAQ_QUESTIONS", ["Milliseid koolitusi pakute?", "Kas homme sajab vihma?"])
+
+        assert self.service.refresh(PAGES, corpus_version=1) == 1
+        self.openai_service.answer_question.assert_called_once_with("Milliseid koolitusi pakute?", PAGES)
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.database import Base
+from app.db.migrations import add_missing_columns
+
+
+class TestMigrations:
+
+    def test_adds_missing_column_once(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE pages (id INTEGER PRIMARY KEY, url VARCHAR NOT NULL, content VARCHAR NOT NULL, "
+                "created_at DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO pages (url, content) VALUES ('https://example.com', 'Sisu')"))
+
+            assert add_missing_columns(connection, Base.metadata) == ["pages.digest"]
+            assert add_missing_columns(connection, Base.metadata) == []
+
+            columns = {column["name"] for column in inspect(connection).get_columns("pages")}
+            assert "digest" in columns
+            assert connection.execute(text("SELECT content, digest FROM pages")).one() == ("Sisu", None)
+
+    def test_skips_missing_tables(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            assert add_missing_columns(connection, Base.metadata) == []
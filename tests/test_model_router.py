@@ -0,0 +1,132 @@
+import pytest
+
+from app.config import settings
+from app.services.model_router import ModelProfile, ModelRouter, is_complex_question, is_retryable_error
+
+
+class TestModelRouter:
+
+    @pytest.fixture(autouse=True)
+    def reset_stats(self):
+        ModelRouter.reset_stats()
+        yield
+        ModelRouter.reset_stats()
+
+    @pytest.fixture
+    def router(self):
+        return ModelRouter([
+            ModelProfile("small", tier=1, max_context_tokens=16000, input_cost=0.1, output_cost=0.4),
+            ModelProfile("medium", tier=2, max_context_tokens=128000, input_cost=0.4, output_cost=1.6),
+            ModelProfile("large", tier=3, max_context_tokens=128000, input_cost=2.5, output_cost=10.0),
+        ])
+
+    @staticmethod
+    def names(chain):
+        return [profile.name for profile in chain]
+
+    def test_simple_question_routes_to_cheapest_model(self, router):
+        chain = router.route("What services do you offer?", 1000)
+
+        assert self.names(chain) == ["small", "medium", "large"]
+
+    def test_complex_question_routes_to_higher_tier(self, router):
+        chain = router.route("Explain the difference between your two training programs", 1000)
+
+        assert self.names(chain) == ["medium", "large", "small"]
+
+    def test_large_context_skips_small_models(self, router):
+        chain = router.route("What services do you offer?", 50000)
+
+        assert self.names(chain) == ["medium", "large"]
+
+    def test_context_fitting_no_model(self, router):
+        assert router.route("What services do you offer?", 500000) == []
+
+    def test_unhealthy_model_is_demoted(self, router):
+        small = router.profiles[0]
+        for _ in range(5):
+            router.record_failure(small, 1.0)
+
+        assert not router.is_healthy("small")
+        assert self.names(router.route("What services do you offer?", 1000)) == ["medium", "large", "small"]
+
+    def test_slow_model_is_demoted(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "MODEL_MAX_LATENCY", 5.0)
+        router.record_success(router.profiles[0], 10.0, 100, 10)
+
+        assert not router.is_healthy("small")
+
+    def test_model_recovers_after_successes(self, router):
+        small = router.profiles[0]
+        for _ in range(5):
+            router.record_failure(small, 1.0)
+        for _ in range(10):
+            router.record_success(small, 1.0, 100, 10)
+
+        assert router.is_healthy("small")
+
+    def test_demoted_model_is_tried_again_after_recovery_interval(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "MODEL_RECOVERY_INTERVAL", 60.0)
+        small = router.profiles[0]
+        for _ in range(5):
+            router.record_failure(small, 1.0)
+        failed_at = router.stats("small").last_call_at
+
+        assert not router.is_healthy("small", now=failed_at + 59)
+        assert router.is_healthy("small", now=failed_at + 60)
+
+        monkeypatch.setattr(settings, "MODEL_RECOVERY_INTERVAL", 0.0)
+        assert self.names(router.route("What services do you offer?", 1000)) == ["small", "medium", "large"]
+
+    def test_failed_retry_demotes_again(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "MODEL_RECOVERY_INTERVAL", 60.0)
+        small = router.profiles[0]
+        for _ in range(5):
+            router.record_failure(small, 1.0)
+        monkeypatch.setattr(settings, "MODEL_RECOVERY_INTERVAL", 0.0)
+        assert router.is_healthy("small")
+
+        monkeypatch.setattr(settings, "MODEL_RECOVERY_INTERVAL", 60.0)
+        router.record_failure(small, 1.0)
+
+        assert not router.is_healthy("small", now=router.stats("small").last_call_at + 1)
+
+    def test_stats_report(self, router):
+        router.record_success(router.profiles[1], 2.0, 1_000_000, 0)
+
+        report = router.stats_report()
+
+        assert set(report) == {"small", "medium", "large"}
+        assert report["medium"]["calls"] == 1
+        assert report["medium"]["cost"] == pytest.approx(0.4)
+        assert report["medium"]["healthy"] is True
+        assert report["small"]["latency"] is None
+
+    def test_default_profiles_from_settings(self):
+        router = ModelRouter()
+
+        assert [profile.name for profile in router.profiles] == [
+            profile["name"] for profile in settings.MODEL_PROFILES
+        ]
+
+    @pytest.mark.parametrize("question", [
+        "Compare your two training programs",
+        "Miks peaksin valima teie koolituse?",
+        "What do you offer? And how much does it cost?",
+    ])
+    def test_complex_questions(self, question):
+        assert is_complex_question(question)
+
+    def test_simple_question(self):
+        assert not is_complex_question("What services do you offer?")
+
+    def test_retryable_errors(self):
+        server_error = Exception("Internal error")
+        server_error.status_code = 500
+        client_error = Exception("Bad request")
+        client_error.status_code = 400
+
+        assert is_retryable_error(TimeoutError())
+        assert is_retryable_error(server_error)
+        assert not is_retryable_error(client_error)
+        assert not is_retryable_error(ValueError())
@@ -1,9 +1,12 @@
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from app.config import settings
-from app.services.openai_service import OpenAIService
+from app.services.openai_service import DeadlineExceeded, OpenAIService, get_model_executor
 from app.dtos.ask_response import AskResponse, AskFormat
+from app.services.model_router import ModelProfile, ModelRouter, StubModelClient
 
 
 class TestOpenAIService:
@@ -55,4 +58,164 @@ class TestOpenAIService:
         with pytest.raises(Exception) as exc_info:
             service.answer_question("Test question", sample_data)
 
-        assert "API Error" in str(exc_info.value)
\ No newline at end of file
+        assert "API Error" in str(exc_info.value)
+    @patch('openai.responses.parse')
+    def test_answer_question_with_history(self, mock_parse, service, sample_data):
+        mock_parse.return_value.output_parsed = AskFormat(question="How much?", answer="100 EUR", sources=[])
+        mock_parse.return_value.usage.input_tokens = 100
+        mock_parse.return_value.usage.output_tokens = 5
+
+        service.answer_question("How much?", sample_data, history="User: What trainings?\nAssistant: AI basics")
+
+        user_prompt = mock_parse.call_args.kwargs["input"][1]["content"]
+        assert user_prompt.startswith("Conversation so far:\nUser: What trainings?")
+        assert "Question: How much?" in user_prompt
+
+    @patch('openai.responses.create')
+    def test_summarize_conversation(self, mock_create, service):
+        mock_create.return_value.output_text = " User asked about AI trainings. "
+
+        summary = service.summarize_conversation("", [("What trainings?", "AI basics")])
+
+        assert summary == "User asked about AI trainings."
+        assert "User: What trainings?\nAssistant: AI basics" in mock_create.call_args.kwargs["input"][1]["content"]
+
+
+class TestOpenAIServiceFallback:
+
+    @pytest.fixture(autouse=True)
+    def reset_stats(self):
+        ModelRouter.reset_stats()
+        yield
+        ModelRouter.reset_stats()
+
+    @pytest.fixture
+    def router(self):
+        return ModelRouter([
+            ModelProfile("small", tier=1, max_context_tokens=100000, input_cost=0.1, output_cost=0.4),
+            ModelProfile("large", tier=2, max_context_tokens=100000, input_cost=2.0, output_cost=8.0),
+        ])
+
+    @staticmethod
+    def answer(model, messages):
+        response = MagicMock()
+        response.output_parsed = AskFormat(question="Q", answer=f"Answer of {model}", sources=[])
+        response.usage.input_tokens = 1000
+        response.usage.output_tokens = 100
+        return response
+
+    def test_cheapest_model_answers(self, router):
+        client = StubModelClient(self.answer)
+        service = OpenAIService(router=router, client=client)
+
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        assert result.model == "small"
+        assert client.calls == ["small"]
+        assert router.stats("small").cost == pytest.approx((1000 * 0.1 + 100 * 0.4) / 1_000_000)
+
+    def test_timeout_falls_back_to_next_model(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "MODEL_TIMEOUT", 0.01)
+        client = StubModelClient(self.answer, latency={"small": 1.0})
+        service = OpenAIService(router=router, client=client)
+
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        assert result.model == "large"
+        assert client.calls == ["small", "large"]
+        assert router.stats("small").failures == 1
+
+    def test_server_error_falls_back_to_next_model(self, router):
+        error = Exception("Service unavailable")
+        error.status_code = 503
+        client = StubModelClient(self.answer, failures={"small": error})
+        service = OpenAIService(router=router, client=client)
+
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        assert result.model == "large"
+
+    def test_client_error_is_not_retried(self, router):
+        error = Exception("Bad request")
+        error.status_code = 400
+        client = StubModelClient(self.answer, failures={"small": error})
+        service = OpenAIService(router=router, client=client)
+
+        with pytest.raises(Exception, match="Bad request"):
+            service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+        assert client.calls == ["small"]
+
+    def test_all_models_failing_raises_last_error(self, router):
+        client = StubModelClient(self.answer, failures={"small": TimeoutError("small"), "large": TimeoutError("large")})
+        service = OpenAIService(router=router, client=client)
+
+        with pytest.raises(TimeoutError, match="large"):
+            service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+    def test_deadline_exceeded(self, router, monkeypatch):
+        client = StubModelClient(self.answer, latency={"small": 1.0, "large": 1.0})
+        service = OpenAIService(router=router, client=client)
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            service.answer_question("What services do you offer?", {"https://example.com": "Content"},
+                                    deadline=started + 0.05)
+
+        assert time.monotonic() - started < 0.5
+
+    def test_deadline_leaves_time_for_fallback_with_default_settings(self, router):
+        timeouts = {}
+
+        def answer(model, messages):
+            if model == "small":
+                raise TimeoutError(f"{model} timed out after {timeouts[model]}s")
+            return self.answer(model, messages)
+
+        class RecordingClient(StubModelClient):
+            def parse(self, model, messages, text_format, timeout):
+                timeouts[model] = timeout
+                return super().parse(model, messages, text_format, timeout)
+
+        service = OpenAIService(router=router, client=RecordingClient(answer))
+
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"},
+                                         deadline=time.monotonic() + settings.ASK_DEADLINE)
+
+        assert result.model == "large"
+        assert timeouts["small"] == pytest.approx(settings.ASK_DEADLINE / 2, abs=0.5)
+        assert timeouts["small"] < settings.MODEL_TIMEOUT
+        assert timeouts["large"] == pytest.approx(settings.ASK_DEADLINE, abs=0.5)
+
+    def test_model_calls_share_one_executor(self, router):
+        client = StubModelClient(self.answer)
+        service = OpenAIService(router=router, client=client)
+        executor = get_model_executor()
+
+        with patch("app.services.openai_service.ThreadPoolExecutor") as executor_class:
+            service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+            service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        executor_class.assert_not_called()
+        assert get_model_executor() is executor
+
+    def test_hedged_request_wins(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "ASK_HEDGE_DELAY", 0.05)
+        client = StubModelClient(self.answer, latency={"small": 1.0})
+        service = OpenAIService(router=router, client=client)
+
+        started = time.monotonic()
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        assert result.model == "large"
+        assert client.calls == ["small", "large"]
+        assert time.monotonic() - started < 0.5
+
+    def test_no_hedge_when_primary_is_fast(self, router, monkeypatch):
+        monkeypatch.setattr(settings, "ASK_HEDGE_DELAY", 0.5)
+        client = StubModelClient(self.answer)
+        service = OpenAIService(router=router, client=client)
+
+        result = service.answer_question("What services do you offer?", {"https://example.com": "Content"})
+
+        assert result.model == "small"
+        assert client.calls == ["small"]
@@ -2,6 +2,8 @@ import pytest
 from sqlalchemy.exc import SQLAlchemyError
 from app.db.models.page import Page
 from app.cruds.page_crud import PageCrud
+from app.cruds.page_schedule_crud import PageScheduleCrud
+from app.db.models.page_schedule import PageSchedule
 
 
 class TestPageCrud:
@@ -73,6 +75,18 @@ class TestPageCrud:
         pages = self.page_crud.get_all_pages()
         assert len(pages) == 0
 
+    def test_reset_pages_drops_revisit_schedules(self):
+        schedule_crud = PageScheduleCrud(self.db)
+        self.page_crud.add_page("https://example1.com", "<html>Content 1</html>")
+        schedule_crud.save_schedule(PageSchedule(url="https://example1.com", interval=3600, next_due_at=0))
+        schedule_crud.add_history("https://example1.com", "hash", 200, False, 0)
+
+        self.page_crud.delete_all_pages()
+
+        assert schedule_crud.count_schedules() == 0
+        assert schedule_crud.get_queue(10) == []
+        assert schedule_crud.get_history("https://example1.com", 10) == []
+
     def test_add_page_empty_url(self):
         with pytest.raises(Exception):
             self.page_crud.add_page(url="", content="<html>Content</html>")
@@ -83,4 +97,89 @@ class TestPageCrud:
         page = self.page_crud.add_page(url=url, content="")
 
         assert page is not None
-        assert page.content == ""
\ No newline at end of file
+        assert page.content == ""
+    def test_search(self):
+        self.page_crud.add_page("https://example.com/services", "We offer AI consulting and chatbot development")
+        self.page_crud.add_page("https://example.com/training", "AI training for teams. Training takes one day")
+        self.page_crud.add_page("https://example.com/contact", "Write to info@example.com")
+
+        results = self.page_crud.search("training", limit=10)
+
+        assert [result.url for result in results] == ["https://example.com/training"]
+        assert "<b>training</b>" in results[0].snippet.lower()
+
+    def test_search_requires_all_words_and_ranks(self):
+        self.page_crud.add_page("https://example.com/a", "AI consulting")
+        self.page_crud.add_page("https://example.com/b", "AI chatbot, chatbot for support, chatbot development")
+        self.page_crud.add_page("https://example.com/c", "chatbot development")
+
+        results = self.page_crud.search("AI chatbot", limit=10)
+
+        assert [result.url for result in results] == ["https://example.com/b"]
+
+    def test_search_ignores_query_operators(self):
+        self.page_crud.add_page("https://example.com/a", "Hinnad alates 120 eurost")
+
+        results = self.page_crud.search('hinnad" (* -:^', limit=10)
+
+        assert [result.url for result in results] == ["https://example.com/a"]
+
+    def test_search_empty_query(self):
+        self.page_crud.add_page("https://example.com/a", "content")
+
+        assert self.page_crud.search("  ?! ", limit=10) == []
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.page_crud.add_page("https://example.com/a", "koolitused")
+        self.page_crud.delete_all_pages()
+
+        assert self.page_crud.search("koolitused", limit=10) == []
+
+    def test_search_limit(self):
+        for i in range(5):
+            self.page_crud.add_page(f"https://example.com/{i}", f"page number {i} about search")
+
+        assert len(self.page_crud.search("search", limit=2)) == 2
+
+    def test_search_falls_back_to_like_scan(self, monkeypatch):
+        monkeypatch.setattr(self.db.get_bind().dialect, "name", "mysql")
+        self.page_crud.add_page("https://example.com/a", "AI consulting")
+        self.page_crud.add_page("https://example.com/b", "AI chatbot, chatbot for support, chatbot development")
+        self.page_crud.add_page("https://example.com/c", "AI Chatbot development")
+        self.page_crud.add_page("https://example.com/d", "onexcase")
+
+        results = self.page_crud.search("ai chatbot", limit=10)
+
+        assert [result.url for result in results] == ["https://example.com/b", "https://example.com/c"]
+        assert results[1].snippet == "<b>AI</b> <b>Chatbot</b> development"
+        assert self.page_crud.search("chatbot", limit=1)[0].url == "https://example.com/b"
+        assert self.page_crud.search("e_c", limit=10) == []
+
+    def test_update_and_get_digests(self):
+        self.page_crud.add_page("https://example.com/a", "Long content of page a")
+        self.page_crud.add_page("https://example.com/b", "Content b")
+
+        updated = self.page_crud.update_digests({"https://example.com/a": "Digest a", "https://example.com/b": None,
+                                                 "https://example.com/missing": "Digest"})
+
+        assert updated == 2
+        assert self.page_crud.get_all_digests() == {"https://example.com/a": "Digest a"}
+
+    def test_upsert_page_inserts_and_replaces_content(self):
+        self.page_crud.add_page("https://example.com/a", "Vana sisu")
+        self.page_crud.update_digests({"https://example.com/a": "Vana kokkuvõte"})
+
+        self.page_crud.upsert_page("https://example.com/a", "Uus sisu")
+        self.page_crud.upsert_page("https://example.com/b", "Teine leht")
+
+        pages = {page.url: page for page in self.page_crud.get_all_pages()}
+        self.db.expire_all()
+        assert pages["https://example.com/a"].content == "Uus sisu"
+        assert pages["https://example.com/a"].digest is None
+        assert pages["https://example.com/b"].content == "Teine leht"
+        assert [result.url for result in self.page_crud.search("uus", limit=10)] == ["https://example.com/a"]
+        assert self.page_crud.search("vana", limit=10) == []
+
+    def test_upsert_page_empty_url(self):
+        with pytest.raises(ValueError):
+            self.page_crud.upsert_page(" ", "content")
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from crawler.priority import DEFAULT_SITEMAP_PRIORITY, PriorityScorer
+
+
+class TestPriorityScorer:
+
+    @pytest.fixture
+    def scorer(self):
+        return PriorityScorer()
+
+    def test_sitemap_priority_orders_pages(self, scorer):
+        scorer.add_sitemap_entry("https://example.com/services", priority="0.9")
+        scorer.add_sitemap_entry("https://example.com/privacy", priority="0.1")
+
+        assert scorer.score("https://example.com/services") > scorer.score("https://example.com/privacy")
+
+    def test_page_missing_from_sitemap_scores_below_default(self, scorer):
+        scorer.add_sitemap_entry("https://example.com/listed")
+
+        assert scorer.score("https://example.com/listed") > scorer.score("https://example.com/other")
+
+    def test_recent_lastmod_gets_bonus(self, scorer):
+        recent = datetime.now(timezone.utc).date().isoformat()
+        old = (datetime.now(timezone.utc) - timedelta(days=1000)).date().isoformat()
+        scorer.add_sitemap_entry("https://example.com/news", lastmod=recent)
+        scorer.add_sitemap_entry("https://example.com/archive", lastmod=old)
+
+        assert scorer.score("https://example.com/news") > scorer.score("https://example.com/archive")
+
+    def test_in_degree_bonus(self, scorer):
+        for _ in range(5):
+            scorer.add_link("https://example.com/popular")
+        scorer.add_link("https://example.com/rare")
+
+        assert scorer.score("https://example.com/popular") > scorer.score("https://example.com/rare")
+
+    def test_depth_penalty(self, scorer):
+        assert scorer.score("https://example.com/a", depth=1) > scorer.score("https://example.com/a", depth=3)
+        assert scorer.score("https://example.com/a") > scorer.score("https://example.com/a/b/c")
+
+    @pytest.mark.parametrize("priority", [None, "", "high", "-1", "7"])
+    def test_invalid_priority_is_clamped_or_defaulted(self, scorer, priority):
+        scorer.add_sitemap_entry("https://example.com/page", priority=priority)
+
+        assert 0 <= scorer.sitemap_priority["https://example.com/page"] <= 1
+
+    @pytest.mark.parametrize("priority", ["nan", "NaN", "inf", "-inf"])
+    def test_non_finite_priority_is_defaulted(self, scorer, priority):
+        scorer.add_sitemap_entry("https://example.com/page", priority=priority)
+
+        assert scorer.sitemap_priority["https://example.com/page"] == DEFAULT_SITEMAP_PRIORITY
+
+    def test_invalid_lastmod_is_ignored(self, scorer):
+        scorer.add_sitemap_entry("https://example.com/page", lastmod="yesterday")
+
+        assert "https://example.com/page" not in scorer.sitemap_lastmod
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import profiler
+from app.services.profiler import Profile, SamplingProfiler
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles():
+    yield
+    profiler.clear_profiles()
+
+
+class TestProfile:
+
+    @pytest.fixture
+    def profile(self):
+        profile = Profile("test")
+        profile.stacks.update({("main", "handle", "query"): 6, ("main", "handle"): 2, ("main", "render"): 2})
+        profile.samples = 10
+        profile.duration = 0.05
+        return profile
+
+    def test_functions(self, profile):
+        functions = {function["function"]: function for function in profile.functions(limit=10)}
+
+        assert functions["main"]["total_share"] == 1.0
+        assert functions["main"]["self_samples"] == 0
+        assert (functions["handle"]["total_samples"], functions["handle"]["self_samples"]) == (8, 2)
+        assert functions["query"]["self_share"] == 0.6
+
+    def test_functions_limit(self, profile):
+        assert [function["function"] for function in profile.functions(limit=2)] == ["main", "handle"]
+
+    def test_collapsed(self, profile):
+        assert profile.collapsed().splitlines()[0] == "main;handle;query 6"
+
+    def test_summary(self, profile):
+        summary = profile.summary()
+
+        assert (summary["label"], summary["samples"], summary["running"]) == ("test", 10, False)
+
+
+class TestSamplingProfiler:
+
+    def test_samples_busy_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,))
+        worker.start()
+        try:
+            sampler = SamplingProfiler(Profile("test"), interval=0.001).start()
+            time.sleep(0.1)
+            profile = sampler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile.samples > 0
+        assert profile.duration >= 0.1
+        assert any(function["function"].startswith("busy_loop (test_profiler.py")
+                   for function in profile.functions(limit=50))
+
+    def test_idle_threads_are_not_sampled(self):
+        stop = threading.Event()
+        waiting = threading.Thread(target=stop.wait)
+        waiting.start()
+        try:
+            sampler = SamplingProfiler(Profile("test"), interval=0.001).start()
+            time.sleep(0.05)
+            profile = sampler.stop()
+        finally:
+            stop.set()
+            waiting.join()
+
+        assert not any("wait (threading.py" in stack[-1] for stack in profile.stacks)
+
+
+class TestProfileStore:
+
+    def test_oldest_profiles_are_dropped(self, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILING_MAX_PROFILES", 2)
+        profiles = [Profile("test") for _ in range(3)]
+        for profile in profiles:
+            profiler.save_profile(profile)
+
+        assert profiler.get_profile(profiles[0].id) is None
+        assert [profile.id for profile in profiler.list_profiles()] == [profiles[2].id, profiles[1].id]
+
+    def test_one_window_at_a_time(self, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILING_INTERVAL", 0.001)
+
+        profile = profiler.start_window_profile(0.05)
+
+        assert profile.running is True
+        assert profiler.start_window_profile(0.05) is None
+        time.sleep(0.2)
+        assert profile.running is False
+        assert profiler.start_window_profile(0.01) is not None
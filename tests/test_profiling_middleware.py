@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.middleware import ProfilingMiddleware
+from app.services import profiler
+from app.utils.timing import RequestTimings, start_timing, stop_timing, timed
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    yield
+    profiler.clear_profiles()
+
+
+class TestTimed:
+
+    def test_sections_are_summed(self):
+        timings, token = start_timing()
+        try:
+            with timed("db"):
+                time.sleep(0.01)
+            with timed("upstream"):
+                pass
+            with timed("upstream"):
+                pass
+        finally:
+            stop_timing(token)
+
+        assert timings.sections["db"][0] >= 0.01
+        assert timings.sections["upstream"][1] == 2
+
+    def test_outside_of_profiled_request(self):
+        with timed("db"):
+            result = 1
+
+        assert result == 1
+
+    def test_server_timing(self):
+        timings = RequestTimings()
+        timings.add("db", 0.0123)
+        timings.add("upstream", 0.5)
+        timings.add("upstream", 0.25)
+
+        assert timings.server_timing(total=0.8) == 'db;dur=12.3, upstream;dur=750.0;desc="2 calls", total;dur=800.0'
+
+
+class TestProfilingMiddleware:
+
+    @staticmethod
+    def make_client(enabled: bool) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, enabled=enabled)
+
+        @app.get("/source_info")
+        def source_info():
+            with timed("db"):
+                time.sleep(0.01)
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_unprofiled_request(self):
+        response = self.make_client(enabled=True).get("/source_info")
+
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_timing_only(self):
+        response = self.make_client(enabled=True).get("/source_info", headers={"X-Profile": "timing", "X-Admin-Key": "secret"})
+
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert "total;dur=" in response.headers["server-timing"]
+        assert "x-profile-id" not in response.headers
+        assert profiler.list_profiles() == []
+
+    def test_sampled_profile_is_stored(self):
+        response = self.make_client(enabled=True).get("/source_info", headers={"X-Profile": "1", "X-Admin-Key": "secret"})
+
+        profile = profiler.get_profile(response.headers["x-profile-id"])
+        assert profile.label == "GET /source_info"
+        assert profile.running is False
+
+    def test_disabled(self):
+        response = self.make_client(enabled=False).get("/source_info", headers={"X-Profile": "1", "X-Admin-Key": "secret"})
+
+        assert "server-timing" not in response.headers
+        assert "x-profile-id" not in response.headers
+
+    def test_admin_key_required(self):
+        client = self.make_client(enabled=True)
+
+        denied = client.get("/source_info", headers={"X-Profile": "timing"})
+        allowed = client.get("/source_info", headers={"X-Profile": "timing", "X-Admin-Key": "secret"})
+
+        assert "server-timing" not in denied.headers
+        assert "server-timing" in allowed.headers
+
+    def test_non_ascii_admin_key(self):
+        response = self.make_client(enabled=True).get(
+            "/source_info", headers={"X-Profile": "timing", "X-Admin-Key": "sälajane".encode()}
+        )
+
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_disabled_without_admin_key(self, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+
+        response = self.make_client(enabled=True).get("/source_info", headers={"X-Profile": "timing", "X-Admin-Key": ""})
+
+        assert "server-timing" not in response.headers
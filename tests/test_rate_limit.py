@@ -0,0 +1,224 @@
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.database import Base
+from app.middleware import (
+    DatabaseRateLimitBackend, Limit, MemoryRateLimitBackend, RateLimitMiddleware, RateLimitRule, acquire_requests,
+)
+from app.utils.usage import record_usage
+
+
+class TestMemoryRateLimitBackend:
+
+    @pytest.fixture
+    def backend(self):
+        return MemoryRateLimitBackend()
+
+    def test_acquire_until_empty(self, backend):
+        limit = Limit(capacity=2, period=60)
+
+        first = backend.acquire("client", limit, now=0)
+        second = backend.acquire("client", limit, now=0)
+        third = backend.acquire("client", limit, now=0)
+
+        assert (first.allowed, first.remaining) == (True, 1)
+        assert (second.allowed, second.remaining) == (True, 0)
+        assert second.reset == 60
+        assert (third.allowed, third.retry_after) == (False, 30)
+
+    def test_refill(self, backend):
+        limit = Limit(capacity=2, period=60)
+        backend.acquire("client", limit, now=0)
+        backend.acquire("client", limit, now=0)
+
+        assert backend.acquire("client", limit, now=29).allowed is False
+        assert backend.acquire("client", limit, now=30).allowed is True
+
+    def test_clients_are_separate(self, backend):
+        limit = Limit(capacity=1, period=60)
+        backend.acquire("a", limit, now=0)
+
+        assert backend.acquire("b", limit, now=0).allowed is True
+
+    def test_charge_into_debt_blocks_until_refilled(self, backend):
+        limit = Limit(capacity=1000, period=100)
+
+        assert backend.acquire("client", limit, cost=0, now=0).allowed is True
+        backend.charge("client", limit, 1500, now=0)
+        blocked = backend.acquire("client", limit, cost=0, now=0)
+
+        assert (blocked.allowed, blocked.remaining, blocked.retry_after) == (False, 0, 51)
+        assert backend.acquire("client", limit, cost=0, now=51).allowed is True
+
+    def test_reset(self, backend):
+        limit = Limit(capacity=1, period=60)
+        backend.acquire("client", limit, now=0)
+
+        backend.reset()
+
+        assert backend.acquire("client", limit, now=0).allowed is True
+
+
+class TestDatabaseRateLimitBackend:
+
+    @pytest.fixture
+    def backend(self):
+        engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        yield DatabaseRateLimitBackend(sessionmaker(bind=engine))
+        engine.dispose()
+
+    def test_acquire_until_empty_and_refill(self, backend):
+        limit = Limit(capacity=2, period=60)
+
+        assert backend.acquire("client", limit, now=0).allowed is True
+        assert backend.acquire("client", limit, now=0).allowed is True
+        assert backend.acquire("client", limit, now=0).retry_after == 30
+        assert backend.acquire("client", limit, now=30).allowed is True
+
+    def test_state_is_shared_between_instances(self, backend):
+        limit = Limit(capacity=1, period=60)
+        other = DatabaseRateLimitBackend(backend.session_factory)
+
+        backend.acquire("client", limit, now=0)
+
+        assert other.acquire("client", limit, now=0).allowed is False
+
+    def test_charge(self, backend):
+        limit = Limit(capacity=100, period=100)
+        backend.charge("client", limit, 150, now=0)
+
+        assert backend.acquire("client", limit, cost=0, now=0).allowed is False
+
+
+class TestRateLimitMiddleware:
+
+    @pytest.fixture
+    def rules(self):
+        return [
+            RateLimitRule("ask", ("/ask",), requests=Limit(3, 60), tokens=Limit(100, 3600)),
+            RateLimitRule("source_info", ("/source_info",), requests=Limit(2, 60)),
+        ]
+
+    @pytest.fixture
+    def backend(self):
+        return MemoryRateLimitBackend()
+
+    @pytest.fixture
+    def client(self, rules, backend):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, rules=rules, backend=backend, enabled=True)
+
+        @app.post("/ask")
+        def ask(tokens: int = 0):
+            record_usage(tokens, 0)
+            return {"ok": True}
+
+        @app.post("/ask/batch")
+        def ask_batch(questions: int = 1):
+            state = acquire_requests(questions - 1)
+            return JSONResponse({"ok": state.allowed}, status_code=200 if state.allowed else 429)
+
+        @app.get("/source_info")
+        def source_info():
+            return {"ok": True}
+
+        @app.get("/health")
+        def health():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_headers(self, client):
+        response = client.get("/source_info")
+
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == "2"
+        assert response.headers["RateLimit-Remaining"] == "1"
+        assert response.headers["RateLimit-Reset"] == "30"
+        assert response.headers["RateLimit-Policy"] == "2;w=60"
+
+    def test_rejects_over_limit(self, client):
+        client.get("/source_info")
+        client.get("/source_info")
+
+        response = client.get("/source_info")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+        assert response.headers["RateLimit-Remaining"] == "0"
+        assert response.json() == {"detail": "Rate limit exceeded, retry later"}
+
+    def test_rules_have_separate_buckets(self, client):
+        client.get("/source_info")
+        client.get("/source_info")
+
+        assert client.post("/ask").status_code == 200
+
+    def test_unmatched_paths_are_not_limited(self, client):
+        for _ in range(5):
+            response = client.get("/health")
+
+        assert response.status_code == 200
+        assert "RateLimit-Limit" not in response.headers
+
+    def test_api_keys_have_separate_buckets(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_API_KEYS", {"first", "second"})
+        client.get("/source_info", headers={"X-API-Key": "first"})
+        client.get("/source_info", headers={"X-API-Key": "first"})
+
+        assert client.get("/source_info", headers={"X-API-Key": "first"}).status_code == 429
+        assert client.get("/source_info", headers={"X-API-Key": "second"}).status_code == 200
+
+    def test_unknown_api_keys_share_the_ip_bucket(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_API_KEYS", {"first"})
+        client.get("/source_info", headers={"X-API-Key": "made-up-1"})
+        client.get("/source_info", headers={"X-API-Key": "made-up-2"})
+
+        assert client.get("/source_info", headers={"X-API-Key": "made-up-3"}).status_code == 429
+        assert client.get("/source_info", headers={"X-API-Key": "first"}).status_code == 200
+
+    def test_extra_requests_are_taken_from_the_request_bucket(self, client):
+        assert client.post("/ask/batch", params={"questions": 2}).status_code == 200
+
+        assert client.post("/ask/batch", params={"questions": 2}).status_code == 429
+        assert client.post("/ask").status_code == 429
+
+    def test_acquire_requests_outside_of_limited_request(self):
+        assert acquire_requests(5) is None
+
+    def test_token_usage_is_charged(self, client):
+        assert client.post("/ask", params={"tokens": 150}).status_code == 200
+
+        response = client.post("/ask")
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+    def test_backend_failure_lets_requests_through(self, rules):
+        backend = Mock(blocking=False)
+        backend.acquire.side_effect = Exception("database unavailable")
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, rules=rules, backend=backend, enabled=True)
+        app.get("/source_info")(lambda: {"ok": True})
+
+        assert TestClient(app).get("/source_info").status_code == 200
+
+    def test_disabled(self, rules, backend):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, rules=rules, backend=backend, enabled=False)
+        app.get("/source_info")(lambda: {"ok": True})
+        client = TestClient(app)
+
+        for _ in range(5):
+            response = client.get("/source_info")
+
+        assert response.status_code == 200
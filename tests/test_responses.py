@@ -0,0 +1,34 @@
+import json
+from unittest.mock import patch
+
+from app.api.responses import FastJSONResponse
+from app.dtos.ask_response import AskResponse, Usage
+from app.services.corpus_snapshot import CorpusService
+
+
+class TestFastJSONResponse:
+
+    def test_render_dict(self):
+        response = FastJSONResponse({"https://example.com/ä": "Sisu ja ümbrus"})
+
+        assert response.headers["content-type"] == "application/json"
+        assert json.loads(response.body) == {"https://example.com/ä": "Sisu ja ümbrus"}
+
+    def test_render_model(self):
+        ask = AskResponse(question="Q?", answer="A", sources=[], usage=Usage(input_tokens=1, output_tokens=2))
+
+        assert json.loads(FastJSONResponse(ask).body) == ask.model_dump()
+
+    def test_render_without_orjson(self):
+        with patch("app.api.responses.orjson", None):
+            response = FastJSONResponse({"url": "Sisu"})
+
+        assert json.loads(response.body) == {"url": "Sisu"}
+
+    def test_render_corpus_pages(self, tmp_path):
+        service = CorpusService(str(tmp_path / "corpus.bin"))
+        service.write_snapshot({"https://example.com/": "Sisu"})
+
+        assert json.loads(FastJSONResponse(service.get_pages()).body) == {"https://example.com/": "Sisu"}
+        with patch("app.api.responses.orjson", None):
+            assert json.loads(FastJSONResponse(service.get_pages()).body) == {"https://example.com/": "Sisu"}
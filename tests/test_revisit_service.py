@@ -0,0 +1,124 @@
+import math
+
+import pytest
+
+from app.config import settings
+from app.cruds.page_schedule_crud import PageScheduleCrud
+from app.services.revisit_service import RevisitScheduler, content_hash, estimate_change_rate
+
+
+HOUR = 3600
+DAY = 86400
+
+
+class TestEstimateChangeRate:
+
+    def test_no_checks(self):
+        assert estimate_change_rate(0, 0, 0) is None
+
+    def test_static_page(self):
+        assert estimate_change_rate(10, 0, 10 * DAY) == 0
+
+    def test_changes_on_every_check_is_not_capped_at_check_rate(self):
+        rate = estimate_change_rate(10, 10, 10 * DAY)
+
+        assert rate == pytest.approx(math.log(21) / DAY)
+        assert rate > 1 / DAY
+
+    def test_some_changes(self):
+        assert estimate_change_rate(10, 5, 10 * DAY) == pytest.approx(-math.log(5.5 / 10.5) / DAY)
+
+
+class TestRevisitScheduler:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database, monkeypatch):
+        monkeypatch.setattr(settings, "REVISIT_REQUESTS_PER_HOUR", 1000)
+        self.db = setup_test_database
+        self.scheduler = RevisitScheduler(self.db)
+        self.crud = PageScheduleCrud(self.db)
+
+    def check_daily(self, url, contents, start=0.0):
+        for day, content in enumerate(contents):
+            self.scheduler.record_check(url, content, now=start + day * DAY)
+        return self.crud.get_schedule(url)
+
+    def test_new_page(self):
+        assert self.scheduler.record_check("https://example.com/", "Sisu", now=1000.0) is True
+
+        schedule = self.crud.get_schedule("https://example.com/")
+        assert schedule.content_hash == content_hash("Sisu")
+        assert schedule.checks == 1
+        assert schedule.change_rate is None
+        assert schedule.next_due_at == 1000.0 + settings.REVISIT_INITIAL_INTERVAL
+
+    def test_unchanged_and_changed_content(self):
+        self.scheduler.record_check("https://example.com/", "Sisu", now=0.0)
+
+        assert self.scheduler.record_check("https://example.com/", "Sisu", now=DAY) is False
+        assert self.scheduler.record_check("https://example.com/", "Uus sisu", now=2 * DAY) is True
+
+        schedule = self.crud.get_schedule("https://example.com/")
+        assert schedule.checks == 3
+        assert schedule.changes == 1
+        assert schedule.last_changed_at == 2 * DAY
+
+    def test_frequently_changing_page_is_revisited_more_often(self):
+        changing = self.check_daily("https://example.com/uudised", [f"Uudis {day}" for day in range(6)])
+        static = self.check_daily("https://example.com/kontakt", ["Kontakt"] * 6)
+
+        assert changing.change_rate > 1
+        assert static.change_rate == 0
+        assert changing.interval < DAY
+        assert static.interval == settings.REVISIT_MAX_INTERVAL
+
+    def test_interval_bounds(self):
+        assert RevisitScheduler.interval_for(1.0) == settings.REVISIT_MIN_INTERVAL
+        assert RevisitScheduler.interval_for(0.0) == settings.REVISIT_MAX_INTERVAL
+        assert RevisitScheduler.interval_for(1 / (2 * DAY)) == pytest.approx(2 * DAY)
+
+    def test_failed_check_keeps_content_hash(self):
+        self.scheduler.record_check("https://example.com/", "Sisu", now=0.0)
+
+        assert self.scheduler.record_check("https://example.com/", None, status=503, now=DAY) is False
+
+        schedule = self.crud.get_schedule("https://example.com/")
+        assert schedule.content_hash == content_hash("Sisu")
+        assert [entry.status for entry in self.crud.get_history("https://example.com/", 10)] == [200, 503]
+
+    def test_history_is_pruned(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVISIT_HISTORY_SIZE", 3)
+
+        self.check_daily("https://example.com/", ["a", "b", "c", "d", "e"])
+
+        history = self.crud.get_history("https://example.com/", 10)
+        assert [entry.checked_at for entry in history] == [2 * DAY, 3 * DAY, 4 * DAY]
+
+    def test_intervals_are_stretched_to_fit_budget(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVISIT_REQUESTS_PER_HOUR", 1)
+        monkeypatch.setattr(settings, "REVISIT_INITIAL_INTERVAL", HOUR)
+        for i in range(3):
+            self.scheduler.record_check(f"https://example.com/{i}", "Sisu", now=0.0)
+
+        assert self.scheduler.budget_factor() == pytest.approx(3)
+        assert self.crud.get_schedule("https://example.com/2").next_due_at == pytest.approx(3 * HOUR)
+
+    def test_due_pages_most_overdue_first_within_batch(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVISIT_REQUESTS_PER_HOUR", 24)
+        monkeypatch.setattr(settings, "REVISIT_TICK", 300)
+        for i, checked_at in enumerate([3 * HOUR, 0.0, HOUR, 10 * DAY]):
+            self.scheduler.record_check(f"https://example.com/{i}", "Sisu", now=checked_at)
+
+        due = self.scheduler.due(now=2 * DAY)
+
+        assert self.scheduler.batch_size() == 2
+        assert [schedule.url for schedule in due] == ["https://example.com/1", "https://example.com/2"]
+
+    def test_stats(self):
+        self.scheduler.record_check("https://example.com/", "Sisu", now=0.0)
+
+        stats = self.scheduler.stats()
+
+        assert stats["pages"] == 1
+        assert stats["demand_per_hour"] == pytest.approx(HOUR / settings.REVISIT_INITIAL_INTERVAL, abs=1e-3)
+        assert stats["budget_factor"] == 1.0
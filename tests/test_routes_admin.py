@@ -0,0 +1,154 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.config import settings
+from app.dtos.profile_response import ProfileFunction, ProfileResponse, ProfileSummary
+from app.dtos.revisit_response import RevisitQueueItem, RevisitQueueResponse
+from app.dtos.usage_response import CostlyQuestion, UsageReportResponse, UsageStats, UsageWriterStats
+
+
+ADMIN_HEADERS = {"X-Admin-Key": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+
+
+def revisit_queue() -> RevisitQueueResponse:
+    return RevisitQueueResponse(
+        pages=1, requests_per_hour=60, demand_per_hour=0.5, budget_factor=1.0, batch_size=5,
+        queue=[RevisitQueueItem(
+            url="https://example.com/", change_rate=0.5, interval=7200.0, checks=3, changes=1,
+            last_checked_at="2026-10-18T21:04:11+00:00", last_changed_at=None,
+            next_due_at="2026-10-18T23:04:11+00:00", overdue=True,
+        )],
+    )
+
+
+class TestRevisitQueueEndpoint:
+
+    def test_get_revisit_queue(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_revisit_queue.return_value = revisit_queue()
+
+            response = client.get("/admin/revisits?limit=10", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 200
+            assert response.json()["queue"][0]["url"] == "https://example.com/"
+            mock_service.get_revisit_queue.assert_called_once_with(10)
+
+    def test_limit_out_of_range(self, client):
+        response = client.get("/admin/revisits?limit=0", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 422
+
+    def test_admin_key_required(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service_class.return_value.get_revisit_queue.return_value = revisit_queue()
+
+            assert client.get("/admin/revisits").status_code == 401
+            assert client.get("/admin/revisits", headers={"X-Admin-Key": "wrong"}).status_code == 401
+            assert client.get("/admin/revisits", headers={"X-Admin-Key": "secret"}).status_code == 200
+
+    def test_non_ascii_admin_key_is_rejected(self, client):
+        assert client.get("/admin/revisits", headers={"X-Admin-Key": "sälajane".encode()}).status_code == 401
+
+    def test_disabled_without_admin_key(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+
+        assert client.get("/admin/revisits").status_code == 404
+        assert client.get("/admin/revisits", headers={"X-Admin-Key": ""}).status_code == 404
+
+
+def profile_summary(**changes) -> ProfileSummary:
+    return ProfileSummary(**{"id": "3f2a9c1e7b4d", "label": "window", "started_at": "2026-10-19T09:12:03+00:00",
+                             "duration": None, "samples": 0, "running": True, **changes})
+
+
+class TestProfileEndpoints:
+
+    def test_start_profile(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.start_profile.return_value = profile_summary()
+
+            response = client.post("/admin/profiles?seconds=5", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 202
+            assert response.json()["id"] == "3f2a9c1e7b4d"
+            mock_service.start_profile.assert_called_once_with(5)
+
+    def test_window_too_long(self, client):
+        response = client.post(f"/admin/profiles?seconds={settings.PROFILING_MAX_SECONDS + 1}", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 422
+
+    def test_get_profile(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_profile.return_value = ProfileResponse(
+                **profile_summary(duration=1.2, samples=4, running=False).model_dump(),
+                functions=[ProfileFunction(function="ask_question (app_service.py:60)", self_samples=0,
+                                           total_samples=4, self_share=0.0, total_share=1.0)],
+            )
+
+            response = client.get("/admin/profiles/3f2a9c1e7b4d?limit=5", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 200
+            assert response.json()["functions"][0]["total_share"] == 1.0
+            mock_service.get_profile.assert_called_once_with("3f2a9c1e7b4d", 5)
+
+    def test_get_collapsed_profile(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service_class.return_value.get_collapsed_profile.return_value = "main;ask_question 4"
+
+            response = client.get("/admin/profiles/3f2a9c1e7b4d/collapsed", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/plain")
+            assert response.text == "main;ask_question 4"
+
+
+class TestUsageEndpoints:
+
+    def test_get_usage(self, client):
+        stats = UsageStats(requests=2, input_tokens=2000, output_tokens=200, cost=0.0006, cached=1, degraded=0,
+                           latency_p50=0.01, latency_p95=1.8, latency_p99=1.8)
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_usage.return_value = UsageReportResponse(
+                period="day", since="2026-10-18T09:00:00+00:00", total=stats, buckets=[],
+                writer=UsageWriterStats(buffered=0, written=2, dropped=0),
+            )
+
+            response = client.get("/admin/usage?period=day&hours=48", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 200
+            assert response.json()["total"]["cached"] == 1
+            mock_service.get_usage.assert_called_once_with("day", 48)
+
+    def test_unknown_period(self, client):
+        response = client.get("/admin/usage?period=week", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 422
+
+    def test_get_costly_questions(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_costly_questions.return_value = [CostlyQuestion(
+                normalized="võrdle koolitusi", question="Võrdle koolitusi?", requests=2, input_tokens=2000,
+                output_tokens=200, cost=0.01, cost_per_request=0.005,
+            )]
+
+            response = client.get("/admin/usage/questions?limit=5", headers=ADMIN_HEADERS)
+
+            assert response.status_code == 200
+            assert response.json()[0]["normalized"] == "võrdle koolitusi"
+            mock_service.get_costly_questions.assert_called_once_with(168, 5)
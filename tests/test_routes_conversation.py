@@ -0,0 +1,54 @@
+from unittest.mock import patch, MagicMock
+from fastapi import HTTPException
+
+from app.dtos.ask_response import Usage
+from app.dtos.conversation_response import ConversationAskResponse, ConversationResponse
+
+
+class TestConversationEndpoints:
+
+    def test_create_conversation(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.create_conversation.return_value = ConversationResponse(id="abc")
+
+            response = client.post("/conversations")
+
+            assert response.status_code == 200
+            assert response.json() == {"id": "abc"}
+
+    def test_ask_in_conversation(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.ask_in_conversation.return_value = ConversationAskResponse(
+                conversation_id="abc",
+                question="How much?",
+                answer="100 EUR",
+                sources=["https://example.com/training"],
+                usage=Usage(input_tokens=100, output_tokens=5),
+            )
+
+            response = client.post("/conversations/abc/ask", json={"question": "How much?"})
+
+            assert response.status_code == 200
+            mock_service.ask_in_conversation.assert_called_once_with("abc", "How much?")
+            assert response.json()["conversation_id"] == "abc"
+            assert response.json()["answer"] == "100 EUR"
+
+    def test_ask_in_unknown_conversation(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.ask_in_conversation.side_effect = HTTPException(status_code=404,
+                                                                         detail="Conversation not found")
+
+            response = client.post("/conversations/missing/ask", json={"question": "How much?"})
+
+            assert response.status_code == 404
+
+    def test_ask_without_question(self, client):
+        response = client.post("/conversations/abc/ask", json={})
+
+        assert response.status_code == 422
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.cruds.page_crud import PageCrud
+from app.db.database import Base, get_db
+from app.main import app
+
+
+@pytest.fixture
+def db_session():
+    """
+    In-memory database shared across threads, endpoints run in the threadpool.
+    """
+    engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    app.dependency_overrides[get_db] = lambda: session
+    yield session
+    app.dependency_overrides.pop(get_db, None)
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def warm():
+    app.state.warm = True
+    yield
+    app.state.warm = False
+
+
+class TestHealthEndpoint:
+
+    def test_health(self, client):
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy"}
+
+
+class TestReadyEndpoint:
+
+    def test_ready(self, client, db_session, warm):
+        PageCrud(db_session).add_page("https://example.com", "Content")
+
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "ready",
+            "checks": {"database": True, "corpus": True, "warm": True, "pages": 1},
+        }
+
+    def test_not_ready_without_pages(self, client, db_session, warm):
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["corpus"] is False
+
+    def test_not_ready_before_warm_up(self, client, db_session):
+        PageCrud(db_session).add_page("https://example.com", "Content")
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["warm"] is False
+
+    def test_not_ready_when_database_fails(self, client, db_session, warm):
+        with patch.object(db_session, "execute", side_effect=Exception("connection refused")):
+            response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"] is False
@@ -1,7 +1,13 @@
+import json
+import threading
 from unittest.mock import patch, MagicMock
-from fastapi import HTTPException
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
 
+from app.api.routes import health, info
 from app.dtos.ask_response import AskResponse, Usage
+from app.dtos.batch_response import BatchItemResult, BatchSummary, BatchSummaryLine
+from app.dtos.search_response import SearchResponse, SearchResult
 
 
 class TestSourceInfoEndpoint:
@@ -59,6 +65,25 @@ class TestAskQuestionEndpoint:
             assert data["question"] == "What is AI?"
             assert data["answer"] == "AI is artificial intelligence."
 
+    def test_ask_question_degraded(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.ask_question.return_value = AskResponse(
+                question="What is AI?",
+                answer="The answer could not be generated right now. Most relevant passages from the website:\n"
+                       "- AI is artificial intelligence. (https://example.com)",
+                sources=["https://example.com"],
+                usage=Usage(input_tokens=0, output_tokens=0),
+                degraded=True,
+            )
+
+            response = client.post("/ask", json={"question": "What is AI?"})
+
+            assert response.status_code == 200
+            assert response.json()["degraded"] is True
+            assert response.json()["model"] is None
+
     def test_ask_question_validation_error(self, client):
         with patch('app.api.routes.info.AppService') as mock_service_class:
             mock_service = MagicMock()
@@ -85,4 +110,128 @@ class TestAskQuestionEndpoint:
             response = client.post("/ask", json={"question": "What is AI?"})
 
             assert response.status_code == 500
-            assert "Internal server error" in response.json()["detail"]
\ No newline at end of file
+            assert "Internal server error" in response.json()["detail"]
+
+    def test_ask_question_does_not_block_other_requests(self):
+        started, released = threading.Event(), threading.Event()
+        waited = []
+
+        def slow_answer(question, use_digests):
+            started.set()
+            waited.append(released.wait(5))
+            return AskResponse(question=question, answer="AI is...", sources=[],
+                               usage=Usage(input_tokens=0, output_tokens=0))
+
+        # Requests of a started client share one event loop
+        app = FastAPI()
+        app.include_router(health.router)
+        app.include_router(info.router)
+        with patch('app.api.routes.info.AppService') as mock_service_class, TestClient(app) as shared_client:
+            mock_service_class.return_value.ask_question.side_effect = slow_answer
+            ask = threading.Thread(target=shared_client.post, args=("/ask",),
+                                   kwargs={"json": {"question": "What is AI?"}})
+            ask.start()
+            started.wait(5)
+
+            health_response = shared_client.get("/health")
+            released.set()
+            ask.join()
+
+        assert health_response.status_code == 200
+        assert waited == [True]
+
+
+class TestSearchEndpoint:
+
+    def test_search_success(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.search.return_value = SearchResponse(
+                query="training",
+                results=[SearchResult(url="https://example.com", snippet="AI <b>training</b>", rank=2.0)]
+            )
+
+            response = client.get("/search", params={"q": "training", "limit": 3})
+
+            assert response.status_code == 200
+            mock_service.search.assert_called_once_with("training", 3)
+            assert response.json()["results"][0]["url"] == "https://example.com"
+
+    def test_search_empty_query(self, client):
+        response = client.get("/search", params={"q": ""})
+
+        assert response.status_code == 422
+
+    def test_search_limit_out_of_range(self, client):
+        response = client.get("/search", params={"q": "training", "limit": 1000})
+
+        assert response.status_code == 422
+
+
+class TestAskBatchEndpoint:
+
+    def test_ask_batch_streams_ndjson(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            usage = Usage(input_tokens=10, output_tokens=5)
+            mock_service.ask_batch.return_value = iter([
+                BatchItemResult(index=1, question="Hi", error="Question is too short"),
+                BatchItemResult(index=0, question="What is AI?", result=AskResponse(
+                    question="What is AI?", answer="AI is...", sources=[], usage=usage)),
+                BatchSummaryLine(summary=BatchSummary(total=2, succeeded=1, failed=1, usage=usage)),
+            ])
+
+            response = client.post("/ask/batch", json={"questions": ["What is AI?", "Hi"], "concurrency": 2})
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            mock_service.ask_batch.assert_called_once_with(["What is AI?", "Hi"], 2)
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert lines[0]["error"] == "Question is too short"
+            assert lines[1]["result"]["answer"] == "AI is..."
+            assert lines[2]["summary"]["succeeded"] == 1
+
+    def test_ask_batch_empty(self, client):
+        response = client.post("/ask/batch", json={"questions": []})
+
+        assert response.status_code == 422
+
+    def test_ask_batch_concurrency_out_of_range(self, client):
+        response = client.post("/ask/batch", json={"questions": ["What is AI?"], "concurrency": 1000})
+
+        assert response.status_code == 422
+
+
+class TestPrefilterStatsEndpoint:
+
+    def test_get_prefilter_stats(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_prefilter_stats.return_value = {
+                "checked": 3, "allowed": 1, "gibberish": 1, "injection": 0, "off_topic": 1, "avoided_calls": 2
+            }
+
+            response = client.get("/prefilter/stats")
+
+            assert response.status_code == 200
+            assert response.json()["avoided_calls"] == 2
+
+
+class TestModelStatsEndpoint:
+
+    def test_get_model_stats(self, client):
+        with patch('app.api.routes.info.AppService') as mock_service_class:
+            mock_service = MagicMock()
+            mock_service_class.return_value = mock_service
+            mock_service.get_model_stats.return_value = {
+                "gpt-4o-mini": {"calls": 2, "failures": 0, "latency": 1.5, "error_rate": 0.0, "input_tokens": 200,
+                                "output_tokens": 40, "cost": 0.000054, "tier": 1, "healthy": True}
+            }
+
+            response = client.get("/models/stats")
+
+            assert response.status_code == 200
+            assert response.json()["gpt-4o-mini"]["calls"] == 2
@@ -0,0 +1,282 @@
+import os
+import subprocess
+
+import pytest
+from unittest.mock import patch
+from scrapy import Request
+from scrapy.exceptions import StopDownload
+from scrapy.http import Headers, HtmlResponse
+from scrapy.utils.test import get_crawler
+from twisted.web.iweb import UNKNOWN_LENGTH
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db.database import Base
+from app.cruds.page_crud import PageCrud
+from app.cruds.page_schedule_crud import PageScheduleCrud
+from app.services.corpus_snapshot import CorpusSnapshot
+from app.services.revisit_service import RevisitScheduler, content_hash
+from crawler.revisit_spider import RevisitSpider
+from crawler.text_spider import TextSpider
+
+
+FIXTURE_SITE = "tests/fixtures/site"
+
+
+@pytest.fixture(scope="module")
+def crawl_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp('crawl')
+
+
+@pytest.fixture(scope="module")
+def crawled_db(crawl_dir):
+    """
+    Runs the real spider offline against the bundled fixture site (tests/fixtures/site).
+    """
+    database_url = f"sqlite:///{crawl_dir / 'crawl.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+
+    result = subprocess.run(
+        [
+            "scrapy", "crawl", "text_spider",
+            "-s", "CRAWL_ARCHIVE_MODE=replay",
+            "-s", f"CRAWL_ARCHIVE_DIR={FIXTURE_SITE}",
+            "-s", "LOG_LEVEL=WARNING",
+        ],
+        env={**os.environ, "DATABASE_URL": database_url, "CORPUS_SNAPSHOT_PATH": str(crawl_dir / 'corpus.bin')},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class TestTextSpiderReplay:
+
+    def test_stores_every_internal_page_once(self, crawled_db):
+        urls = sorted(PageCrud(crawled_db).get_all_urls())
+
+        assert urls == [
+            "https://tehisintellekt.ee/",
+            "https://tehisintellekt.ee/blogi/ai-koolitus",
+            "https://tehisintellekt.ee/files/hinnakiri.docx",
+            "https://tehisintellekt.ee/files/koolituskava.pdf",
+            "https://tehisintellekt.ee/kontakt",
+            "https://tehisintellekt.ee/meist",
+            "https://tehisintellekt.ee/partnerid",
+            "https://tehisintellekt.ee/teenused",
+            "https://tehisintellekt.ee/teenused/koolitused",
+        ]
+
+    def test_follows_redirect_to_trailing_slash(self, crawled_db):
+        # "/partnerid/" is requested as "/partnerid", the site redirects back to the trailing slash
+        pages = {page.url: page.content for page in PageCrud(crawled_db).get_all_pages()}
+
+        assert "Teeme koostööd ülikoolide" in pages["https://tehisintellekt.ee/partnerid"]
+
+    def test_extracts_visible_text_only(self, crawled_db):
+        pages = {page.url: page.content for page in PageCrud(crawled_db).get_all_pages()}
+        home = pages["https://tehisintellekt.ee/"]
+
+        assert "Tehisintellekti lahendused ettevõtetele" in home
+        assert "window.analytics" not in home
+        assert "font-family" not in home
+        assert "Palun luba JavaScript" not in home
+        assert "  " not in home
+
+    def test_stores_linked_document_text(self, crawled_db):
+        pages = {page.url: page.content for page in PageCrud(crawled_db).get_all_pages()}
+
+        assert pages["https://tehisintellekt.ee/files/hinnakiri.docx"] == (
+            "Hinnakiri Ühepäevane koolitus: 450 eurot Konsultatsioon 120 eurot tunnis"
+        )
+        assert "Koolituse hind on 450 eurot" in pages["https://tehisintellekt.ee/files/koolituskava.pdf"]
+        assert "https://tehisintellekt.ee/files/esitlus" not in pages
+
+    def test_writes_corpus_snapshot(self, crawled_db, crawl_dir):
+        pages = {page.url: page.content for page in PageCrud(crawled_db).get_all_pages()}
+
+        snapshot = CorpusSnapshot.load(str(crawl_dir / 'corpus.bin'))
+
+        assert snapshot.to_dict() == pages
+
+
+class TestResumedCrawlReplay:
+
+    def test_links_of_stored_pages_are_followed(self, tmp_path):
+        """
+        Crawl killed after storing the start page and /meist, its queue lost: /partnerid/ is only linked from /meist.
+        """
+        database_url = f"sqlite:///{tmp_path / 'resume.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        PageCrud(session).add_page("https://tehisintellekt.ee/", "Avaleht")
+        PageCrud(session).add_page("https://tehisintellekt.ee/meist", "Meist")
+
+        result = subprocess.run(
+            [
+                "scrapy", "crawl", "text_spider",
+                "-a", "resume=true",
+                "-s", "CRAWL_ARCHIVE_MODE=replay",
+                "-s", f"CRAWL_ARCHIVE_DIR={FIXTURE_SITE}",
+                "-s", "LOG_LEVEL=WARNING",
+            ],
+            env={**os.environ, "DATABASE_URL": database_url, "CORPUS_SNAPSHOT_PATH": str(tmp_path / 'corpus.bin')},
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+        pages = {page.url: page.content for page in PageCrud(session).get_all_pages()}
+
+        assert "https://tehisintellekt.ee/partnerid" in pages
+        assert pages["https://tehisintellekt.ee/meist"] == "Meist"
+
+
+class TestResumeRequests:
+
+    @pytest.fixture
+    def db(self, setup_test_database):
+        PageCrud(setup_test_database).add_page("https://tehisintellekt.ee/", "Avaleht")
+        PageCrud(setup_test_database).add_page("https://tehisintellekt.ee/meist", "Meist")
+        PageCrud(setup_test_database).add_page("https://tehisintellekt.ee/files/koolituskava.pdf", "Koolituskava")
+        return setup_test_database
+
+    def page_requests(self, db, settings_dict):
+        with patch("crawler.text_spider.get_db", return_value=iter([db])):
+            spider = TextSpider.from_crawler(get_crawler(TextSpider, settings_dict), resume="1")
+        return [request.url for request in spider.start_requests() if request.callback == spider.parse]
+
+    def test_stored_pages_are_fetched_again_without_job_state(self, db, tmp_path):
+        assert self.page_requests(db, {"JOBDIR": str(tmp_path)}) == [
+            "https://tehisintellekt.ee/", "https://tehisintellekt.ee/meist"
+        ]
+        assert self.page_requests(db, {}) == ["https://tehisintellekt.ee/", "https://tehisintellekt.ee/meist"]
+
+    def test_restored_queue_is_not_refetched(self, db, tmp_path):
+        (tmp_path / "requests.seen").write_bytes(b"\0" * 20)
+
+        assert self.page_requests(db, {"JOBDIR": str(tmp_path)}) == ["https://tehisintellekt.ee/"]
+
+
+class TestRevisitSpiderReplay:
+
+    @pytest.fixture
+    def revisited_db(self, tmp_path):
+        """
+        Database with one outdated page, revisited offline against the fixture site together with a page
+        that does not exist there.
+        """
+        database_url = f"sqlite:///{tmp_path / 'revisit.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        PageCrud(session).add_page("https://tehisintellekt.ee/kontakt", "Vana kontakt")
+        scheduler = RevisitScheduler(session)
+        scheduler.record_check("https://tehisintellekt.ee/kontakt", "Vana kontakt", now=0.0)
+        scheduler.record_check("https://tehisintellekt.ee/puudub", "Kadunud leht", now=0.0)
+
+        urls_file = tmp_path / "revisit.txt"
+        urls_file.write_text("https://tehisintellekt.ee/kontakt\nhttps://tehisintellekt.ee/puudub\n")
+        result = subprocess.run(
+            [
+                "scrapy", "crawl", "revisit_spider",
+                "-a", f"urls_file={urls_file}",
+                "-s", "CRAWL_ARCHIVE_MODE=replay",
+                "-s", f"CRAWL_ARCHIVE_DIR={FIXTURE_SITE}",
+                "-s", "LOG_LEVEL=WARNING",
+            ],
+            env={**os.environ, "DATABASE_URL": database_url, "CORPUS_SNAPSHOT_PATH": str(tmp_path / 'corpus.bin')},
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+
+        session.expire_all()
+        yield session
+        session.close()
+
+    def test_changed_page_is_stored_and_published(self, revisited_db, tmp_path):
+        pages = {page.url: page.content for page in PageCrud(revisited_db).get_all_pages()}
+
+        assert "Vana kontakt" not in pages["https://tehisintellekt.ee/kontakt"]
+        assert CorpusSnapshot.load(str(tmp_path / 'corpus.bin')).to_dict() == pages
+
+    def test_checks_are_recorded(self, revisited_db):
+        crud = PageScheduleCrud(revisited_db)
+        contact = crud.get_schedule("https://tehisintellekt.ee/kontakt")
+        missing = crud.get_history("https://tehisintellekt.ee/puudub", 10)
+
+        assert contact.checks == 2
+        assert contact.changes == 1
+        assert contact.content_hash != content_hash("Vana kontakt")
+        assert [(entry.status, entry.content_hash) for entry in missing] == [
+            (200, content_hash("Kadunud leht")), (0, None)
+        ]
+
+
+class TestHeadersReceived:
+
+    @pytest.fixture
+    def spider(self, setup_test_database):
+        with patch("crawler.text_spider.get_db", return_value=iter([setup_test_database])):
+            return TextSpider()
+
+    def headers_received(self, spider, content_type, body_length, callback=None):
+        request = Request("https://tehisintellekt.ee/leht", callback=callback or spider.parse)
+        spider.on_headers_received(Headers({"Content-Type": content_type}), body_length, request, spider)
+
+    def test_unknown_length_is_downloaded(self, spider):
+        self.headers_received(spider, "text/html; charset=utf-8", UNKNOWN_LENGTH)
+        self.headers_received(spider, "text/html", None)
+
+    def test_too_large_page_is_stopped(self, spider):
+        with pytest.raises(StopDownload):
+            self.headers_received(spider, "text/html", settings.DOCUMENT_MAX_SIZE + 1)
+
+    def test_unsupported_type_is_stopped(self, spider):
+        with pytest.raises(StopDownload):
+            self.headers_received(spider, "image/png", UNKNOWN_LENGTH)
+
+    def test_other_callbacks_are_not_checked(self, spider):
+        self.headers_received(spider, "text/plain", settings.DOCUMENT_MAX_SIZE + 1, callback=spider.parse_robots)
+
+
+class TestRevisitSpiderBudget:
+
+    @pytest.fixture
+    def spider(self, setup_test_database, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "MAX_CONTENT_SIZE", 60)
+        monkeypatch.setattr(settings, "MAX_PAGE_CONTENT_SIZE", 40)
+        PageCrud(setup_test_database).add_page("https://tehisintellekt.ee/kontakt", "Vana kontakt")
+        PageCrud(setup_test_database).add_page("https://tehisintellekt.ee/teenused", "x" * 40)
+        urls_file = tmp_path / "revisit.txt"
+        urls_file.write_text("https://tehisintellekt.ee/kontakt\n")
+        with patch("crawler.revisit_spider.get_db", return_value=iter([setup_test_database])):
+            return RevisitSpider(urls_file=str(urls_file))
+
+    def revisit(self, spider, url, text):
+        response = HtmlResponse(url, body=f"<html><body><p>{text}</p></body></html>".encode(), encoding="utf-8")
+        spider.parse(response, url=url)
+        return {page.url: page.content for page in spider.page_crud.get_all_pages()}[url]
+
+    def test_changed_page_gets_the_room_of_the_page_it_replaces(self, spider):
+        content = self.revisit(spider, "https://tehisintellekt.ee/kontakt", "Uus kontakt " * 5)
+
+        assert content == "Uus kontakt Uus"
+        assert spider.budget.total_chars == 40 + len(content)
+
+    def test_page_cap_applies(self, spider, monkeypatch):
+        monkeypatch.setattr(spider.budget, "max_chars", 1000)
+
+        content = self.revisit(spider, "https://tehisintellekt.ee/kontakt", "Uus kontakt " * 5)
+
+        assert content == "Uus kontakt Uus kontakt Uus kontakt Uus"
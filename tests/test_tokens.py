@@ -0,0 +1,8 @@
+from app.utils.tokens import estimate_tokens
+
+
+class TestEstimateTokens:
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcde") == 2
@@ -0,0 +1,140 @@
+from unittest.mock import Mock
+
+import pytest
+from scrapy import Request
+
+from crawler.dupefilter import CanonicalRequestFingerprinter, FrontierDupeFilter
+from crawler.url_frontier import UrlFrontier, canonicalize_url, url_fingerprint, is_internal_host
+
+
+class TestCanonicalizeUrl:
+
+    @pytest.mark.parametrize("url, expected", [
+        ("HTTPS://Example.COM/", "https://example.com/"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com:443/about/", "https://example.com/about"),
+        ("http://example.com:8080/about", "http://example.com:8080/about"),
+        ("https://example.com/about#team", "https://example.com/about"),
+        ("https://example.com//blog///post/", "https://example.com/blog/post"),
+        ("https://example.com/?b=2&a=1", "https://example.com/?a=1&b=2"),
+        ("https://example.com/?utm_source=x&utm_medium=y&fbclid=z&page=2", "https://example.com/?page=2"),
+    ])
+    def test_canonicalize_url(self, url, expected):
+        assert canonicalize_url(url) == expected
+
+    @pytest.mark.parametrize("url", [
+        "mailto:info@example.com",
+        "tel:+3725555555",
+        "javascript:void(0)",
+        "ftp://example.com/file",
+        "https://",
+    ])
+    def test_canonicalize_url_rejects_non_http(self, url):
+        assert canonicalize_url(url) is None
+
+    def test_fingerprint_equal_for_same_page(self):
+        assert url_fingerprint("https://example.com/about/") == url_fingerprint("https://EXAMPLE.com/about#x")
+        assert url_fingerprint("https://example.com/about") != url_fingerprint("https://example.com/contact")
+
+
+class TestIsInternalHost:
+
+    @pytest.mark.parametrize("host, expected", [
+        ("example.com", True),
+        ("www.example.com", True),
+        ("blog.example.com.", True),
+        ("notexample.com", False),
+        ("example.com.evil.org", False),
+        ("evil.com", False),
+        ("", False),
+    ])
+    def test_is_internal_host(self, host, expected):
+        assert is_internal_host(host, "example.com") is expected
+
+
+class TestUrlFrontier:
+
+    @pytest.fixture
+    def frontier(self):
+        return UrlFrontier(["example.com"])
+
+    def test_normalize_internal_link(self, frontier):
+        assert frontier.normalize("https://www.example.com/about/?utm_source=x") == "https://www.example.com/about"
+
+    def test_normalize_rejects_external_link_with_domain_in_query(self, frontier):
+        assert frontier.normalize("https://evil.com/?q=example.com") is None
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/logo.png",
+        "https://example.com/files/archive.ZIP",
+        "https://example.com/style.css",
+    ])
+    def test_normalize_rejects_ignored_extensions(self, frontier, url):
+        assert frontier.normalize(url) is None
+
+    def test_normalize_follows_document_extensions(self):
+        frontier = UrlFrontier(["example.com"], document_extensions=[".pdf"])
+
+        assert frontier.normalize("https://example.com/files/price-list.PDF") == "https://example.com/files/price-list.PDF"
+        assert frontier.normalize("https://example.com/files/archive.zip") is None
+
+    def test_seen_set(self, frontier):
+        fingerprint = url_fingerprint("https://example.com/about")
+
+        assert frontier.is_seen("https://example.com/about/") is False
+        assert frontier.mark_seen(fingerprint) is True
+        assert frontier.mark_seen(fingerprint) is False
+        assert frontier.is_seen("https://example.com/about/#top") is True
+
+    def test_request_fingerprinter_matches_frontier(self, frontier):
+        fingerprinter = CanonicalRequestFingerprinter()
+        frontier.mark_seen(fingerprinter.fingerprint(Request("https://example.com/about/?utm_campaign=x")))
+
+        assert frontier.is_seen("https://example.com/about")
+
+
+class TestFrontierDupeFilter:
+
+    def test_seen_requests_persist_in_jobdir(self, tmp_path):
+        fingerprinter = CanonicalRequestFingerprinter()
+        dupefilter = FrontierDupeFilter(Mock(), fingerprinter, str(tmp_path))
+
+        assert dupefilter.request_seen(Request("https://example.com/about")) is False
+        assert dupefilter.request_seen(Request("https://example.com/about/#team")) is True
+        dupefilter.close("shutdown")
+
+        resumed = FrontierDupeFilter(Mock(), fingerprinter, str(tmp_path))
+
+        assert resumed.request_seen(Request("https://example.com/about")) is True
+        assert resumed.request_seen(Request("https://example.com/contact")) is False
+
+    def test_redirect_to_trailing_slash_is_not_filtered(self):
+        dupefilter = FrontierDupeFilter(Mock(), CanonicalRequestFingerprinter())
+        dupefilter.request_seen(Request("https://example.com/about"))
+
+        redirect = Request("https://example.com/about/", meta={"redirect_urls": ["https://example.com/about"]})
+        other = Request("https://example.com/about/", meta={"redirect_urls": ["https://example.com/old-about"]})
+
+        assert dupefilter.request_seen(redirect) is False
+        assert dupefilter.request_seen(other) is True
+        assert dupefilter.request_seen(Request("https://example.com/about/")) is True
+
+    def test_truncated_fingerprint_is_ignored(self, tmp_path):
+        fingerprint = url_fingerprint("https://example.com/about")
+        (tmp_path / "requests.seen").write_bytes(fingerprint + fingerprint[:7])
+
+        dupefilter = FrontierDupeFilter(Mock(), CanonicalRequestFingerprinter(), str(tmp_path))
+
+        assert dupefilter.seen == {fingerprint}
+        assert (tmp_path / "requests.seen").stat().st_size == len(fingerprint)
+
+    def test_open_shares_seen_set_with_spider_frontier(self):
+        frontier = UrlFrontier(["example.com"])
+        crawler = Mock()
+        crawler.spider.frontier = frontier
+        dupefilter = FrontierDupeFilter(crawler, CanonicalRequestFingerprinter())
+
+        dupefilter.open()
+        dupefilter.request_seen(Request("https://example.com/about"))
+
+        assert frontier.is_seen("https://example.com/about")
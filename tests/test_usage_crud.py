@@ -0,0 +1,44 @@
+import pytest
+from app.cruds.usage_crud import UsageCrud
+
+
+def row(question: str, normalized: str, cost: float, created_at: float = 100.0) -> dict:
+    return {
+        "created_at": created_at, "endpoint": "ask", "question": question, "normalized": normalized,
+        "model": "gpt-4o-mini", "input_tokens": 1000, "output_tokens": 100, "cost": cost, "latency": 1.0,
+        "cached": False, "degraded": False, "sources": 1,
+    }
+
+
+class TestUsageCrud:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_test_database):
+        self.db = setup_test_database
+        self.usage_crud = UsageCrud(self.db)
+
+        yield
+
+        self.db.close()
+
+    def test_add_and_get_records(self):
+        assert self.usage_crud.add_records([row("B?", "b", 0.2, 200.0), row("A?", "a", 0.1, 100.0)]) == 2
+        assert self.usage_crud.add_records([]) == 0
+
+        assert [record.question for record in self.usage_crud.get_records_since(0)] == ["A?", "B?"]
+        assert [record.question for record in self.usage_crud.get_records_since(150)] == ["B?"]
+
+    def test_get_costly_questions(self):
+        self.usage_crud.add_records([
+            row("Võrdle koolitusi?", "võrdle koolitusi", 0.004),
+            row("võrdle koolitusi", "võrdle koolitusi", 0.003),
+            row("Kus asub kontor?", "kus asub kontor", 0.005),
+            row("Old question?", "old question", 1.0, created_at=10.0),
+        ])
+
+        questions = self.usage_crud.get_costly_questions(since=50, limit=10)
+
+        assert [(question["normalized"], question["requests"]) for question in questions] == [
+            ("võrdle koolitusi", 2), ("kus asub kontor", 1)]
+        assert questions[0]["cost"] == pytest.approx(0.007)
+        assert questions[0]["input_tokens"] == 2000
+        assert self.usage_crud.get_costly_questions(since=50, limit=1)[0]["normalized"] == "võrdle koolitusi"
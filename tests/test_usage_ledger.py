@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.cruds.usage_crud import UsageCrud
+from app.db.database import Base, create_database_engine
+from app.db.models.usage_record import UsageRecord
+from app.dtos.ask_response import AskResponse
+from app.services.usage_ledger import UsageLedger, percentile, usage_report
+
+
+def answer(question="Milliseid koolitusi pakute?", model="gpt-4o-mini", input_tokens=1000, output_tokens=100,
+           **flags) -> AskResponse:
+    return AskResponse(
+        question=question,
+        answer="Answer",
+        sources=["https://example.com/koolitused", "https://example.com/"],
+        usage={"input_tokens": input_tokens, "output_tokens": output_tokens},
+        model=model,
+        **flags,
+    )
+
+
+def record(created_at: float, latency: float = 1.0, cost: float = 0.001, **columns) -> UsageRecord:
+    return UsageRecord(created_at=created_at, latency=latency, cost=cost, input_tokens=columns.get("input_tokens", 10),
+                       output_tokens=5, cached=columns.get("cached", False), degraded=False)
+
+
+class TestUsageLedger:
+
+    @pytest.fixture
+    def session_factory(self, tmp_path):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+        Base.metadata.create_all(engine)
+        yield sessionmaker(bind=engine)
+        engine.dispose()
+
+    def records(self, session_factory):
+        db = session_factory()
+        try:
+            return UsageCrud(db).get_records_since(0)
+        finally:
+            db.close()
+
+    def test_flush_writes_buffered_records(self, session_factory):
+        ledger = UsageLedger(session_factory, flush_interval=60)
+        ledger.record("ask", answer(), 1.5)
+        ledger.record("ask", answer(question="KUS asub kontor", model=None, input_tokens=0, output_tokens=0,
+                                    cached=True), 0.01)
+
+        assert self.records(session_factory) == []
+        assert ledger.flush() == 2
+
+        first, second = self.records(session_factory)
+        assert first.endpoint == "ask"
+        assert first.normalized == "milliseid koolitusi pakute"
+        assert first.model == "gpt-4o-mini"
+        assert first.cost == pytest.approx((1000 * 0.15 + 100 * 0.60) / 1_000_000)
+        assert first.latency == 1.5
+        assert first.sources == 2
+        assert second.cached is True
+        assert second.cost == 0.0
+        assert ledger.stats() == {"buffered": 0, "written": 2, "dropped": 0}
+
+    def test_full_batch_is_written_in_background(self, session_factory):
+        ledger = UsageLedger(session_factory, batch_size=3, flush_interval=60)
+        for _ in range(3):
+            ledger.record("ask_batch", answer(), 1.0)
+
+        deadline = time.monotonic() + 5
+        while ledger.stats()["written"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(self.records(session_factory)) == 3
+        ledger.close()
+
+    def test_close_writes_remaining_records(self, session_factory):
+        ledger = UsageLedger(session_factory, flush_interval=60)
+        ledger.record("ask", answer(), 1.0)
+
+        ledger.close()
+        ledger.record("ask", answer(), 1.0)
+
+        assert len(self.records(session_factory)) == 1
+
+    def test_failed_flush_keeps_records(self, session_factory, tmp_path):
+        # No usage_records table, every insert fails
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+        ledger = UsageLedger(sessionmaker(bind=engine), flush_interval=60)
+        ledger.record("ask", answer(), 1.0)
+
+        assert ledger.flush() == 0
+        assert ledger.stats()["buffered"] == 1
+
+        ledger.session_factory = session_factory
+        assert ledger.flush() == 1
+
+    def test_oldest_records_are_dropped_over_max_buffer(self, session_factory):
+        ledger = UsageLedger(session_factory, flush_interval=60, max_buffer=2)
+        for question in ["First question?", "Second question?", "Third question?"]:
+            ledger.record("ask", answer(question=question), 1.0)
+
+        ledger.flush()
+
+        assert [record.question for record in self.records(session_factory)] == ["Second question?", "Third question?"]
+        assert ledger.stats()["dropped"] == 1
+
+    def test_disabled(self, session_factory, monkeypatch):
+        monkeypatch.setattr(settings, "USAGE_LEDGER_ENABLED", False)
+        ledger = UsageLedger(session_factory, flush_interval=60)
+
+        ledger.record("ask", answer(), 1.0)
+
+        assert ledger.stats()["buffered"] == 0
+
+
+class TestUsageReport:
+
+    def test_percentile(self):
+        assert percentile([], 0.5) is None
+        assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+        assert percentile([float(value) for value in range(1, 101)], 0.95) == 96.0
+
+    def test_hourly_buckets(self):
+        hour = 1_760_000_400  # 2025-10-09T09:00:00+00:00
+        records = [
+            record(hour + 10, latency=1.0, cached=True),
+            record(hour + 3000, latency=3.0),
+            record(hour + 3600 * 2 + 5, latency=2.0, input_tokens=100),
+        ]
+
+        report = usage_report(records, "hour", since=hour)
+
+        assert report["since"] == "2025-10-09T09:00:00+00:00"
+        assert report["total"]["requests"] == 3
+        assert report["total"]["input_tokens"] == 120
+        assert report["total"]["cost"] == 0.003
+        assert report["total"]["cached"] == 1
+        assert report["total"]["latency_p50"] == 2.0
+        assert [bucket["start"] for bucket in report["buckets"]] == [
+            "2025-10-09T09:00:00+00:00", "2025-10-09T11:00:00+00:00"]
+        assert report["buckets"][0]["requests"] == 2
+        assert report["buckets"][0]["latency_p99"] == 3.0
+
+    def test_daily_buckets(self):
+        day = 1_759_968_000  # 2025-10-09T00:00:00+00:00
+        report = usage_report([record(day + 100), record(day + 86399), record(day + 86400)], "day", since=day)
+
+        assert [(bucket["start"], bucket["requests"]) for bucket in report["buckets"]] == [
+            ("2025-10-09T00:00:00+00:00", 2), ("2025-10-10T00:00:00+00:00", 1)]
+
+    def test_no_records(self):
+        report = usage_report([], "hour", since=0)
+
+        assert report["total"]["requests"] == 0
+        assert report["total"]["latency_p95"] is None
+        assert report["buckets"] == []
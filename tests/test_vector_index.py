@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+
+class TestVectorIndex:
+
+    @pytest.fixture
+    def vectors(self):
+        rng = np.random.default_rng(42)
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    @pytest.fixture
+    def chunks(self):
+        return [{"url": f"https://example.com/{i}", "text": f"chunk {i}"} for i in range(50)]
+
+    def test_load_missing(self, tmp_path):
+        assert VectorIndex.load(str(tmp_path / "embeddings")) is None
+
+    def test_write_and_search(self, tmp_path, vectors, chunks):
+        path = str(tmp_path / "embeddings")
+        VectorIndex.write(path, vectors, chunks)
+
+        index = VectorIndex.load(path)
+        results = index.search(vectors[7], k=3)
+
+        assert isinstance(index.vectors, np.memmap)
+        assert index.vectors.dtype == np.float32
+        assert results[0][0] == 7
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert len(results) == 3
+        assert [score for _, score in results] == sorted([score for _, score in results], reverse=True)
+
+    def test_quantized_search(self, tmp_path, vectors, chunks):
+        path = str(tmp_path / "embeddings")
+        VectorIndex.write(path, vectors, chunks, quantize=True)
+
+        index = VectorIndex.load(path)
+        results = index.search(vectors[12], k=5)
+
+        assert index.vectors.dtype == np.int8
+        assert results[0][0] == 12
+        assert results[0][1] == pytest.approx(1.0, abs=0.05)
+
+    def test_k_larger_than_index(self, tmp_path, vectors, chunks):
+        path = str(tmp_path / "embeddings")
+        VectorIndex.write(path, vectors[:2], chunks[:2])
+
+        assert len(VectorIndex.load(path).search(vectors[0], k=10)) == 2
+
+    def test_new_version_replaces_old(self, tmp_path, vectors, chunks):
+        path = str(tmp_path / "embeddings")
+        old_version = VectorIndex.write(path, vectors, chunks)
+        new_version = VectorIndex.write(path, vectors[:5], chunks[:5])
+
+        index = VectorIndex.load(path)
+
+        assert new_version > old_version
+        assert index.version == new_version
+        assert len(index.chunks) == 5
+        assert len(list(tmp_path.glob("embeddings-*.npy"))) == 1
+
+    def test_vectors_and_chunks_mismatch(self, tmp_path, vectors, chunks):
+        with pytest.raises(ValueError):
+            VectorIndex.write(str(tmp_path / "embeddings"), vectors, chunks[:3])